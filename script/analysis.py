@@ -0,0 +1,112 @@
+import math
+import sys
+import time
+
+import numpy as np
+
+from golden_model import sqrt_q88
+from result_format import ResultSet, load_results
+from stream_stats import TOLERANCES_LSB, StreamStats, block_moments, merge_moments
+
+# ================= KONFIGURASI =================
+CHUNK_ROWS = 1 << 20   # Baris per reduksi; memori tetap kecil untuk sweep jutaan baris
+# ===============================================
+
+
+def _columns(source):
+    """(input, reply, latency_ns) arrays from any result source.
+
+    Accepts a ResultSet, a result folder / CSV path (see load_results), a
+    SweepCache (answered vectors only) or an (inputs, replies[, latency_ns])
+    tuple of arrays.
+    """
+    if isinstance(source, str):
+        source = load_results(source)
+    if isinstance(source, ResultSet):
+        return source.input, source.reply, source.latency_ns
+    if hasattr(source, 'done') and hasattr(source, 'replies'):
+        inputs = np.flatnonzero(source.done)
+        return inputs, source.replies[inputs], source.latency_ns[inputs]
+    inputs, replies = source[0], source[1]
+    latency_ns = source[2] if len(source) > 2 else np.zeros(len(inputs), dtype=np.uint64)
+    return np.asarray(inputs), np.asarray(replies), np.asarray(latency_ns)
+
+
+def precision_metrics(inputs, replies, tolerances=TOLERANCES_LSB, golden=False, chunk=CHUNK_ROWS):
+    """Error metrics of raw Q8.8 replies against math.sqrt, one StreamStats.update per chunk.
+
+    The metric definitions are StreamStats.summary(); this adds the raw
+    pass counts and the RMS error. `golden=True` also counts bit-exact
+    agreement with the golden model.
+    """
+    stats = StreamStats(tolerances)
+    for start in range(0, len(inputs), chunk):
+        stats.update(inputs[start:start + chunk], replies[start:start + chunk], golden=golden)
+
+    summary = stats.summary()
+    n = stats.n
+    metrics = {key: summary[key] for key in ('vectors', 'pass_rate', 'avg_error_lsb', 'max_error_lsb',
+                                             'std_error_lsb', 'sqnr_db', 'enob')}
+    metrics['pass_count'] = dict(zip(stats.tolerances, stats.pass_counts.tolist()))
+    metrics['rms_error_lsb'] = math.sqrt(stats.error_power / n) * 256.0 if n else float('nan')
+    if golden:
+        metrics['golden_exact'] = stats.golden_exact
+    return metrics
+
+
+def latency_metrics(latency_ns, chunk=CHUNK_ROWS):
+    """Mean/min/max latency, jitter (std, ddof=1) and throughput; 0 ns = not measured."""
+    n, mean, m2 = 0, 0.0, 0.0
+    lat_min, lat_max = math.inf, 0.0
+    for start in range(0, len(latency_ns), chunk):
+        lat = np.asarray(latency_ns[start:start + chunk], dtype=np.float64)
+        lat = lat[lat > 0]
+        if len(lat) == 0:
+            continue
+        n, mean, m2 = merge_moments(n, mean, m2, *block_moments(lat))
+        lat_min = min(lat_min, float(lat.min()))
+        lat_max = max(lat_max, float(lat.max()))
+
+    nan = float('nan')
+    avg_ms = mean / 1e6 if n else nan
+    return {
+        'latency_vectors': n,
+        'avg_latency_ms': avg_ms,
+        'min_latency_ms': lat_min / 1e6 if n else nan,
+        'max_latency_ms': lat_max / 1e6 if n else nan,
+        'jitter_ms': math.sqrt(m2 / (n - 1)) / 1e6 if n > 1 else nan,
+        'throughput': 1000.0 / avg_ms if n and avg_ms > 0 else nan,
+    }
+
+
+def analyze(precision_source, latency_source=None, tolerances=TOLERANCES_LSB, golden=False):
+    """Every summary metric (same keys as StreamStats.summary()) from result sources.
+
+    Latency comes from `latency_source` if given, else from the latency
+    column of `precision_source`.
+    """
+    inputs, replies, latency_ns = _columns(precision_source)
+    if latency_source is not None:
+        latency_ns = _columns(latency_source)[2]
+    metrics = precision_metrics(inputs, replies, tolerances, golden)
+    metrics.update(latency_metrics(latency_ns))
+    return metrics
+
+
+if __name__ == "__main__":
+    # python analysis.py <hasil_presisi> [<hasil_latency>]
+    # python analysis.py bench [N]  -> ukur waktu analisis N baris sintetis
+    if len(sys.argv) > 1 and sys.argv[1] == 'bench':
+        rows = int(sys.argv[2]) if len(sys.argv) > 2 else 65536
+        inputs = np.arange(rows) % 65536
+        replies = sqrt_q88(np.arange(65536))[inputs]
+        latency_ns = np.random.default_rng(0).normal(7.7e6, 4e5, rows).astype(np.uint64)
+        t0 = time.perf_counter()
+        analyze((inputs, replies, latency_ns))
+        print(f"{rows} rows analysed in {(time.perf_counter() - t0) * 1000:.1f} ms")
+    elif len(sys.argv) > 1:
+        for key, value in analyze(*sys.argv[1:3], golden=True).items():
+            print(f"{key:<16}: {value}")
+    else:
+        print("Usage: python analysis.py <precision_results> [<latency_results>] | bench [N]")
+        sys.exit(1)
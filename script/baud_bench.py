@@ -0,0 +1,193 @@
+import asyncio
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from fsm_model import CLK_FREQ, simulate, wire_cycles
+from golden_model import reply_table
+from latency_trace import PhaseTracer
+from pipelined_io import safe_pacing
+from sweep_cache import build_hash
+from transport import SETTLE_TIME, SqrtDevice, serial_opener
+
+# ================= KONFIGURASI =================
+BAUD_RATES = [9600, 19200, 57600, 115200, 230400, 460800, 921600]
+DEPTHS = [1, 4, 32]
+BENCH_VECTORS = 256              # Vector per titik (baud, depth)
+USB_LATENCY = 0.0005             # Delay driver/USB untuk mode simulasi (detik)
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'bench')  # History + baseline, bukan folder kerja
+HISTORY_FILE = 'bench_history.jsonl'  # Satu baris JSON per run (di BENCH_DIR)
+BASELINE_FILE = 'bench_baseline_{mode}.json'  # Satu baseline per mode (sim / hw)
+REGRESSION_TOLERANCE = 0.10      # Throughput < 90% baseline = regresi
+# Kolom yang dibandingkan dengan baseline. Simulasi: throughput model (kabel + FSM +
+# USB_LATENCY + pacing), sama di mesin mana pun; yang terukur tergantung CPU host.
+REGRESSION_KEY = {'sim': 'model_ops_per_sec', 'hw': 'ops_per_sec'}
+RETRIES = 1
+# ===============================================
+
+
+def bench_timeout(baud, depth):
+    # Satu word ~40 bit di kabel (+ jeda antar word seukuran TX balasan saat depth > 1);
+    # sisakan ruang untuk antrean & scheduler
+    return 0.05 + depth * 80.0 / baud
+
+
+def model_ops_per_sec(baud, depth, latency=USB_LATENCY, clk_freq=CLK_FREQ):
+    """Deterministic throughput of SqrtDevice.sqrt_many on the modelled link (no host overhead).
+
+    One round trip is the UART wire time both ways (fsm_model.wire_cycles)
+    plus the FSM compute time and `latency`. Above depth 1, words go out
+    every 20 bit times + word gap (safe_pacing) in blocks of depth // 2
+    plus one sync probe, with two blocks in flight.
+    """
+    wire = wire_cycles(clk_freq, baud)
+    round_trip = (wire['rx'] + simulate(1, 0)['TX_START_BIT'] + wire['tx']) / clk_freq + latency
+    depth, word_gap = safe_pacing(depth, baud)
+    if depth == 1:
+        return 1.0 / round_trip
+    block = depth // 2
+    word_period = 20.0 / baud + word_gap
+    paced = block / ((block + 1) * word_period)                  # Kabel host penuh
+    in_flight = 2 * block / ((block + 1) * word_period + round_trip)  # Menunggu balasan terakhir
+    return min(paced, in_flight)
+
+
+async def bench_point(ser, baud, depth, n_vectors=BENCH_VECTORS):
+    """Throughput and per-request latency of one (baud, depth) point on an open port."""
+    tracer = PhaseTracer()
+    values = list(range(1, n_vectors + 1))
+    async with SqrtDevice(ser, depth=depth, timeout=bench_timeout(baud, depth),
+                          retries=RETRIES, tracer=tracer) as dev:
+        t0 = time.perf_counter()
+        replies = await dev.sqrt_many(values)
+        elapsed = time.perf_counter() - t0
+
+    table = reply_table()
+    answered = [(v, r) for v, r in zip(values, replies) if r is not None]
+    total_ms = tracer.phases_ns()['total'] / 1e6
+    return {
+        'baud': baud,
+        'depth': depth,
+        'vectors': n_vectors,
+        'seconds': elapsed,
+        'ops_per_sec': len(answered) / elapsed if elapsed > 0 else 0.0,
+        'model_ops_per_sec': model_ops_per_sec(baud, depth),
+        'latency_ms': float(np.mean(total_ms)) if len(total_ms) else float('nan'),
+        'latency_p99_ms': float(np.percentile(total_ms, 99)) if len(total_ms) else float('nan'),
+        'failed': n_vectors - len(answered),
+        'mismatches': sum(r != table[v] for v, r in answered),
+        'resyncs': dev.stats['resyncs'],
+        'lost_by_fpga': getattr(ser, 'lost', None),
+        'effective_depth': dev.depth,        # safe_pacing: depth > 1 hanya dengan jeda antar word
+        'word_gap_ms': dev.word_gap * 1e3,
+    }
+
+
+def run_suite(bauds=BAUD_RATES, depths=DEPTHS, port=None, n_vectors=BENCH_VECTORS):
+    """Every (baud, depth) point; simulated (UartModelSerial) unless `port` is given.
+
+    On hardware the bitstream's BAUD_RATE generic must match, so `bauds`
+    is normally a single rate there.
+    """
+    async def main():
+        results = []
+        for baud in bauds:
+            for depth in depths:
+                if port is None:
+                    from fake_serial import UartModelSerial
+                    ser = UartModelSerial(baudrate=baud, latency=USB_LATENCY)
+                else:
+                    ser = await asyncio.get_running_loop().run_in_executor(None, serial_opener, port, baud)
+                    await asyncio.sleep(SETTLE_TIME)   # Tunggu FPGA reset (auto-reset)
+                results.append(await bench_point(ser, baud, depth, n_vectors))
+                print_point(results[-1])
+        return results
+    return asyncio.run(main())
+
+
+def print_point(r):
+    model = f" (model {r['model_ops_per_sec']:7.1f})"
+    print(f"   {r['baud']:>7d} baud  depth {r['depth']:>2d} (gap {r['word_gap_ms']:.3f} ms): {r['ops_per_sec']:9.1f} ops/sec{model}  "
+          f"latency {r['latency_ms']:7.3f} ms (p99 {r['latency_p99_ms']:7.3f})  "
+          f"failed {r['failed']}  mismatch {r['mismatches']}  resync {r['resyncs']}  lost {r['lost_by_fpga']}")
+
+
+def bench_path(name, bench_dir=BENCH_DIR):
+    os.makedirs(bench_dir, exist_ok=True)
+    return os.path.normpath(os.path.join(bench_dir, name))
+
+
+def append_history(results, mode, path=None):
+    path = path or bench_path(HISTORY_FILE)
+    entry = {'time': time.strftime('%Y-%m-%d %H:%M:%S'), 'build_id': build_hash(), 'mode': mode,
+             'results': results}
+    with open(path, 'a') as f:
+        f.write(json.dumps(entry) + '\n')
+    return entry
+
+
+def check_regressions(results, mode, path=None, tolerance=REGRESSION_TOLERANCE):
+    """Points whose throughput fell below (1 - tolerance) x baseline: [(baud, depth, now, base)].
+
+    Only a baseline of the same `mode` counts: simulated and hardware
+    throughput are not comparable. Compares the REGRESSION_KEY column;
+    raises FileNotFoundError when there is no baseline to compare with.
+    """
+    path = path or bench_path(BASELINE_FILE.format(mode=mode))
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Baseline '{path}' tidak ada (buat dengan --save-baseline)")
+    with open(path) as f:
+        saved = json.load(f)
+    if saved.get('mode') != mode:
+        return []
+    key = REGRESSION_KEY[mode]
+    baseline = {(b['baud'], b['depth']): b[key] for b in saved['results']}
+    regressions = []
+    for r in results:
+        base = baseline.get((r['baud'], r['depth']))
+        if base and r[key] < (1 - tolerance) * base:
+            regressions.append((r['baud'], r['depth'], r[key], base))
+    return regressions
+
+
+def save_baseline(results, mode, path=None):
+    path = path or bench_path(BASELINE_FILE.format(mode=mode))
+    with open(path, 'w') as f:
+        json.dump({'time': time.strftime('%Y-%m-%d %H:%M:%S'), 'build_id': build_hash(),
+                   'mode': mode, 'results': results}, f, indent=2)
+    return path
+
+
+if __name__ == "__main__":
+    # python baud_bench.py                        -> simulasi semua BAUD_RATES x DEPTHS (CI)
+    # python baud_bench.py --port COM6 115200     -> board asli (bitstream @115200)
+    # tambah --save-baseline untuk menyimpan hasil sebagai baseline
+    args = sys.argv[1:]
+    save = '--save-baseline' in args
+    args = [a for a in args if a != '--save-baseline']
+    port = None
+    if args[:1] == ['--port']:
+        port, args = args[1], args[2:]
+    bauds = [int(a) for a in args] or BAUD_RATES
+    mode = 'hw' if port else 'sim'
+
+    print(f"Baud-rate benchmark ({mode}, {BENCH_VECTORS} vectors per point):")
+    results = run_suite(bauds, DEPTHS, port)
+    append_history(results, mode)
+    print(f"History appended to '{bench_path(HISTORY_FILE)}'")
+
+    if save:
+        print(f"Baseline saved to '{save_baseline(results, mode)}'")
+        sys.exit(0)
+    try:
+        regressions = check_regressions(results, mode)
+    except FileNotFoundError as e:
+        # Tanpa baseline tidak ada yang dicek: CI harus gagal, bukan lolos diam-diam
+        print(f"ERROR: {e}")
+        sys.exit(2)
+    for baud, depth, now, base in regressions:
+        print(f"REGRESSION: {baud} baud depth {depth}: {now:.1f} ops/sec < baseline {base:.1f}")
+    sys.exit(1 if regressions else 0)
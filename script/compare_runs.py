@@ -0,0 +1,318 @@
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+from golden_model import sqrt_q88
+from result_format import load_results
+
+# ================= KONFIGURASI =================
+DOMAIN = 65536
+HEAT_MAX_LSB = 8          # Kolom heatmap: error bertanda floor(reply - sqrt*256), dipotong ke +/-8 LSB
+HIST_MAX_LSB = 16         # Histogram error per run: -16 .. +16 LSB
+SHOW_DIFFS = 10           # Input beda yang dicetak per pasangan run
+ALPHA = 0.01              # Batas signifikansi (p-value) untuk laporan
+# ===============================================
+
+
+class AlignedRuns:
+    """Several sweeps aligned by input on the dense 16-bit domain.
+
+    Row k of every matrix belongs to `labels[k]`: `present` (input seen),
+    `reply` (int32, -1 = missing) and `latency_ns` (0 = not measured). The
+    join is one scatter per run (reply[k, input] = reply), so aligning
+    many 65k-vector runs costs a few ms each; the source columns are
+    memory-mapped .npy and are never parsed as text. If an input repeats
+    within a run, the last occurrence wins.
+    """
+
+    def __init__(self, labels, present, reply, latency_ns, meta):
+        self.labels = labels
+        self.present = present
+        self.reply = reply
+        self.latency_ns = latency_ns
+        self.meta = meta
+
+    def __len__(self):
+        return len(self.labels)
+
+    def common(self, a, b):
+        """Inputs present in both runs `a` and `b` (row indices)."""
+        return np.flatnonzero(self.present[a] & self.present[b])
+
+
+def align(sources, labels=None, golden=False):
+    """AlignedRuns from result folders / CSVs / ResultSets; `golden=True` adds the golden model first."""
+    sources = list(sources)
+    labels = list(labels) if labels is not None else [s if isinstance(s, str) else f"run{k}"
+                                                     for k, s in enumerate(sources)]
+    if golden:
+        sources, labels = ['golden'] + sources, ['golden'] + labels
+    k = len(sources)
+    present = np.zeros((k, DOMAIN), dtype=bool)
+    reply = np.full((k, DOMAIN), -1, dtype=np.int32)
+    latency_ns = np.zeros((k, DOMAIN), dtype=np.uint64)
+    meta = []
+    for row, source in enumerate(sources):
+        if golden and row == 0:
+            present[0] = True
+            reply[0] = sqrt_q88(np.arange(DOMAIN))
+            meta.append({'source': 'golden_model'})
+            continue
+        results = load_results(source) if isinstance(source, str) else source
+        idx = np.asarray(results.input, dtype=np.int64)
+        present[row, idx] = True
+        reply[row, idx] = results.reply
+        latency_ns[row, idx] = results.latency_ns
+        meta.append(results.meta)
+    return AlignedRuns(labels, present, reply, latency_ns, meta)
+
+
+def signed_error_lsb(inputs, replies):
+    # Error bertanda terhadap sqrt ideal, dalam LSB (1/256); truncation -> negatif
+    return np.asarray(replies, dtype=np.float64) - np.sqrt(np.asarray(inputs, dtype=np.float64)) * 256.0
+
+
+def octaves(inputs):
+    # Posisi MSB input (msb_detector), -1 untuk input 0 (bypass FSM)
+    x = np.asarray(inputs, dtype=np.int64)
+    return np.where(x > 0, np.floor(np.log2(np.maximum(x, 1))).astype(np.int64), -1)
+
+
+def _normal_p(z):
+    # Two-sided p-value untuk statistik ~N(0, 1)
+    return math.erfc(abs(z) / math.sqrt(2)) if math.isfinite(z) else float('nan')
+
+
+def ks_test(a, b):
+    """Two-sample Kolmogorov-Smirnov: (D, asymptotic p-value)."""
+    a, b = np.sort(np.asarray(a, dtype=np.float64)), np.sort(np.asarray(b, dtype=np.float64))
+    if len(a) == 0 or len(b) == 0:
+        return float('nan'), float('nan')
+    grid = np.concatenate((a, b))
+    cdf_a = np.searchsorted(a, grid, side='right') / len(a)
+    cdf_b = np.searchsorted(b, grid, side='right') / len(b)
+    d = float(np.max(np.abs(cdf_a - cdf_b)))
+    en = math.sqrt(len(a) * len(b) / (len(a) + len(b)))
+    lam = (en + 0.12 + 0.11 / en) * d
+    if lam < 1e-3:
+        return d, 1.0
+    p = 2 * sum((-1) ** (j - 1) * math.exp(-2 * j * j * lam * lam) for j in range(1, 101))
+    return d, min(1.0, max(0.0, p))
+
+
+def paired_test(a, b):
+    """Mean of b - a over paired samples, its 95% interval and the paired t-test p-value.
+
+    The t statistic is compared with the normal distribution, which is
+    exact enough for the hundreds-to-65k pairs a sweep gives.
+    """
+    diff = np.asarray(b, dtype=np.float64) - np.asarray(a, dtype=np.float64)
+    n = len(diff)
+    if n < 2:
+        return float('nan'), float('nan'), float('nan')
+    mean, std = float(diff.mean()), float(diff.std(ddof=1))
+    se = std / math.sqrt(n)
+    if se == 0:
+        return mean, 0.0, 1.0 if mean == 0 else 0.0
+    return mean, 1.96 * se, _normal_p(mean / se)
+
+
+def mann_whitney(a, b):
+    """Mann-Whitney U test (normal approximation, average ranks for ties): (P(b > a), p-value)."""
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    n_a, n_b = len(a), len(b)
+    if n_a == 0 or n_b == 0:
+        return float('nan'), float('nan')
+    both = np.concatenate((a, b))
+    order = np.argsort(both, kind='mergesort')
+    sorted_vals = both[order]
+    ranks = np.empty(len(both))
+    ranks[order] = np.arange(1, len(both) + 1)
+    # Rank rata-rata untuk nilai kembar
+    _, first, counts = np.unique(sorted_vals, return_index=True, return_counts=True)
+    tied = counts > 1
+    for start, count in zip(first[tied].tolist(), counts[tied].tolist()):
+        ranks[order[start:start + count]] = start + (count + 1) / 2
+    u_b = float(ranks[n_a:].sum()) - n_b * (n_b + 1) / 2
+    n = n_a + n_b
+    tie_term = float(np.sum(counts.astype(np.float64) ** 3 - counts)) / (n * (n - 1)) if n > 1 else 0.0
+    sigma = math.sqrt(n_a * n_b / 12 * ((n + 1) - tie_term))
+    z = (u_b - n_a * n_b / 2) / sigma if sigma > 0 else 0.0
+    return u_b / (n_a * n_b), _normal_p(z)
+
+
+def bit_diff(runs, a, b):
+    """Per-input reply differences of run b against run a, on the inputs both contain."""
+    idx = runs.common(a, b)
+    ra, rb = runs.reply[a, idx], runs.reply[b, idx]
+    xor = (ra ^ rb).astype(np.uint16)
+    bits = np.unpackbits(xor.view(np.uint8).reshape(-1, 2)[:, ::-1], axis=1)[:, ::-1]
+    changed = np.flatnonzero(xor)
+    delta = rb.astype(np.int64) - ra
+    return {
+        'common': len(idx),
+        'changed': len(changed),
+        'max_delta_lsb': int(np.abs(delta).max()) if len(delta) else 0,
+        'bit_flips': bits.sum(axis=0),            # Indeks 0 = LSB
+        'inputs': idx[changed],
+        'delta_lsb': delta[changed],
+    }
+
+
+def error_distribution(runs, k, idx=None):
+    """Signed-error stats and histogram (1 LSB bins, -HIST_MAX_LSB..+HIST_MAX_LSB) of run k."""
+    idx = np.flatnonzero(runs.present[k]) if idx is None else idx
+    err = signed_error_lsb(idx, runs.reply[k, idx])
+    bins = np.clip(np.floor(err).astype(np.int64), -HIST_MAX_LSB, HIST_MAX_LSB) + HIST_MAX_LSB
+    return {
+        'vectors': len(idx),
+        'mean_lsb': float(err.mean()) if len(err) else float('nan'),
+        'std_lsb': float(err.std(ddof=1)) if len(err) > 1 else float('nan'),
+        'max_abs_lsb': float(np.abs(err).max()) if len(err) else float('nan'),
+        'hist': np.bincount(bins, minlength=2 * HIST_MAX_LSB + 1),
+        'errors': err,
+    }
+
+
+def octave_heatmap(runs, k, idx=None):
+    """Counts per (MSB octave -1..15, floor signed error -HEAT_MAX_LSB..+HEAT_MAX_LSB) of run k."""
+    idx = np.flatnonzero(runs.present[k]) if idx is None else idx
+    err = signed_error_lsb(idx, runs.reply[k, idx])
+    col = np.clip(np.floor(err).astype(np.int64), -HEAT_MAX_LSB, HEAT_MAX_LSB) + HEAT_MAX_LSB
+    row = octaves(idx) + 1
+    cols = 2 * HEAT_MAX_LSB + 1
+    return np.bincount(row * cols + col, minlength=17 * cols).reshape(17, cols)
+
+
+def latency_delta(runs, a, b):
+    """Latency of run b vs run a on the inputs measured in both: paired delta and distribution shift."""
+    idx = runs.common(a, b)
+    la, lb = runs.latency_ns[a, idx], runs.latency_ns[b, idx]
+    paired = (la > 0) & (lb > 0)
+    # Hanya input yang terukur di kedua run: latency tidak tercampur beda himpunan input
+    la_ms, lb_ms = la[paired] / 1e6, lb[paired] / 1e6
+    mean, ci, p_paired = paired_test(la_ms, lb_ms)
+    p_greater, p_mw = mann_whitney(la_ms, lb_ms)
+    pct = (lambda x, q: float(np.percentile(x, q)) if len(x) else float('nan'))
+    return {
+        'pairs': int(np.count_nonzero(paired)),
+        'mean_delta_ms': mean,
+        'ci95_ms': ci,
+        'p_paired': p_paired,
+        'p50_delta_ms': pct(lb_ms, 50) - pct(la_ms, 50),
+        'p99_delta_ms': pct(lb_ms, 99) - pct(la_ms, 99),
+        'p_b_slower': p_greater,
+        'p_mann_whitney': p_mw,
+    }
+
+
+def compare(runs, ref=0):
+    """Every run against run `ref`: bit differences, error distribution shift and latency delta."""
+    out = []
+    for k in range(len(runs)):
+        if k == ref:
+            continue
+        idx = runs.common(ref, k)
+        dist_ref, dist = error_distribution(runs, ref, idx), error_distribution(runs, k, idx)
+        ks_d, ks_p = ks_test(dist_ref['errors'], dist['errors'])
+        out.append({
+            'run': k,
+            'bits': bit_diff(runs, ref, k),
+            'error_ref': dist_ref,
+            'error': dist,
+            'ks_d': ks_d,
+            'ks_p': ks_p,
+            'heatmap_delta': octave_heatmap(runs, k, idx) - octave_heatmap(runs, ref, idx),
+            'latency': latency_delta(runs, ref, k),
+        })
+    return out
+
+
+def save_heatmaps(runs, path):
+    """Heatmap of every run as CSV rows: run, octave, then one count per error column."""
+    cols = [f"err_{e:+d}" for e in range(-HEAT_MAX_LSB, HEAT_MAX_LSB + 1)]
+    with open(path, 'w') as f:
+        f.write(','.join(['run', 'octave'] + cols) + '\n')
+        for k, label in enumerate(runs.labels):
+            for octave, counts in enumerate(octave_heatmap(runs, k), start=-1):
+                if counts.any():
+                    f.write(','.join([label, str(octave)] + [str(c) for c in counts.tolist()]) + '\n')
+    return path
+
+
+def _print_heatmap(delta):
+    print(f"      {'oct':>4} " + ''.join(f"{e:>6d}" for e in range(-HEAT_MAX_LSB, HEAT_MAX_LSB + 1)))
+    for octave, counts in enumerate(delta, start=-1):
+        if counts.any():
+            print(f"      {octave:>4} " + ''.join(f"{c:>6d}" if c else f"{'.':>6}" for c in counts.tolist()))
+
+
+def print_comparison(runs, results, ref=0, tol=0, show=SHOW_DIFFS):
+    name_ref = runs.labels[ref]
+    for res in results:
+        name, bits, lat = runs.labels[res['run']], res['bits'], res['latency']
+        over = int(np.count_nonzero(np.abs(bits['delta_lsb']) > tol))
+        print(f"{name} vs {name_ref}: {bits['common']} input bersama, {bits['changed']} beda "
+              f"({over} > {tol} LSB), max {bits['max_delta_lsb']} LSB")
+        if bits['changed']:
+            flips = ' '.join(f"b{b}:{int(c)}" for b, c in enumerate(bits['bit_flips'].tolist()) if c)
+            print(f"   Bit berubah    : {flips}")
+            for x, d in list(zip(bits['inputs'].tolist(), bits['delta_lsb'].tolist()))[:show]:
+                print(f"      input {x:5d}: 0x{int(runs.reply[ref, x]):04X} -> "
+                      f"0x{int(runs.reply[res['run'], x]):04X} ({d:+d} LSB)")
+        e0, e1 = res['error_ref'], res['error']
+        shift = 'BERUBAH' if res['ks_p'] < ALPHA else 'sama'
+        print(f"   Error (LSB)    : mean {e0['mean_lsb']:+.3f} -> {e1['mean_lsb']:+.3f}, "
+              f"std {e0['std_lsb']:.3f} -> {e1['std_lsb']:.3f}, max |e| {e0['max_abs_lsb']:.3f} -> "
+              f"{e1['max_abs_lsb']:.3f}; KS D={res['ks_d']:.4f} p={res['ks_p']:.3g} ({shift})")
+        if res['heatmap_delta'].any():
+            print("   Heatmap delta (baris = oktaf MSB, kolom = floor error bertanda LSB):")
+            _print_heatmap(res['heatmap_delta'])
+        if lat['pairs']:
+            sig = 'signifikan' if lat['p_paired'] < ALPHA else 'tidak signifikan'
+            print(f"   Latency        : {lat['mean_delta_ms']:+.4f} ms +/- {lat['ci95_ms']:.4f} "
+                  f"({lat['pairs']} pasangan, p={lat['p_paired']:.3g}, {sig}); "
+                  f"P50 {lat['p50_delta_ms']:+.4f} ms, P99 {lat['p99_delta_ms']:+.4f} ms, "
+                  f"Mann-Whitney p={lat['p_mann_whitney']:.3g}")
+
+
+def _bench(n_runs, tmp_dir):
+    # n_runs sweep sintetis 65536 vector: golden + bit-flip acak + latency acak
+    from result_format import save_results
+    rng = np.random.default_rng(0)
+    x = np.arange(DOMAIN)
+    paths = []
+    for k in range(n_runs):
+        replies = sqrt_q88(x).astype(np.int64)
+        flip = rng.random(DOMAIN) < 0.001 * k
+        replies[flip] -= 1
+        latency = rng.normal(7.7e6 + 2e4 * k, 4e5, DOMAIN).astype(np.uint64)
+        paths.append(save_results(os.path.join(tmp_dir, f"run{k}"), x, np.clip(replies, 0, 0xFFFF), latency))
+    t0 = time.perf_counter()
+    runs = align(paths)
+    t_align = time.perf_counter() - t0
+    results = compare(runs)
+    elapsed = time.perf_counter() - t0
+    print(f"{n_runs} runs x {DOMAIN} vectors: align {t_align * 1000:.1f} ms, "
+          f"align + compare {elapsed * 1000:.1f} ms")
+    return runs, results
+
+
+if __name__ == "__main__":
+    # python compare_runs.py <hasil_ref> <hasil> [<hasil> ...]  -> semua run vs run pertama
+    # python compare_runs.py <hasil>                          -> vs golden model
+    # python compare_runs.py bench [N]                        -> N run sintetis
+    if len(sys.argv) > 1 and sys.argv[1] == 'bench':
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            runs, results = _bench(int(sys.argv[2]) if len(sys.argv) > 2 else 8, tmp)
+            print_comparison(runs, results[-1:])
+    elif len(sys.argv) > 1:
+        runs = align(sys.argv[1:], golden=len(sys.argv) == 2)
+        print_comparison(runs, compare(runs))
+    else:
+        print("Usage: python compare_runs.py <ref_results> [<results> ...] | bench [N]")
+        sys.exit(1)
@@ -0,0 +1,194 @@
+import glob
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import golden_model
+from result_format import save_results
+from sweep_cache import build_hash
+
+# ================= KONFIGURASI =================
+GHDL = 'ghdl'
+GHDL_FLAGS = ['--std=08', '-frelaxed']   # Testbench memakai hwrite dari std.textio (VHDL-2008)
+SRC_DIR = os.path.normpath(golden_model.SRC_DIR)
+TB_DIR = os.path.join(os.path.dirname(SRC_DIR), 'tb')
+BUILD_DIR = os.path.join(os.path.dirname(SRC_DIR), 'sim_build')   # Work library + output shard
+RESULT_DIR = 'rtl_sim_results'
+STOP_TIME = '50ms'       # Batas waktu simulasi untuk testbench yang clock-nya tidak berhenti
+SHARD_TIMEOUT = 3600     # Detik wall-clock per proses GHDL
+# Testbench exhaustive yang bisa dipecah per rentang input (generic START_VAL/END_VAL/OUT_FILE)
+SWEEP_TESTBENCHES = {'system_tb': (1, 65535)}
+# ===============================================
+
+
+def testbenches(tb_dir=TB_DIR):
+    """{entity name: .vhd path} of every testbench in tb/."""
+    found = {}
+    for path in sorted(glob.glob(os.path.join(tb_dir, '*.vhd'))):
+        with open(path) as f:
+            match = re.search(r'^\s*entity\s+(\w+)\s+is', f.read(), re.IGNORECASE | re.MULTILINE)
+        if match:
+            found[match.group(1)] = path
+    return found
+
+
+def _ghdl(args, workdir, timeout=None):
+    t0 = time.perf_counter()
+    proc = subprocess.run([GHDL] + args[:1] + GHDL_FLAGS + [f'--workdir={workdir}'] + args[1:],
+                          cwd=workdir, capture_output=True, text=True, timeout=timeout)
+    return proc.returncode, proc.stdout + proc.stderr, time.perf_counter() - t0
+
+
+def analyse(entity, tb_path, build_dir=BUILD_DIR):
+    """Import src/*.vhd plus one testbench into its own work library and elaborate it.
+
+    Every testbench gets its own directory, so one that no longer matches
+    the RTL (e.g. an old port list) only fails itself. Returns the work dir.
+    """
+    workdir = os.path.join(build_dir, entity)
+    os.makedirs(workdir, exist_ok=True)
+    sources = sorted(glob.glob(os.path.join(SRC_DIR, '*.vhd'))) + [tb_path]
+    for step in (['-i'] + sources, ['-m', entity]):
+        code, log, _ = _ghdl(step, workdir)
+        if code != 0:
+            raise RuntimeError(f"GHDL {step[0]} gagal untuk {entity}:\n{log.strip()}")
+    return workdir
+
+
+def shard_bounds(first, last, n_shards):
+    """Split the inclusive range first..last into contiguous (first, last) shards."""
+    edges = np.linspace(first, last + 1, min(n_shards, last - first + 1) + 1).round().astype(np.int64)
+    return [(int(a), int(b) - 1) for a, b in zip(edges[:-1], edges[1:])]
+
+
+def run_shard(entity, workdir, first, last):
+    """Simulate inputs first..last in one GHDL process; returns (inputs, replies, seconds)."""
+    out_file = os.path.join(workdir, f'shard_{first:05d}_{last:05d}.csv')
+    code, log, elapsed = _ghdl(['-r', entity, f'-gSTART_VAL={first}', f'-gEND_VAL={last}',
+                                f'-gOUT_FILE={out_file}', '--assert-level=error'],
+                               workdir, timeout=SHARD_TIMEOUT)
+    if code != 0:
+        raise RuntimeError(f"Shard {first}..{last} gagal (exit {code}):\n{log.strip()[-2000:]}")
+    inputs, replies = read_shard(out_file)
+    os.remove(out_file)
+    return inputs, replies, elapsed
+
+
+def read_shard(path):
+    # Format system_tb: header "input_dec,output_q8_8_hex", lalu "<desimal>,<4 digit hex>"
+    data = np.loadtxt(path, dtype=str, delimiter=',', skiprows=1, ndmin=2)
+    inputs = data[:, 0].astype(np.int64).astype(np.uint16)
+    replies = np.array([int(h, 16) for h in data[:, 1]], dtype=np.uint16)
+    return inputs, replies
+
+
+def diff_golden(inputs, replies, show=10):
+    """Compare RTL replies with golden_model.sqrt_q88: count plus the first `show` mismatches."""
+    inputs = np.asarray(inputs, dtype=np.int64)
+    expected = golden_model.sqrt_q88(inputs)
+    bad = np.flatnonzero(np.asarray(replies) != expected)
+    examples = [(int(inputs[i]), int(replies[i]), int(expected[i])) for i in bad[:show]]
+    return {'vectors': len(inputs), 'mismatches': len(bad), 'examples': examples}
+
+
+def run_sweep(entity='system_tb', first=None, last=None, jobs=None, result_dir=RESULT_DIR, progress=print):
+    """Exhaustive RTL sweep split into input-range shards, one GHDL process per worker.
+
+    The merged replies are saved as a result set (result_format), tagged
+    with the RTL build id, so analysis.py / temp_check.py treat them like a
+    HIL run; returns (result dir, diff_golden report).
+    """
+    default_first, default_last = SWEEP_TESTBENCHES[entity]
+    first = default_first if first is None else first
+    last = default_last if last is None else last
+    jobs = jobs or os.cpu_count() or 1
+    workdir = analyse(entity, testbenches()[entity])
+
+    # Lebih banyak shard daripada worker: shard terakhir tidak menahan semuanya
+    bounds = shard_bounds(first, last, jobs * 4)
+    parts = []
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=jobs) as pool:   # Thread hanya menunggu proses GHDL
+        futures = [pool.submit(run_shard, entity, workdir, a, b) for a, b in bounds]
+        for k, fut in enumerate(futures):
+            parts.append(fut.result())
+            if progress:
+                progress(f"   shard {k + 1}/{len(bounds)}: {bounds[k][0]}..{bounds[k][1]} "
+                         f"({parts[-1][2]:.1f} s)")
+    elapsed = time.perf_counter() - t0
+
+    inputs = np.concatenate([p[0] for p in parts])
+    replies = np.concatenate([p[1] for p in parts])
+    missing = (last - first + 1) - len(np.unique(inputs))
+    if missing:
+        raise RuntimeError(f"{missing} input tidak ada di output shard")
+
+    save_results(result_dir, inputs, replies, source='ghdl', testbench=entity,
+                 build_id=build_hash(bitstream_file=None), shards=len(bounds), jobs=jobs,
+                 seconds=round(elapsed, 3))
+    return result_dir, diff_golden(inputs, replies)
+
+
+def run_all(jobs=None, progress=print):
+    """Run every testbench once (sweep testbenches with their default range); {entity: (ok, log)}."""
+    jobs = jobs or os.cpu_count() or 1
+
+    def one(entity, path):
+        try:
+            workdir = analyse(entity, path)
+            code, log, elapsed = _ghdl(['-r', entity, f'--stop-time={STOP_TIME}', '--assert-level=error'],
+                                       workdir, timeout=SHARD_TIMEOUT)
+            return code == 0, log, elapsed
+        except (RuntimeError, subprocess.TimeoutExpired) as exc:
+            return False, str(exc), 0.0
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {entity: pool.submit(one, entity, path) for entity, path in testbenches().items()}
+        for entity, fut in futures.items():
+            results[entity] = fut.result()
+            if progress:
+                ok, _, elapsed = results[entity]
+                progress(f"   {'PASS' if ok else 'FAIL'}  {entity:<32s} {elapsed:6.1f} s")
+    return results
+
+
+if __name__ == "__main__":
+    # python cosim.py                          -> sweep RTL 1..65535 di GHDL, semua core
+    # python cosim.py sweep <first> <last> [-j N]
+    # python cosim.py all [-j N]               -> jalankan semua testbench di tb/
+    if shutil.which(GHDL) is None:
+        print(f"'{GHDL}' tidak ditemukan di PATH (https://github.com/ghdl/ghdl)")
+        sys.exit(2)
+    args = sys.argv[1:]
+    jobs = None
+    if '-j' in args:
+        k = args.index('-j')
+        jobs = int(args[k + 1])
+        args = args[:k] + args[k + 2:]
+    command = args[0] if args else 'sweep'
+
+    if command == 'all':
+        results = run_all(jobs)
+        failed = [entity for entity, (ok, _, _) in results.items() if not ok]
+        print(f"{len(results) - len(failed)}/{len(results)} testbench PASS")
+        for entity in failed:
+            print(f"--- {entity} ---\n{results[entity][1].strip()[-1000:]}")
+        sys.exit(1 if failed else 0)
+
+    first = int(args[1]) if len(args) > 1 else None
+    last = int(args[2]) if len(args) > 2 else None
+    print(f"RTL sweep (GHDL, {jobs or os.cpu_count()} jobs):")
+    t0 = time.perf_counter()
+    path, report = run_sweep(first=first, last=last, jobs=jobs)
+    print(f"{report['vectors']} vectors in {time.perf_counter() - t0:.1f} s -> '{path}'")
+    print(f"Golden diff: {report['mismatches']} mismatches")
+    for val, got, want in report['examples']:
+        print(f"   input {val}: RTL 0x{got:04X}, golden 0x{want:04X}")
+    sys.exit(1 if report['mismatches'] else 0)
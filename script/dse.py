@@ -0,0 +1,169 @@
+import csv
+import itertools
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import golden_model
+from analysis import precision_metrics
+from fsm_model import simulate
+
+# ================= KONFIGURASI =================
+GS_LUT_BITS = [4, 5, 6, 7, 8, 9, 10]   # gs_initial_guess: 2^bits entry Q2.30 (RTL: 8)
+GS_ITERATIONS = [1, 2, 3, 4]           # goldschmidt.vhd: count 0..N-1 (RTL: 3)
+NR_PASSES = [0, 1, 2]                  # Divide + polish per request (RTL: 1, 0 = seed NR ROM saja)
+MULT_WIDTHS = [18, 24, 32]             # Bit operand multiplier yang dipakai (RTL: 32)
+RESULT_FILE = 'dse_results.csv'
+DOMAIN = 65536
+# ===============================================
+
+RTL_POINT = (8, golden_model.GS_ITERATIONS, 1, 32)
+
+
+def gs_table(bits, rtl_lut=None, frac_bits=30):
+    """Reciprocal ROM for seed in [1.0, 2.0) with 2^bits entries, Q2.30.
+
+    Same convention as gs_initial_guess.vhd: 1 / left edge of each segment,
+    truncated (floor), so gs_table(8) equals the RTL ROM. With `rtl_lut`
+    the parsed ROM itself is used for bits = 8. Words keep `frac_bits`
+    fraction bits; the rest of the Q2.30 word is zero.
+    """
+    if bits == 8 and rtl_lut is not None and frac_bits == 30:
+        return rtl_lut
+    # floor(2^30 / (1 + k / 2^bits)) in integers: exact for every table size
+    n = 1 << bits
+    table = (n << frac_bits) // (n + np.arange(n, dtype=np.int64))
+    return (table << (30 - frac_bits)).astype(np.int64)
+
+
+def nr_table(bits, frac_bits=30):
+    """Square-root ROM for data_norm in [1.0, 2.0) with 2^bits entries, Q2.30.
+
+    Same convention as nr_initial_guess.vhd: sqrt of the left edge of each
+    segment, truncated (floor), so nr_table(10) equals the RTL ROM.
+    """
+    n = 1 << bits
+    # floor(2^30 * sqrt(1 + k / 2^bits)) dengan math.isqrt: eksak, tanpa float
+    table = [math.isqrt(((n + k) << (2 * frac_bits)) // n) << (30 - frac_bits) for k in range(n)]
+    return np.array(table, dtype=np.int64)
+
+
+def slice_multiply(x, y, width):
+    # multiplier.vhd dengan operand dipotong ke `width` bit teratas (mis. 18x18 DSP)
+    if width < 32:
+        mask = golden_model.MASK_32 & ~((1 << (32 - width)) - 1)
+        x, y = x & mask, y & mask
+    return golden_model.multiply(x, y)
+
+
+def sqrt_variant(values, nr_lut, gs_lut, gs_bits, iterations, nr_passes, mult_width, nr_bits=10):
+    """golden_model.sqrt_q88 with the datapath parameters opened up, over a whole batch.
+
+    With RTL_POINT and the RTL ROMs this is bit-identical to golden_model.
+    Every extra NR pass divides again with the previous result as seed.
+    """
+    x = np.asarray(values, dtype=np.int64) & 0xFFFF
+    data_norm, shift = golden_model.normalise(np.where(x == 0, 1, x))
+    seed = nr_lut[(data_norm >> (30 - nr_bits)) & ((1 << nr_bits) - 1)]
+    for _ in range(nr_passes):
+        num, den = data_norm, seed
+        fac = gs_lut[(seed >> (30 - gs_bits)) & ((1 << gs_bits) - 1)]
+        for _ in range(iterations):
+            num, den = slice_multiply(num, fac, mult_width), slice_multiply(den, fac, mult_width)
+            fac = (golden_model.TWO_Q230 - den) & golden_model.MASK_32
+        seed = golden_model.nr_polish(seed, num)
+    out = golden_model.post_process(seed, shift)
+    return np.where(x == 0, 0, out).astype(np.uint16)
+
+
+def cycle_count(iterations, nr_passes):
+    """rx_valid -> start bit (fsm_model) when every pass costs DIVIDE + POLISH."""
+    stamps = simulate(2, 1, gs_iterations=iterations)
+    per_pass = stamps['POST_PROC'] - stamps['DIVIDE']
+    return stamps['TX_START_BIT'] + (nr_passes - 1) * per_pass
+
+
+def evaluate(point):
+    """Accuracy and cost of one (gs_bits, iterations, nr_passes, mult_width) point."""
+    gs_bits, iterations, nr_passes, mult_width = point
+    nr_lut, rtl_gs = golden_model._luts()
+    domain = np.arange(DOMAIN)
+    replies = sqrt_variant(domain, nr_lut, gs_table(gs_bits, rtl_gs), gs_bits, iterations,
+                           nr_passes, mult_width)
+    metrics = precision_metrics(domain, replies)
+    return {
+        'gs_lut_bits': gs_bits,
+        'gs_iterations': iterations,
+        'nr_passes': nr_passes,
+        'mult_width': mult_width,
+        'cycles': cycle_count(iterations, nr_passes),
+        'gs_rom_bits': (1 << gs_bits) * 32,
+        'sqnr_db': metrics['sqnr_db'],
+        'max_error_lsb': metrics['max_error_lsb'],
+        'avg_error_lsb': metrics['avg_error_lsb'],
+        'pass_rate_2lsb': metrics['pass_rate'][2.0],
+        'rtl_exact': int(np.count_nonzero(replies == golden_model.reply_table())),
+    }
+
+
+def pareto_front(rows):
+    """Rows not dominated on (fewer cycles, higher SQNR, lower max error), sorted by cycles."""
+    def dominates(a, b):
+        no_worse = (a['cycles'] <= b['cycles'] and a['sqnr_db'] >= b['sqnr_db']
+                    and a['max_error_lsb'] <= b['max_error_lsb'])
+        better = (a['cycles'] < b['cycles'] or a['sqnr_db'] > b['sqnr_db']
+                  or a['max_error_lsb'] < b['max_error_lsb'])
+        return no_worse and better
+
+    front = [r for r in rows if not any(dominates(o, r) for o in rows)]
+    return sorted(front, key=lambda r: (r['cycles'], -r['sqnr_db']))
+
+
+def explore(gs_bits=GS_LUT_BITS, iterations=GS_ITERATIONS, nr_passes=NR_PASSES,
+            mult_widths=MULT_WIDTHS, workers=None):
+    """Evaluate the full grid over the full domain, one point per task across all cores."""
+    grid = [p for p in itertools.product(gs_bits, iterations, nr_passes, mult_widths)
+            if p[2] > 0 or (p[0], p[1], p[3]) == (gs_bits[0], iterations[0], mult_widths[0])]
+    # Tanpa NR pass, GS ROM/iterasi/multiplier tidak dipakai: cukup satu titik
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [evaluate(p) for p in grid]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(evaluate, grid, chunksize=max(1, len(grid) // (workers * 4))))
+
+
+def save_rows(rows, front, path=RESULT_FILE):
+    on_front = {id(r) for r in front}
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(list(rows[0]) + ['pareto'])
+        for r in rows:
+            writer.writerow(list(r.values()) + [int(id(r) in on_front)])
+    return path
+
+
+if __name__ == "__main__":
+    # python dse.py [workers]  -> grid penuh, Pareto front akurasi vs siklus
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else None
+
+    # Model harus identik dengan golden model di titik RTL
+    rtl = evaluate(RTL_POINT)
+    if rtl['rtl_exact'] != DOMAIN:
+        print(f"Model DSE tidak bit-exact di titik RTL ({rtl['rtl_exact']}/{DOMAIN})")
+        sys.exit(1)
+
+    t0 = time.perf_counter()
+    rows = explore(workers=workers)
+    elapsed = time.perf_counter() - t0
+    front = pareto_front(rows)
+    print(f"DSE: {len(rows)} design points x {DOMAIN} inputs in {elapsed:.1f} s -> '{save_rows(rows, front)}'")
+    print(f"RTL  : {rtl['cycles']} cycles, SQNR {rtl['sqnr_db']:.2f} dB, max {rtl['max_error_lsb']:.3f} LSB")
+    print("Pareto front (GS LUT bits, GS iterations, NR passes, multiplier width):")
+    for r in front:
+        mark = '  <- RTL' if (r['gs_lut_bits'], r['gs_iterations'], r['nr_passes'], r['mult_width']) == RTL_POINT else ''
+        print(f"   {r['cycles']:3d} cycles  SQNR {r['sqnr_db']:7.2f} dB  max {r['max_error_lsb']:8.3f} LSB  "
+              f"({r['gs_lut_bits']:2d}, {r['gs_iterations']}, {r['nr_passes']}, {r['mult_width']}){mark}")
@@ -0,0 +1,307 @@
+import random
+import struct
+import threading
+import time
+
+# ================= FAKE SERIAL (TANPA BOARD) =================
+# Pengganti serial.Serial untuk uji tanpa FPGA. API yang dipakai script
+# (write, read, in_waiting, reset_input_buffer, close) sama persis, jadi
+# objek ini bisa langsung dioper ke fungsi HIL mana pun.
+# =============================================================
+
+
+def golden_q88(val):
+    # Jawaban bit-exact hardware (golden_model), dihitung sekali untuk 0..65535
+    from golden_model import reply_table
+    return reply_table()[val & 0xFFFF]
+
+
+class LoopbackSerial:
+    """Fake serial port that answers each 2-byte `<H` request like the FPGA.
+
+    `latency` is the fixed turnaround per request (USB/driver delay) and
+    `byte_time` the wire time of one UART frame; replies become readable
+    only once both have elapsed, so pipelining gains can be measured.
+    """
+
+    def __init__(self, port='LOOPBACK', baudrate=9600, timeout=1.0,
+                 latency=0.0, byte_time=0.0, compute=golden_q88):
+        self.port = port
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.latency = latency
+        self.byte_time = byte_time
+        self.compute = compute
+        self.is_open = True
+
+        self._lock = threading.Condition()  # write() membangunkan read() yang menunggu
+        self._pending = bytearray()  # Byte request yang belum genap 1 word
+        self._replies = []           # [(waktu_siap, 2 byte balasan), ...]
+        self._rx = bytearray()       # Balasan yang sudah siap dibaca
+        self._line_free = 0.0        # Kapan jalur TX "FPGA" kosong lagi
+
+    # ---------- sisi host -> FPGA ----------
+    def write(self, data):
+        now = time.perf_counter()
+        with self._lock:
+            self._pending.extend(data)
+            n_words = len(self._pending) // 2
+            if n_words:
+                words = struct.unpack(f'<{n_words}H', self._pending[:2 * n_words])
+                del self._pending[:2 * n_words]
+                for k, val in enumerate(words):
+                    # Word ke-k baru lengkap setelah 2*(k+1) frame lewat kabel
+                    arrive = now + 2 * (k + 1) * self.byte_time
+                    # Balasan juga butuh 2 frame di kabel TX, setelah jalur TX kosong
+                    ready = max(arrive + self.latency, self._line_free) + 2 * self.byte_time
+                    self._line_free = ready
+                    self._emit(ready, struct.pack('<H', self.compute(val)))
+            self._lock.notify_all()
+        return len(data)
+
+    def _emit(self, ready, reply):
+        # Antrekan balasan (siap dibaca pada `ready`); dipanggil di dalam _lock, sebelum notify_all
+        self._replies.append((ready, reply))
+
+    # ---------- sisi FPGA -> host ----------
+    def _collect(self, now):
+        idx = 0
+        while idx < len(self._replies) and self._replies[idx][0] <= now:
+            self._rx.extend(self._replies[idx][1])
+            idx += 1
+        del self._replies[:idx]
+
+    @property
+    def in_waiting(self):
+        with self._lock:
+            self._collect(time.perf_counter())
+            return len(self._rx)
+
+    def read(self, size=1):
+        deadline = None if self.timeout is None else time.perf_counter() + self.timeout
+        with self._lock:
+            while True:
+                now = time.perf_counter()
+                self._collect(now)
+                if len(self._rx) >= size or (deadline is not None and now >= deadline):
+                    out = bytes(self._rx[:size])
+                    del self._rx[:size]
+                    return out
+                # Tidur sampai balasan berikutnya siap, ada write baru, atau timeout habis
+                wake = self._replies[0][0] if self._replies else deadline
+                if deadline is not None:
+                    wake = min(wake, deadline)
+                self._lock.wait(None if wake is None else max(0.0, wake - now))
+
+    def reset_input_buffer(self):
+        # Hanya buffer sisi host; byte setengah-word di "FPGA" (_pending) tetap ada
+        with self._lock:
+            self._rx.clear()
+            self._replies.clear()
+
+    def close(self):
+        self.is_open = False
+
+
+class UartModelSerial(LoopbackSerial):
+    """LoopbackSerial with the FPGA's UART timing modelled bit by bit.
+
+    The host sends at the true `baudrate`, the FPGA's UART_8_Bit counts
+    BIT_TIMER_LIMIT = clk_freq // baudrate cycles per bit, so the rounding
+    shows up the way it does on the board: each data bit is sampled at the
+    instant UART_8_Bit (or the host) would sample it, which corrupts bytes
+    once the drift over a frame gets too large. UART_16_Bit_System has no
+    FIFO: a reply whose tx_start arrives while the previous reply is still
+    being sent is dropped and counted in `lost`. Compute time per word
+    comes from fsm_model.simulate; `latency` is the extra USB/driver delay
+    before received bytes become readable. Timing is exact to about one
+    clock cycle (the 2-flop synchroniser phase is not modelled).
+    """
+
+    def __init__(self, port='UARTMODEL', baudrate=9600, timeout=1.0, latency=0.0,
+                 clk_freq=50000000, compute=golden_q88):
+        super().__init__(port, baudrate, timeout, latency, 10.0 / baudrate, compute)
+        from fsm_model import bit_timer_limit
+        self.clk_freq = clk_freq
+        self.bit_cycles = bit_timer_limit(clk_freq, baudrate)
+        self.lost = 0              # Balasan yang dibuang UART_16_Bit_System (TX masih sibuk)
+        self._host_line_free = 0.0 # Kapan TX host kosong lagi
+        self._rx_low = None        # Low byte yang sudah diterima FPGA
+        self._prev_word = 0        # rx_data_16 sebelumnya (seed_generator)
+        self._tx_free = 0.0        # Kapan UART_16_Bit_System TX kembali IDLE
+
+    def _sample(self, byte, sample_times, bit_period):
+        # Bit ke-k frame (0 = start, 1..8 = data LSB dulu, 9.. = stop/idle) pada setiap waktu sampel
+        out = 0
+        for i, t in enumerate(sample_times):
+            k = int(t // bit_period)
+            bit = 0 if k == 0 else ((byte >> (k - 1)) & 1 if k <= 8 else 1)
+            out |= bit << i
+        return out
+
+    def _fpga_receive(self, byte):
+        # UART_8_Bit RX: deteksi start (3 siklus), tengah bit BIT/2, lalu tiap BIT siklus
+        cyc, bit = 1.0 / self.clk_freq, self.bit_cycles
+        times = [(1 + bit // 2 + (i + 1) * bit) * cyc for i in range(8)]
+        return self._sample(byte, times, 1.0 / self.baudrate)
+
+    def _host_receive(self, byte):
+        # UART host: sampel di tengah setiap bit (1/baud), bit FPGA = BIT siklus
+        host_bit = 1.0 / self.baudrate
+        times = [(i + 1.5) * host_bit for i in range(8)]
+        return self._sample(byte, times, self.bit_cycles / self.clk_freq)
+
+    def write(self, data):
+        from fsm_model import simulate
+        now = time.perf_counter()
+        cyc, bit = 1.0 / self.clk_freq, self.bit_cycles
+        with self._lock:
+            for byte in bytes(data):
+                start = max(now, self._host_line_free)
+                self._host_line_free = start + 10.0 / self.baudrate
+                got = self._fpga_receive(byte)
+                if self._rx_low is None:
+                    self._rx_low = got
+                    continue
+                val = self._rx_low | (got << 8)
+                self._rx_low = None
+
+                # rx_valid satu siklus setelah rx_dv byte kedua (lihat fsm_model.wire_cycles)
+                rx_valid = start + (3 + bit // 2 + 9 * bit + 1) * cyc
+                cycles = simulate(val, self._prev_word)['TX_START_BIT']
+                self._prev_word = val
+                if rx_valid + (cycles - 3) * cyc < self._tx_free:
+                    self.lost += 1   # tx_start jatuh saat TX belum IDLE: diabaikan RTL
+                    continue
+
+                first = rx_valid + cycles * cyc             # Start bit byte rendah
+                second = first + (10 * bit + 2) * cyc       # Start bit byte tinggi
+                self._tx_free = second + (10 * bit + 1) * cyc
+                reply = self.compute(val)
+                self._emit(first + 10 * bit * cyc + self.latency, bytes([self._host_receive(reply & 0xFF)]))
+                self._emit(second + 10 * bit * cyc + self.latency, bytes([self._host_receive(reply >> 8)]))
+            self._lock.notify_all()
+        return len(data)
+
+
+class FaultySerial(LoopbackSerial):
+    """LoopbackSerial that drops, duplicates and delays bytes, and can go away.
+
+    Every byte in either direction is dropped with probability `drop` or
+    sent twice with probability `dup`; every reply byte is held back an
+    extra `delay_time` seconds with probability `delay` (and the bytes
+    behind it wait too, like a stalled USB transfer). After
+    `disconnect_after` written bytes every call raises OSError, the way
+    pyserial fails on an unplugged adapter, until a new port is opened.
+    Injected faults are counted in `faults`.
+    """
+
+    def __init__(self, port='FAULTY', baudrate=9600, timeout=1.0, latency=0.0, byte_time=0.0,
+                 compute=golden_q88, drop=0.0, dup=0.0, delay=0.0, delay_time=0.2,
+                 disconnect_after=None, seed=0):
+        super().__init__(port, baudrate, timeout, latency, byte_time, compute)
+        self._init_faults(drop, dup, delay, delay_time, disconnect_after, seed)
+
+    def _init_faults(self, drop, dup, delay, delay_time, disconnect_after, seed):
+        self.drop, self.dup, self.delay, self.delay_time = drop, dup, delay, delay_time
+        self.disconnect_after = disconnect_after
+        self.faults = {'dropped': 0, 'duplicated': 0, 'delayed': 0, 'disconnects': 0}
+        self._rng = random.Random(seed)
+        self._written = 0
+
+    def _mangle(self, data):
+        out = bytearray()
+        for byte in data:
+            r = self._rng.random()
+            if r < self.drop:
+                self.faults['dropped'] += 1
+                continue
+            out.append(byte)
+            if r < self.drop + self.dup:
+                out.append(byte)
+                self.faults['duplicated'] += 1
+        return bytes(out)
+
+    def _check(self):
+        if self.disconnect_after is not None and self._written >= self.disconnect_after:
+            if self.is_open:
+                self.faults['disconnects'] += 1
+                self.is_open = False
+            raise OSError(f"{self.port}: device disconnected")
+
+    def write(self, data):
+        self._check()
+        self._written += len(data)
+        super().write(self._mangle(data))
+        return len(data)
+
+    def _emit(self, ready, reply):
+        # Balasan per byte, dengan drop/dup/delay sendiri; masih di dalam _lock, jadi
+        # reader tidak pernah melihat balasan yang belum dirusak
+        for byte in self._mangle(reply):
+            if self._rng.random() < self.delay:
+                ready += self.delay_time
+                self.faults['delayed'] += 1
+            if self._replies:
+                ready = max(ready, self._replies[-1][0])  # Urutan byte tetap
+            self._replies.append((ready, bytes([byte])))
+
+    @property
+    def in_waiting(self):
+        self._check()
+        return LoopbackSerial.in_waiting.fget(self)
+
+    def read(self, size=1):
+        self._check()
+        return super().read(size)
+
+    def reset_input_buffer(self):
+        self._check()
+        super().reset_input_buffer()
+
+
+class FaultyUartModelSerial(FaultySerial, UartModelSerial):
+    """FaultySerial's faults on top of UartModelSerial's wire timing at the real baud rate."""
+
+    def __init__(self, port='FAULTYUART', baudrate=9600, timeout=1.0, latency=0.0, clk_freq=50000000,
+                 compute=golden_q88, drop=0.0, dup=0.0, delay=0.0, delay_time=0.2,
+                 disconnect_after=None, seed=0):
+        UartModelSerial.__init__(self, port, baudrate, timeout, latency, clk_freq, compute)
+        self._init_faults(drop, dup, delay, delay_time, disconnect_after, seed)
+
+
+def parse_faults(spec):
+    """FaultySerial keyword arguments from e.g. 'drop=0.001,dup=0.001,delay=0.001,disconnect=40000'."""
+    names = {'drop': 'drop', 'dup': 'dup', 'delay': 'delay', 'delay_time': 'delay_time',
+             'disconnect': 'disconnect_after', 'seed': 'seed'}
+    kwargs = {}
+    for part in filter(None, spec.split(',')):
+        key, _, value = part.partition('=')
+        if key not in names:
+            raise ValueError(f"Fault tidak dikenal: '{key}' (pilihan: {', '.join(names)})")
+        kwargs[names[key]] = int(value) if key in ('disconnect', 'seed') else float(value)
+    return kwargs
+
+
+def fake_opener(faults=None, uart_model=False, **kwargs):
+    """`opener(port, baud)` for transport.open_device that opens a fake board instead of pyserial.
+
+    With `faults` (a parse_faults spec or dict) every (re)opened port is a
+    FaultySerial with its own seed, else a LoopbackSerial. `uart_model`
+    swaps in the UartModelSerial variants, which run at the real `baud`.
+    """
+    if isinstance(faults, str):
+        faults = parse_faults(faults)
+    clean, faulty = (UartModelSerial, FaultyUartModelSerial) if uart_model else (LoopbackSerial, FaultySerial)
+    opened = []
+
+    def opener(port, baud):
+        if not faults:
+            return clean(port, baud, **kwargs)
+        options = dict(faults, **kwargs)
+        options['seed'] = options.get('seed', 0) + len(opened)
+        opened.append(faulty(port, baud, **options))
+        return opened[-1]
+
+    opener.opened = opened
+    return opener
@@ -0,0 +1,436 @@
+import asyncio
+import binascii
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import transport
+from fake_serial import LoopbackSerial, golden_q88
+from transport import READ_POLL, RETRIES, TIMEOUT, SqrtDevice
+
+# ================= FORMAT FRAME =================
+# | A5 5A | kind (1) | seq (1) | count (2, <H) | count x uint16 (<H) | CRC-16 (2, <H) |
+# CRC-16/CCITT-FALSE (poly 0x1021, init 0xFFFF) atas kind..payload.
+# Panjang frame selalu genap (8 + 2N), jadi UART_16_Bit_System yang belum
+# mengenal frame tidak pernah tertinggal setengah word saat deteksi.
+# ================================================
+SYNC = b'\xA5\x5A'
+HEADER = struct.Struct('<BBH')
+KIND_REQUEST = 0x01   # N input uint16 -> balasan KIND_REPLY dengan N Q8.8
+KIND_PING = 0x02      # Deteksi protokol -> KIND_PONG
+KIND_REPLY = 0x81
+KIND_PONG = 0x82
+KIND_NAK = 0xFF       # CRC salah di sisi endpoint; seq-nya hanya petunjuk (header bisa ikut rusak)
+PROTOCOL_VERSION = 1
+
+# ================= KONFIGURASI =================
+BATCH = 64            # Word per frame request
+WINDOW = 4            # Frame in flight sekaligus
+MAX_WORDS = 1024      # Count lebih besar = header rusak
+DETECT_TIMEOUT = 0.3  # Detik menunggu PONG sebelum fallback ke protokol 2 byte
+# ===============================================
+
+
+def crc16(data):
+    return binascii.crc_hqx(data, 0xFFFF)
+
+
+def encode_frame(kind, seq, words=()):
+    body = HEADER.pack(kind, seq & 0xFF, len(words)) + struct.pack(f'<{len(words)}H', *words)
+    return SYNC + body + struct.pack('<H', crc16(body))
+
+
+class FrameDecoder:
+    """Incremental decoder: feed() raw bytes, get back complete frames.
+
+    Returns (kind, seq, words, ok) tuples; ok=False marks a frame whose CRC
+    failed (kind/seq are then only a hint). After a bad CRC or an
+    impossible count the search restarts one byte after the sync word, so
+    a corrupt length can never swallow the frames behind it; when a sync
+    word follows right at the end of the bad frame, its length was fine
+    and the whole frame is skipped. A bad frame is reported once: a sync
+    word inside its span (A5 5A in the payload or CRC) that does not
+    decode either is part of the same failure, while a valid frame found
+    there is still returned.
+    """
+
+    def __init__(self, max_words=MAX_WORDS):
+        self.max_words = max_words
+        self.stats = {'frames': 0, 'crc_errors': 0, 'skipped_bytes': 0}
+        self._buf = bytearray()
+        self._claimed = 0   # Byte di awal _buf yang termasuk frame rusak yang sudah dilaporkan
+
+    def _drop(self, n, skipped=True):
+        if skipped:
+            self.stats['skipped_bytes'] += n
+        del self._buf[:n]
+        self._claimed = max(0, self._claimed - n)
+
+    def feed(self, data):
+        self._buf.extend(data)
+        frames = []
+        while True:
+            start = self._buf.find(SYNC)
+            if start < 0:
+                keep = 1 if self._buf[-1:] == SYNC[:1] else 0
+                self._drop(len(self._buf) - keep)
+                return frames
+            if start:
+                self._drop(start)
+            if len(self._buf) < 2 + HEADER.size:
+                return frames
+            kind, seq, count = HEADER.unpack_from(self._buf, 2)
+            if count > self.max_words:
+                self._drop(1)
+                continue
+            end = 2 + HEADER.size + 2 * count + 2
+            if len(self._buf) < end:
+                return frames
+            body = bytes(self._buf[2:end - 2])
+            (crc,) = struct.unpack_from('<H', self._buf, end - 2)
+            if crc != crc16(body):
+                if not self._claimed:
+                    self.stats['crc_errors'] += 1
+                    frames.append((kind, seq, (), False))
+                self._claimed = max(self._claimed, end)
+                if len(self._buf) < end + 2:
+                    return frames   # Sudah dilaporkan; byte sesudahnya menentukan ke mana lanjut
+                if self._buf[end:end + 2] == SYNC:
+                    self._drop(end)   # Frame berikut tepat di ujungnya: panjangnya benar, lompati seluruhnya
+                else:
+                    self._drop(1)
+                continue
+            words = struct.unpack_from(f'<{count}H', body, HEADER.size)
+            frames.append((kind, seq, words, True))
+            self.stats['frames'] += 1
+            self._drop(end, skipped=False)
+
+
+class ReferenceEndpoint(LoopbackSerial):
+    """Software device speaking the framed protocol, with the serial.Serial API.
+
+    Reference for a future framed RTL front-end and stand-in for it in
+    tests: REQUEST frames are answered with one REPLY frame (same seq, one
+    `compute` result per word), PING with PONG, a frame with a bad CRC
+    with NAK. Timing follows LoopbackSerial: a frame is complete after
+    len(frame) * byte_time, the reply is readable `latency` later plus its
+    own wire time.
+    """
+
+    def __init__(self, port='FRAMED', baudrate=9600, timeout=1.0, latency=0.0, byte_time=0.0,
+                 compute=golden_q88):
+        super().__init__(port, baudrate, timeout, latency, byte_time, compute)
+        self.decoder = FrameDecoder()
+
+    def write(self, data):
+        now = time.perf_counter()
+        with self._lock:
+            self._pending.extend(data)
+            consumed = len(self._pending)
+            frames = self.decoder.feed(bytes(self._pending))
+            self._pending.clear()
+            for kind, seq, words, ok in frames:
+                if not ok:
+                    reply = encode_frame(KIND_NAK, seq)
+                elif kind == KIND_REQUEST:
+                    reply = encode_frame(KIND_REPLY, seq, [self.compute(w) for w in words])
+                elif kind == KIND_PING:
+                    reply = encode_frame(KIND_PONG, seq, [PROTOCOL_VERSION])
+                else:
+                    continue
+                arrive = now + consumed * self.byte_time
+                ready = max(arrive + self.latency, self._line_free) + len(reply) * self.byte_time
+                self._line_free = ready
+                self._emit(ready, reply)
+            self._lock.notify_all()
+        return len(data)
+
+
+def detect_framed(ser, timeout=DETECT_TIMEOUT):
+    """True if the device on `ser` answers a PING frame with PONG.
+
+    A plain UART_16_Bit_System bitstream just sees 4 request words and
+    answers 8 bytes of sqrt; those are read and discarded here, so the
+    port is clean for the 2-byte protocol afterwards.
+    """
+    old_timeout = ser.timeout
+    ser.timeout = READ_POLL
+    try:
+        ser.reset_input_buffer()
+        ser.write(encode_frame(KIND_PING, 0))
+        decoder = FrameDecoder()
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            for kind, _, words, ok in decoder.feed(ser.read(max(1, ser.in_waiting))):
+                if ok and kind == KIND_PONG:
+                    return True
+        ser.reset_input_buffer()
+        return False
+    finally:
+        ser.timeout = old_timeout
+
+
+class _Nak(Exception):
+    pass
+
+
+class _Skipped(Exception):
+    # Frame yang lebih baru sudah dijawab: frame ini hilang di jalan
+    pass
+
+
+class FramedDevice:
+    """Asyncio client for the framed batch protocol; same API as transport.SqrtDevice.
+
+    Values go out in frames of `batch` words with up to `window` frames in
+    flight. Replies are matched by sequence number, not by arrival order,
+    so a lost or corrupt frame costs only that batch: it is re-sent (with
+    a fresh seq) after a NAK, a timeout or a wrong word count, up to
+    `retries` times, while the rest of the sweep keeps running.
+
+    The endpoint answers frames in the order it received them, so a NAK
+    belongs to the oldest unanswered frame of the window; the seq the NAK
+    echoes came from a header that failed its CRC and is not used. A
+    valid REPLY likewise means every older unanswered frame never reached
+    the endpoint, and those are re-sent without waiting for the timeout.
+    If the port fails, it is replaced by `reopen()` like in SqrtDevice; an
+    optional `tracer` gets one record per word (the frame's timestamps).
+    """
+
+    def __init__(self, ser, batch=BATCH, window=WINDOW, timeout=TIMEOUT, retries=RETRIES, tracer=None,
+                 reopen=None):
+        self.ser = ser
+        self.batch = max(1, batch)
+        self.window = max(1, window)
+        self.timeout = timeout
+        self.retries = retries
+        self.tracer = tracer
+        self.reopen = reopen
+        self.failed = []
+        self.stats = {'frames': 0, 'timeouts': 0, 'naks': 0, 'skipped': 0, 'retries': 0, 'reopens': 0}
+        self.decoder = FrameDecoder()
+        self._port_lost = False  # Di-set thread reader/writer saat port error
+
+        self._inflight = {}   # seq -> future, urut waktu kirim (window)
+        self._seq = 0
+        self._writer = ThreadPoolExecutor(max_workers=1)
+        self._stop = threading.Event()
+        self._reader = None
+
+    # ---------------- lifecycle ----------------
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._slots = asyncio.Semaphore(self.window)
+        self._reopen_lock = asyncio.Lock()
+        self._start_reader()
+        return self
+
+    def _start_reader(self):
+        self.ser.timeout = READ_POLL
+        self._reader = threading.Thread(target=self._read_loop, args=(self.ser,), daemon=True)
+        self._reader.start()
+
+    async def close(self):
+        self._stop.set()
+        if self._reader is not None:
+            await self._loop.run_in_executor(None, self._reader.join)
+        self._writer.shutdown(wait=True)
+        if self.ser is not None:  # None: port hilang dan gagal dibuka ulang
+            self.ser.close()
+
+    async def __aenter__(self):
+        return self if self._reader is not None else await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # ---------------- I/O ----------------
+    def _read_loop(self, ser):
+        # Satu thread per port: berhenti kalau port diganti (_reopen) atau error
+        while not self._stop.is_set() and ser is self.ser:
+            try:
+                data = ser.read(max(1, ser.in_waiting))
+            except Exception:
+                if not self._stop.is_set():
+                    self._port_lost = True  # Port error/dicabut; _reopen membuka ulang
+                break
+            if data:
+                self._loop.call_soon_threadsafe(self._on_bytes, data, time.perf_counter_ns())
+
+    def _write(self, data):
+        try:
+            return self.ser.write(data)
+        except Exception:
+            self._port_lost = True  # Frame hilang; timeout -> _reopen
+            return 0
+
+    def _outstanding(self):
+        return [fut for fut in self._inflight.values() if not fut.done()]
+
+    def _on_bytes(self, data, t_ns=0):
+        for kind, seq, words, ok in self.decoder.feed(data):
+            if not ok:
+                continue  # Frame rusak: seq-nya tidak bisa dipercaya, tunggu timeout
+            if kind == KIND_NAK:
+                # Seq di NAK berasal dari header yang gagal CRC; endpoint menjawab
+                # berurutan, jadi NAK ini milik frame tertua yang belum dijawab
+                outstanding = self._outstanding()
+                if outstanding:
+                    outstanding[0].set_exception(_Nak())
+            elif kind == KIND_REPLY:
+                fut = self._inflight.get(seq)
+                if fut is None or fut.done():
+                    continue  # Balasan terlambat dari attempt lama
+                for older in self._outstanding():
+                    if older is fut:
+                        break
+                    older.set_exception(_Skipped())  # Tidak pernah sampai ke endpoint
+                if self.tracer is not None:
+                    for rid in fut.trace_ids:
+                        self.tracer.received(rid, t_ns, t_ns)  # Waktu per frame, bukan per word
+                fut.set_result(words)
+
+    def _next_seq(self):
+        while self._seq in self._inflight:
+            self._seq = (self._seq + 1) & 0xFF
+        seq, self._seq = self._seq, (self._seq + 1) & 0xFF
+        return seq
+
+    async def _send_frame(self, values):
+        async with self._slots:
+            seq = self._next_seq()
+            fut = self._loop.create_future()
+            fut.trace_ids = self.tracer.begin(values) if self.tracer is not None else ()
+            self._inflight[seq] = fut
+            try:
+                await self._loop.run_in_executor(self._writer, self._write,
+                                                  encode_frame(KIND_REQUEST, seq, values))
+                if self.tracer is not None:
+                    self.tracer.written(fut.trace_ids, time.perf_counter_ns())
+                self.stats['frames'] += 1
+                return await asyncio.wait_for(fut, self.timeout)
+            finally:
+                del self._inflight[seq]
+
+    async def _reopen(self):
+        """Replace a failed port with a fresh one from `reopen()`; False if every attempt fails."""
+        async with self._reopen_lock:
+            if not self._port_lost:
+                return True  # Sudah dibuka ulang oleh batch lain
+            if self.reopen is None:
+                return False
+            old, old_reader = self.ser, self._reader
+            self.ser = None  # Thread reader lama berhenti (ser is not self.ser)
+            if old is not None:
+                try:
+                    await self._loop.run_in_executor(self._writer, old.close)
+                except Exception:
+                    pass
+                await self._loop.run_in_executor(None, old_reader.join)
+            # Jumlah percobaan, jeda dan settle sama dengan SqrtDevice (KONFIGURASI transport.py)
+            for _ in range(transport.REOPEN_ATTEMPTS):
+                try:
+                    ser = await self._loop.run_in_executor(None, self.reopen)
+                except Exception:
+                    await asyncio.sleep(transport.REOPEN_DELAY)  # Port belum muncul lagi
+                    continue
+                self.stats['reopens'] += 1
+                self.decoder = FrameDecoder()   # Sisa frame setengah jadi dari port lama
+                self.ser = ser
+                self._port_lost = False
+                self._start_reader()
+                await asyncio.sleep(transport.SETTLE_TIME)
+                return True
+            return False
+
+    # ---------------- API ----------------
+    async def _run_batch(self, values):
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.stats['retries'] += 1
+            try:
+                words = await self._send_frame(values)
+                if len(words) == len(values):
+                    return list(words)
+            except asyncio.TimeoutError:
+                self.stats['timeouts'] += 1
+                if self._port_lost:
+                    await self._reopen()
+            except _Nak:
+                self.stats['naks'] += 1
+            except _Skipped:
+                self.stats['skipped'] += 1
+        self.failed.extend(values)
+        return [None] * len(values)
+
+    async def sqrt(self, value):
+        return (await self._run_batch([value]))[0]
+
+    async def sqrt_many(self, values, progress=None):
+        """Q8.8 results for `values` in order; None marks vectors whose batch failed all retries."""
+        values = list(values)
+        results = [None] * len(values)
+        done = 0
+
+        async def one(start):
+            nonlocal done
+            chunk = values[start:start + self.batch]
+            results[start:start + len(chunk)] = await self._run_batch(chunk)
+            done += len(chunk)
+            if progress is not None:
+                progress(done, len(values))
+
+        await asyncio.gather(*(one(start) for start in range(0, len(values), self.batch)))
+        return results
+
+
+async def start_device(ser, depth=None, timeout=TIMEOUT, retries=RETRIES, detect_timeout=DETECT_TIMEOUT):
+    """FramedDevice if the endpoint speaks the framed protocol, else the 2-byte SqrtDevice.
+
+    For a real port use transport.open_device(..., protocol='auto'), which
+    also settles the board and can re-open the port.
+    """
+    loop = asyncio.get_running_loop()
+    if await loop.run_in_executor(None, detect_framed, ser, detect_timeout):
+        return await FramedDevice(ser, timeout=timeout, retries=retries).start()
+    kwargs = {} if depth is None else {'depth': depth}
+    return await SqrtDevice(ser, timeout=timeout, retries=retries, **kwargs).start()
+
+
+async def _demo(n_vectors):
+    # Framed (ReferenceEndpoint) vs 2 byte (LoopbackSerial), dengan delay USB yang sama
+    from golden_model import reply_table
+
+    table = reply_table()
+    values = list(range(1, n_vectors + 1))
+    for ser in (ReferenceEndpoint(latency=0.001), LoopbackSerial(latency=0.001)):
+        async with await start_device(ser) as dev:
+            t0 = time.perf_counter()
+            replies = await dev.sqrt_many(values)
+            elapsed = time.perf_counter() - t0
+        errors = sum(r != table[v] for v, r in zip(values, replies))
+        print(f"{type(dev).__name__:<12s} on {type(ser).__name__:<17s}: {n_vectors} vectors in {elapsed:.2f} s "
+              f"({n_vectors / elapsed:.0f} ops/sec), {errors} mismatches, stats {dev.stats}")
+
+    # Frame rusak: endpoint membalas NAK, client mengirim ulang batch itu saja
+    endpoint = ReferenceEndpoint()
+    async with FramedDevice(endpoint, timeout=0.2) as dev:
+        original_write = endpoint.write
+        corrupted = []
+
+        def flaky_write(data):
+            if not corrupted:
+                corrupted.append(True)
+                data = data[:10] + bytes([data[10] ^ 0xFF]) + data[11:]
+            return original_write(data)
+
+        endpoint.write = flaky_write
+        replies = await dev.sqrt_many(values[:1000])
+    errors = sum(r != table[v] for v, r in zip(values, replies))
+    print(f"Corrupt frame: {errors} mismatches, stats {dev.stats}")
+
+
+if __name__ == "__main__":
+    asyncio.run(_demo(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
@@ -0,0 +1,186 @@
+import sys
+import time
+
+import numpy as np
+
+# ================= KONFIGURASI =================
+CLK_FREQ = 50000000   # top_squarerootdigital_uart.vhd: generic CLK_FREQ
+BAUD_RATE = 9600      # top_squarerootdigital_uart.vhd: generic BAUD_RATE
+MAX_CYCLES = 1000     # Batas aman simulasi (FSM macet = bug model/RTL)
+# ===============================================
+
+
+def bit_timer_limit(clk_freq=CLK_FREQ, baud=BAUD_RATE):
+    # UART_8_Bit.vhd: BIT_TIMER_LIMIT = CLK_FREQ / BAUD_RATE (pembagian integer)
+    return clk_freq // baud
+
+
+def simulate(value, prev_value, gs_iterations=3):
+    """Step the control path of one request, one rising edge at a time.
+
+    Edge 0 is the edge where UART_16_Bit_System raises rx_valid with
+    `value` on rx_data_16; `prev_value` is what rx_data_16 held before
+    (seed_generator only re-asserts `ready` after its input changes).
+    Models the squarerootdigital master FSM, seed_generator's ready flag,
+    goldschmidt IDLE/INIT/CALC/DONE, the nr_polisher and post_processor
+    done flags, and the TX side of UART_16_Bit_System / UART_8_Bit up to
+    the start bit. `gs_iterations` is the number of goldschmidt CALC
+    cycles (RTL: count 0..2 = 3). Returns {phase: edge} for every master FSM state entry
+    plus 'TX_START_BIT', the edge that drives the first start bit low.
+    """
+    value &= 0xFFFF
+    rx_valid = 1
+    state, div_start, pol_start, post_start, tx_start = 'IDLE', 0, 0, 0, 0
+    ready, last_input = 1, prev_value & 0xFFFF   # Input lama sudah stabil lama
+    gs_state, count, finish = 'IDLE', 0, 0
+    pol_done = post_done = 0
+    tx16_state, u8_start = 'IDLE', 0
+    tx8_state, tx_busy, tx_pin = 'IDLE', 0, 1
+
+    stamps = {'RX_VALID': 0}
+    edge = 0
+    while tx_pin == 1:
+        edge += 1
+        if edge > MAX_CYCLES:
+            raise RuntimeError(f"FSM tidak selesai dalam {MAX_CYCLES} siklus (input {value})")
+
+        # squarerootdigital.vhd: MASTER FSM
+        n_state, n_div, n_pol, n_post, n_tx = state, div_start, pol_start, post_start, tx_start
+        if state == 'IDLE':
+            n_tx = 0
+            if rx_valid:
+                n_state = 'SEND' if value == 0 else 'PRE_PROC'
+        elif state == 'PRE_PROC':
+            if ready:
+                n_div, n_state = 1, 'DIVIDE'
+        elif state == 'DIVIDE':
+            n_div = 0
+            if finish:
+                n_pol, n_state = 1, 'POLISH'
+        elif state == 'POLISH':
+            n_pol = 0
+            if pol_done:
+                n_post, n_state = 1, 'POST_PROC'
+        elif state == 'POST_PROC':
+            n_post = 0
+            if post_done:
+                n_state = 'SEND'
+        elif state == 'SEND':
+            n_tx, n_state = 1, 'IDLE'
+
+        # seed_generator.vhd: ready turun satu siklus setiap input berubah
+        if value != last_input:
+            n_ready, last_input = 0, value   # last_input = variable (langsung)
+        else:
+            n_ready = 1
+
+        # goldschmidt.vhd
+        n_gs, n_count, n_finish = gs_state, count, finish
+        if gs_state == 'IDLE':
+            n_finish = 0
+            if div_start:
+                n_gs = 'INIT'
+        elif gs_state == 'INIT':
+            n_count, n_gs = 0, 'CALC'
+        elif gs_state == 'CALC':
+            if count == gs_iterations - 1:
+                n_gs = 'DONE'
+            else:
+                n_count = count + 1
+        elif gs_state == 'DONE':
+            n_finish, n_gs = 1, 'IDLE'
+
+        # nr_polisher.vhd / post_processor.vhd: done = start tertunda satu siklus
+        n_pol_done = 1 if pol_start else 0
+        n_post_done = 1 if post_start else 0
+
+        # UART_16_Bit_System.vhd: TX low byte
+        n_tx16, n_u8_start = tx16_state, u8_start
+        if tx16_state == 'IDLE':
+            if tx_start:
+                n_u8_start, n_tx16 = 1, 'SEND_LOW'
+        elif tx16_state == 'SEND_LOW':
+            n_u8_start = 0
+            if tx_busy:
+                n_tx16 = 'WAIT_LOW'
+
+        # UART_8_Bit.vhd: TX sampai start bit
+        n_tx8, n_busy, n_pin = tx8_state, tx_busy, tx_pin
+        if tx8_state == 'IDLE':
+            n_pin = 1
+            if u8_start:
+                n_tx8, n_busy = 'START', 1
+        elif tx8_state == 'START':
+            n_pin = 0
+
+        if n_state != state:
+            stamps.setdefault(n_state, edge)
+        rx_valid = 0  # Pulse satu siklus
+        state, div_start, pol_start, post_start, tx_start = n_state, n_div, n_pol, n_post, n_tx
+        ready = n_ready
+        gs_state, count, finish = n_gs, n_count, n_finish
+        pol_done, post_done = n_pol_done, n_post_done
+        tx16_state, u8_start = n_tx16, n_u8_start
+        tx8_state, tx_busy, tx_pin = n_tx8, n_busy, n_pin
+
+    stamps['TX_START_BIT'] = edge
+    return stamps
+
+
+def compute_cycles(values, prev=None):
+    """Clock cycles from rx_valid to the reply's start bit, per input.
+
+    `prev` gives the previous rx_data_16 word for each input; by default the
+    inputs are taken as one sweep in order (the first follows power-up 0).
+    Every input is stepped through `simulate`; the result is a uint32 array.
+    """
+    values = np.asarray(values, dtype=np.int64) & 0xFFFF
+    if prev is None:
+        prev = np.concatenate(([0], values[:-1]))
+    prev = np.asarray(prev, dtype=np.int64) & 0xFFFF
+    return np.fromiter((simulate(v, p)['TX_START_BIT'] for v, p in zip(values.tolist(), prev.tolist())),
+                       dtype=np.uint32, count=len(values))
+
+
+def wire_cycles(clk_freq=CLK_FREQ, baud=BAUD_RATE):
+    """UART cycles of one transaction, from UART_8_Bit / UART_16_Bit_System.
+
+    'rx': host start bit of the low byte -> rx_valid, with the host sending
+    both bytes back to back at the true baud (10 bits each) and the FPGA
+    needing 2 sync flops + 1 IDLE edge + BIT/2 (start) + 8 BIT (data) +
+    BIT (stop) for the high byte, then one edge in UART_16_Bit_System.
+    'tx': first start bit -> end of the second stop bit; each byte is
+    10 BIT and UART_16_Bit_System needs 2 edges to hand the high byte over.
+    """
+    bit = bit_timer_limit(clk_freq, baud)
+    host_bit = clk_freq / baud
+    rx = 10 * host_bit + 3 + bit // 2 + 9 * bit + 1
+    tx = 2 * 10 * bit + 2
+    return {'rx': rx, 'tx': tx, 'bit': bit}
+
+
+def predict_latency_ns(values, clk_freq=CLK_FREQ, baud=BAUD_RATE, prev=None):
+    """(compute_ns per input, constant UART wire ns) for a sweep over `values`."""
+    period_ns = 1e9 / clk_freq
+    wire = wire_cycles(clk_freq, baud)
+    return compute_cycles(values, prev) * period_ns, (wire['rx'] + wire['tx']) * period_ns
+
+
+if __name__ == "__main__":
+    # python fsm_model.py [baud]  -> prediksi latency sweep 0..65535
+    baud = int(sys.argv[1]) if len(sys.argv) > 1 else BAUD_RATE
+    domain = np.arange(65536)
+
+    t0 = time.perf_counter()
+    cycles = compute_cycles(domain)
+    elapsed = time.perf_counter() - t0
+
+    period_ns = 1e9 / CLK_FREQ
+    wire = wire_cycles(CLK_FREQ, baud)
+    print(f"FSM model: 65536 inputs in {elapsed:.2f} s")
+    print(f"Phases (input 2, sebelumnya 1): {simulate(2, 1)}")
+    for n_cycles, n_inputs in zip(*np.unique(cycles, return_counts=True)):
+        print(f"   {int(n_cycles):3d} cycles = {n_cycles * period_ns / 1e3:.2f} us  ({n_inputs} inputs)")
+    print(f"UART @ {baud} baud (BIT_TIMER_LIMIT = {wire['bit']}):")
+    print(f"   RX 2 byte : {wire['rx'] * period_ns / 1e6:.3f} ms")
+    print(f"   TX 2 byte : {wire['tx'] * period_ns / 1e6:.3f} ms")
@@ -1,37 +1,92 @@
+import asyncio
 import csv
 import serial
-import struct
 import time
 import math
 import sys
 
+import numpy as np
+
+from golden_model import sqrt_q88
+from result_format import save_results
+from sweep_cache import BLOCK_SIZE, SweepCache, build_hash, run_cached, sweep_cached
+from sweep_planner import SweepPlanner
+from transport import open_device, serial_opener
+from vector_source import from_spec
+
 # ================= KONFIGURASI =================
 PORT_NAME = 'COM6'   # Ganti dengan COM Port FPGA kamu
 BAUD_RATE = 9600     # Harus sama dengan VHDL
-INPUT_FILE = 'input_vectors.csv'
-OUTPUT_FILE = 'test_results.csv'
+INPUT_SOURCE = 'range:1:65536'   # Spec vector_source.py, mis. 'shuffle:1:65536', 'corners', 'file:input_vectors.csv'
+RESULT_DIR = 'test_results'      # Hasil binary (kolom .npy, lihat result_format.py)
+OUTPUT_FILE = 'test_results.csv' # Export CSV opsional
+EXPORT_CSV = False
+PIPELINE_DEPTH = 1   # Request in-flight (1 = mode lama write -> read per data); > 1 pakai jeda antar word (pipelined_io.safe_pacing)
+GOLDEN_LSB_TOLERANCE = 0  # Selisih maksimum vs golden model (0 = bit-exact)
+SWEEP_MODE = 'full'  # 'full' = semua 65535 input, 'quick' = sampling strata + adaptif (sweep_planner.py)
+CHECKPOINT_EVERY = BLOCK_SIZE  # Vector per checkpoint ke cache (jalankan ulang / --resume melanjutkan dari sini)
+TIMEOUT = 1.0        # Detik menunggu satu balasan sebelum resync
+RETRIES = 3          # Kirim ulang maksimal per vector; yang tetap gagal dicatat di cache (failures.npy)
+SERIAL_OPENER = serial_opener  # (port, baud) -> serial; fake_serial.fake_opener() untuk uji tanpa board
+FAULTS = None        # Spec fake_serial.parse_faults dari board palsu (hanya dicatat di checkpoint)
+PROTOCOL = 'uart16'  # 'framed' = batch + CRC (framed_protocol.py), 'auto' = deteksi via PING
+CACHE_DIR = 'sweep_cache'      # Folder cache + checkpoint.json (board palsu: folder lain)
 # ===============================================
 
-def generate_csv_input():
-    print(f"[1/3] Membuat file input {INPUT_FILE}...")
-    with open(INPUT_FILE, mode='w', newline='') as file:
-        writer = csv.writer(file)
-        writer.writerow(['decimal_input'])  # Header
-        
-        # Loop dari 1 sampai 65535 (Max 16-bit unsigned)
-        # Catatan: 2^16 = 65536, tapi max value 16-bit adalah 65535.
-        for i in range(1, 65536): 
-            writer.writerow([i])
-    print("      Selesai! File input siap.")
-
 def run_fpga_test():
-    print(f"[2/3] Membuka koneksi ke {PORT_NAME}...")
-    
-    try:
-        ser = serial.Serial(PORT_NAME, BAUD_RATE, timeout=1)
-        time.sleep(2)  # Tunggu FPGA reset (jika ada auto-reset)
-        
-        # Siapkan file output
+    # Vector dibuat lazy per blok (tanpa CSV input); default 1 sampai 65535
+    values = from_spec(INPUT_SOURCE)
+    print(f"[1/3] Sumber input: {values.name} ({len(values)} data)")
+    total_tests = len(values)
+
+    # Cache hasil per bitstream & baud: vector yang sudah pernah dijawab tidak dikirim ulang
+    cache = SweepCache(build_hash(), BAUD_RATE, CACHE_DIR)
+    todo = cache.missing(values)
+    start_time = time.time()
+
+    if len(todo) == 0:
+        print(f"[2/3] Semua {total_tests} data sudah ada di cache '{cache.path}', FPGA tidak diakses.")
+    else:
+        print(f"[2/3] Membuka koneksi ke {PORT_NAME}...")
+        print(f"[3/3] Memulai pengujian untuk {len(todo)} data ({total_tests - len(todo)} dari cache)...")
+        print("      (Estimasi waktu @9600 baud: ~5-10 menit)")
+
+        # 1-3. Kirim blok data & baca balasan secara pipelined (transport.py:
+        #      timeout -> resync & retry), checkpoint ke cache per blok
+        # Port hilang / FPGA diam -> port dibuka ulang & resync otomatis (transport.py)
+        checkpoint = {'task': 'sweep', 'port': PORT_NAME, 'baud': BAUD_RATE, 'source': INPUT_SOURCE,
+                      'depth': PIPELINE_DEPTH, 'tol': GOLDEN_LSB_TOLERANCE, 'out': RESULT_DIR,
+                      'checkpoint_every': CHECKPOINT_EVERY, 'timeout': TIMEOUT, 'retries': RETRIES,
+                      'csv': OUTPUT_FILE if EXPORT_CSV else None, 'protocol': PROTOCOL, 'faults': FAULTS}
+        try:
+            complete = run_cached(
+                PORT_NAME, BAUD_RATE, cache, values, depth=PIPELINE_DEPTH, block=CHECKPOINT_EVERY,
+                timeout=TIMEOUT, retries=RETRIES, opener=SERIAL_OPENER, checkpoint=checkpoint, protocol=PROTOCOL,
+                progress=lambda done, total: print(f"      Progress: {done}/{total} data diproses...")
+            )
+        except serial.SerialException:
+            print(f"ERROR: Tidak bisa membuka port {PORT_NAME}. Pastikan tidak sedang dipakai aplikasi lain.")
+            return
+
+        if not complete:
+            failed = cache.missing(values)
+            print(f"      TIMEOUT: {len(failed)} data gagal setelah retry (mis. input {failed[0]}). Cek kabel/FPGA.")
+            print("      Jalankan ulang (atau sqrt_cli.py sweep --resume) untuk mengirim ulang data yang gagal saja.")
+
+    # Siapkan file output dari isi cache
+    values = values.values()
+    failed = values[~cache.done[values] & (cache.failures[values] > 0)]
+    values = values[cache.done[values]]
+    replies = cache.replies[values]
+    golden = sqrt_q88(values)   # Golden model bit-exact untuk semua input sekaligus
+    pass_count = int(np.count_nonzero(np.abs(replies.astype(np.int64) - golden) <= GOLDEN_LSB_TOLERANCE))
+
+    # Input yang gagal semua retry ikut dicatat di meta.json hasil
+    save_results(RESULT_DIR, values, replies, build_id=cache.build_id, baud=BAUD_RATE,
+                 failed_inputs=failed.tolist())
+
+    # Export CSV (opsional, format lama)
+    if EXPORT_CSV:
         with open(OUTPUT_FILE, mode='w', newline='') as outfile:
             writer = csv.writer(outfile)
             # Tulis Header Output
@@ -42,71 +97,85 @@ def run_fpga_test():
                 'fpga_result_q88', 
                 'expected_sqrt', 
                 'error_diff',
+                'golden_hex',
                 'status'
             ])
-            
-            # Baca file input yang tadi dibuat
-            with open(INPUT_FILE, mode='r') as infile:
-                reader = csv.DictReader(infile)
-                rows = list(reader)
-                total_tests = len(rows)
-                
-                print(f"[3/3] Memulai pengujian untuk {total_tests} data...")
-                print("      (Estimasi waktu @9600 baud: ~5-10 menit)")
-                
-                start_time = time.time()
-                
-                for idx, row in enumerate(rows):
-                    val = int(row['decimal_input'])
-                    
-                    # 1. Packing data (Little Endian <H)
-                    data_to_send = struct.pack('<H', val)
-                    
-                    # 2. Kirim ke FPGA
-                    ser.write(data_to_send)
-                    
-                    # 3. Baca Balasan (2 Byte)
-                    response = ser.read(2)
-                    
-                    if len(response) == 2:
-                        # Unpacking Q8.8 dari FPGA
-                        raw_val = struct.unpack('<H', response)[0] # Hasil mentah (misal 0x1000)
-                        fpga_float = raw_val / 256.0               # Hasil konversi (misal 16.0)
-                        
-                        # Hitung nilai asli (Golden Reference)
-                        expected_float = math.sqrt(val)
-                        
-                        # Hitung Error
-                        diff = abs(fpga_float - expected_float)
-                        status = 'PASS' if diff < 0.1 else 'FAIL' # Toleransi error kecil
-                        
-                        # Tulis ke CSV
-                        writer.writerow([
-                            val, 
-                            f"0x{val:04X}", 
-                            f"0x{raw_val:04X}", 
-                            f"{fpga_float:.4f}", 
-                            f"{expected_float:.4f}", 
-                            f"{diff:.6f}",
-                            status
-                        ])
-                        
-                        # Tampilkan progres setiap 1000 data
-                        if (idx + 1) % 1000 == 0:
-                            print(f"      Progress: {idx + 1}/{total_tests} data diproses...")
-                            
-                    else:
-                        print(f"      TIMEOUT pada input: {val}. Cek kabel/FPGA.")
-                        break
-
-        duration = time.time() - start_time
-        print(f"\n[SELESAI] Semua data tersimpan di '{OUTPUT_FILE}'.")
-        print(f"          Waktu eksekusi: {duration:.2f} detik.")
-        ser.close()
 
+            for val, raw_val, golden_val in zip(values.tolist(), replies.tolist(), golden.tolist()):
+                # Unpacking Q8.8 dari FPGA
+                fpga_float = raw_val / 256.0               # Hasil konversi (misal 16.0)
+
+                # Hitung nilai asli (Referensi matematis)
+                expected_float = math.sqrt(val)
+
+                # Hitung Error
+                diff = abs(fpga_float - expected_float)
+                # PASS hanya jika sama dengan golden model (bukan toleransi 0.1)
+                status = 'PASS' if abs(raw_val - golden_val) <= GOLDEN_LSB_TOLERANCE else 'FAIL'
+
+                # Tulis ke CSV
+                writer.writerow([
+                    val,
+                    f"0x{val:04X}",
+                    f"0x{raw_val:04X}",
+                    f"{fpga_float:.4f}",
+                    f"{expected_float:.4f}",
+                    f"{diff:.6f}",
+                    f"0x{golden_val:04X}",
+                    status
+                ])
+
+    duration = time.time() - start_time
+    print(f"\n[SELESAI] {pass_count}/{len(values)} PASS. Hasil tersimpan di '{RESULT_DIR}'"
+          + (f" dan '{OUTPUT_FILE}'." if EXPORT_CSV else "."))
+    if len(failed):
+        print(f"          {len(failed)} input gagal setelah {RETRIES} retry: {failed[:10].tolist()}"
+              + (" ..." if len(failed) > 10 else ""))
+    print(f"          Waktu eksekusi: {duration:.2f} detik.")
+
+async def quick_sweep(cache):
+    # Planner memilih batch; yang sudah ada di cache tidak dikirim ulang
+    planner = SweepPlanner()
+    async with await open_device(PORT_NAME, BAUD_RATE, depth=PIPELINE_DEPTH, timeout=TIMEOUT,
+                                 retries=RETRIES, opener=SERIAL_OPENER, protocol=PROTOCOL) as dev:
+        while (batch := planner.next_batch()) is not None:
+            await sweep_cached(dev, cache, batch)
+            answered = batch[cache.done[batch]]
+            planner.add_results(answered, cache.replies[answered])
+            est = planner.history[-1]
+            print(f"      Ronde {est['round']}: {est['vectors']} data, SQNR {est['sqnr_db']:.2f} dB "
+                  f"[{est['sqnr_low_db']:.2f}, {est['sqnr_high_db']:.2f}], max {est['max_error_lsb']:.2f} LSB")
+    return planner
+
+
+def run_quick_test():
+    print(f"[1/2] Quick regression (sampling) di {PORT_NAME}...")
+    cache = SweepCache(build_hash(), BAUD_RATE, CACHE_DIR)
+    start_time = time.time()
+    try:
+        planner = asyncio.run(quick_sweep(cache))
     except serial.SerialException:
         print(f"ERROR: Tidak bisa membuka port {PORT_NAME}. Pastikan tidak sedang dipakai aplikasi lain.")
+        return
+
+    values = np.flatnonzero(planner.answered)
+    replies = cache.replies[values]
+    pass_count = int(np.count_nonzero(np.abs(replies.astype(np.int64) - sqrt_q88(values)) <= GOLDEN_LSB_TOLERANCE))
+    est = planner.history[-1]
+    save_results(RESULT_DIR, values, replies, build_id=cache.build_id, baud=BAUD_RATE,
+                 mode='quick', sqnr_db=est['sqnr_db'], sqnr_low_db=est['sqnr_low_db'],
+                 sqnr_high_db=est['sqnr_high_db'])
+
+    print(f"[2/2] {pass_count}/{len(values)} PASS vs golden model. Hasil tersimpan di '{RESULT_DIR}'.")
+    print(f"      Cakupan: NR ROM {est['nr_covered']}, GS ROM {est['gs_covered']}, shift {est['shifts_covered']}")
+    print(f"      SQNR {est['sqnr_db']:.2f} dB (95%: {est['sqnr_low_db']:.2f} - {est['sqnr_high_db']:.2f}), "
+          f"max error {est['max_error_lsb']:.2f} LSB "
+          f"(<= {100 * est['exceed_fraction']:.2f}% input bisa melebihi, 95%)")
+    print(f"      Waktu eksekusi: {time.time() - start_time:.2f} detik.")
+
 
 if __name__ == "__main__":
-    generate_csv_input()
-    run_fpga_test()
\ No newline at end of file
+    if SWEEP_MODE == 'quick':
+        run_quick_test()
+    else:
+        run_fpga_test()
\ No newline at end of file
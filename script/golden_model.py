@@ -0,0 +1,137 @@
+import os
+import re
+import sys
+
+import numpy as np
+
+# ================= KONFIGURASI =================
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+NR_LUT_FILE = 'nr_initial_guess.vhd'
+GS_LUT_FILE = 'gs_initial_guess.vhd'
+# ===============================================
+
+# Konstanta RTL (lihat src/*.vhd)
+NORM_MSB = 30                   # msb_detector menargetkan bit 30 (Q2.30 [1.0, 2.0))
+TWO_Q230 = 0x80000000           # goldschmidt.vhd: TWO_Q16
+GS_ITERATIONS = 3               # goldschmidt.vhd: count 0..2 di state CALC
+ODD_SHIFT_CORRECTION = 181      # post_processor.vhd: 1/sqrt(2) ~ 181/256
+MASK_32 = 0xFFFFFFFF
+
+
+def _parse_nr_lut(text, size=1024):
+    # nr_initial_guess.vhd: "    12 => x"405FB86B","
+    entries = re.findall(r'(\d+)\s*=>\s*x"([0-9A-Fa-f]{8})"', text)
+    table = np.zeros(size, dtype=np.int64)
+    for idx, word in entries:
+        table[int(idx)] = int(word, 16)
+    return table
+
+
+def _parse_gs_lut(text, size=256):
+    # gs_initial_guess.vhd: "when x"0C" => guess_out <= x"3D226357";" (lut_gen: juga "when "0001100" => ...")
+    entries = re.findall(r'when\s+(?:x"([0-9A-Fa-f]+)"|"([01]+)")\s*=>\s*guess_out\s*<=\s*x"([0-9A-Fa-f]{8})"', text)
+    table = np.zeros(size, dtype=np.int64)
+    for hex_addr, bin_addr, word in entries:
+        table[int(hex_addr, 16) if hex_addr else int(bin_addr, 2)] = int(word, 16)
+    return table
+
+
+def load_luts(src_dir=SRC_DIR):
+    """Read the NR (1024 x Q2.30) and GS (256 x Q2.30) ROMs straight from the RTL."""
+    with open(os.path.join(src_dir, NR_LUT_FILE)) as f:
+        nr_lut = _parse_nr_lut(f.read())
+    with open(os.path.join(src_dir, GS_LUT_FILE)) as f:
+        gs_lut = _parse_gs_lut(f.read())
+    return nr_lut, gs_lut
+
+
+_LUTS = None
+
+
+def _luts():
+    global _LUTS
+    if _LUTS is None:
+        _LUTS = load_luts()
+    return _LUTS
+
+
+# ---------------- BLOK DATAPATH ----------------
+
+def normalise(x):
+    # msb_detector + barrel_shifter: geser kiri sampai MSB di bit 30
+    msb = np.zeros_like(x)
+    for bit in range(16):
+        msb[(x >> bit) != 0] = bit
+    shift = NORM_MSB - msb
+    return x << shift, shift
+
+
+def multiply(x, y):
+    # multiplier.vhd: signed 32x32 -> 64, ambil product_64(61 downto 30)
+    sx = np.where(x & 0x80000000, x - (1 << 32), x)
+    sy = np.where(y & 0x80000000, y - (1 << 32), y)
+    return ((sx * sy) >> 30) & MASK_32
+
+
+def goldschmidt(num, den, fac, iterations=GS_ITERATIONS):
+    # goldschmidt.vhd: state CALC, semua register di-update bersamaan
+    for _ in range(iterations):
+        num, den = multiply(num, fac), multiply(den, fac)
+        fac = (TWO_Q230 - den) & MASK_32
+    return num
+
+
+def nr_polish(seed, quotient):
+    # nr_polisher.vhd: sum 33-bit, ambil sum(32 downto 1)
+    return (seed + quotient) >> 1
+
+
+def post_process(nr, shift):
+    # post_processor.vhd: koreksi shift ganjil, lalu geser 7 + S/2 ke kanan
+    odd = (shift % 2) != 0
+    v = np.where(odd, (nr * ODD_SHIFT_CORRECTION) >> 8, nr)
+    return (v >> (7 + shift // 2)) & 0xFFFF
+
+
+def sqrt_q88(values):
+    """Bit-exact model of squarerootdigital: uint16 inputs -> Q8.8 uint16 outputs.
+
+    Accepts a scalar or any array-like; the whole 0..65535 domain runs as a
+    single vectorised pass. Input 0 takes the FSM's zero bypass.
+    """
+    nr_lut, gs_lut = _luts()
+    x = np.asarray(values, dtype=np.int64) & 0xFFFF
+    safe = np.where(x == 0, 1, x)
+
+    data_norm, shift = normalise(safe)
+    seed = nr_lut[(data_norm >> 20) & 0x3FF]              # pre_processor: bit 29..20
+    guess = gs_lut[(seed >> 22) & 0xFF]                    # divider: bit 29..22
+    quotient = goldschmidt(data_norm, seed, guess)
+    nr = nr_polish(seed, quotient)
+    out = post_process(nr, shift)
+
+    out = np.where(x == 0, 0, out).astype(np.uint16)
+    return out if out.ndim else int(out)
+
+
+_REPLY_TABLE = None
+
+
+def reply_table():
+    """All 65,536 model replies as a plain list, computed once per process."""
+    global _REPLY_TABLE
+    if _REPLY_TABLE is None:
+        _REPLY_TABLE = sqrt_q88(np.arange(65536)).tolist()
+    return _REPLY_TABLE
+
+
+if __name__ == "__main__":
+    import time
+
+    domain = np.arange(65536)
+    t0 = time.perf_counter()
+    table = sqrt_q88(domain)
+    elapsed = time.perf_counter() - t0
+    print(f"Golden model: 65536 inputs in {elapsed * 1000:.1f} ms")
+    for val in (int(v) for v in sys.argv[1:]):
+        print(f"   sqrt({val}) -> 0x{int(table[val]):04X} ({table[val] / 256.0:.4f})")
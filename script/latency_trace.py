@@ -0,0 +1,149 @@
+import csv
+import json
+import sys
+import time
+
+import numpy as np
+
+from fsm_model import BAUD_RATE, CLK_FREQ, simulate, wire_cycles
+
+# ================= KONFIGURASI =================
+HIST_BIN_US = 50        # Lebar bin histogram per fase (mikrodetik)
+HIST_MAX_US = 20000     # Di atas ini masuk bin terakhir
+# ===============================================
+
+# Fase dari timestamp per request (perf_counter_ns, lihat PhaseTracer)
+PHASES = (
+    ('write', 'submit', 'write_done'),          # Antre di host + ser.write() (buffer OS/driver)
+    ('to_first_byte', 'write_done', 'first_byte'),  # Kabel RX + hitung FPGA + byte TX pertama + driver
+    ('first_to_last', 'first_byte', 'last_byte'),   # Byte TX kedua + buffering USB
+    ('total', 'submit', 'last_byte'),
+)
+
+
+class PhaseTracer:
+    """Per-request timestamps from SqrtDevice: submit, write-complete, first byte, last byte.
+
+    All times are time.perf_counter_ns(). Every transmission attempt (so
+    also a retry) is one record; records of requests dropped during a
+    resync keep first/last byte = 0 and are ignored by the reports.
+    """
+
+    def __init__(self):
+        self.value = []
+        self.submit = []
+        self.write_done = []
+        self.first_byte = []
+        self.last_byte = []
+
+    def begin(self, values):
+        start = len(self.value)
+        now = time.perf_counter_ns()
+        self.value.extend(values)
+        for column in (self.write_done, self.first_byte, self.last_byte):
+            column.extend([0] * len(values))
+        self.submit.extend([now] * len(values))
+        return range(start, len(self.value))
+
+    def written(self, ids, t_ns):
+        for i in ids:
+            self.write_done[i] = t_ns
+
+    def received(self, rid, first_ns, last_ns):
+        self.first_byte[rid] = first_ns
+        self.last_byte[rid] = last_ns
+
+    # ---------------- analisis ----------------
+    def arrays(self):
+        """Completed records as int64 arrays keyed by timestamp name."""
+        cols = {name: np.asarray(getattr(self, name), dtype=np.int64)
+                for name in ('value', 'submit', 'write_done', 'first_byte', 'last_byte')}
+        ok = (cols['last_byte'] > 0) & (cols['write_done'] > 0)
+        return {name: col[ok] for name, col in cols.items()}
+
+    def phases_ns(self):
+        cols = self.arrays()
+        return {name: cols[end] - cols[start] for name, start, end in PHASES}
+
+    def breakdown(self, clk_freq=CLK_FREQ, baud=BAUD_RATE):
+        """Mean of each phase plus the modelled wire/compute share of the total (ns)."""
+        phases = self.phases_ns()
+        wire = wire_cycles(clk_freq, baud)
+        period_ns = 1e9 / clk_freq
+        # Siklus rx_valid -> start bit dari model FSM (sama untuk semua input bukan nol)
+        compute = simulate(1, 0)['TX_START_BIT']
+        model = {'wire_rx': wire['rx'] * period_ns, 'compute': compute * period_ns,
+                 'wire_tx': wire['tx'] * period_ns}
+        mean = {name: float(np.mean(v)) if len(v) else float('nan') for name, v in phases.items()}
+        mean['host_overhead'] = mean['total'] - sum(model.values())
+        return {'requests': len(phases['total']), 'mean_ns': mean, 'model_ns': model}
+
+    def histograms(self, bin_us=HIST_BIN_US, max_us=HIST_MAX_US):
+        """(bin lower edges in us, {phase: counts}); the last bin collects everything above."""
+        n_bins = int(max_us // bin_us) + 1
+        hist = {}
+        for name, v in self.phases_ns().items():
+            bins = np.minimum(v // (bin_us * 1000), n_bins - 1)
+            hist[name] = np.bincount(np.maximum(bins, 0), minlength=n_bins)
+        return np.arange(n_bins) * bin_us, hist
+
+    # ---------------- export ----------------
+    def export_histograms(self, path, bin_us=HIST_BIN_US, max_us=HIST_MAX_US):
+        edges, hist = self.histograms(bin_us, max_us)
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['bin_start_us'] + list(hist))
+            for k, start in enumerate(edges.tolist()):
+                writer.writerow([start] + [int(counts[k]) for counts in hist.values()])
+        return path
+
+    def export_chrome_trace(self, path):
+        """Timeline for chrome://tracing / Perfetto: one track per phase, one slice per request."""
+        cols = self.arrays()
+        t0 = int(cols['submit'].min()) if len(cols['submit']) else 0
+        events = []
+        for tid, (name, start, end) in enumerate(PHASES[:3]):
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': name}})
+            for val, a, b in zip(cols['value'].tolist(), cols[start].tolist(), cols[end].tolist()):
+                events.append({'name': f"0x{val:04X}", 'cat': name, 'ph': 'X', 'pid': 1, 'tid': tid,
+                               'ts': (a - t0) / 1e3, 'dur': (b - a) / 1e3, 'args': {'input': val}})
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ns'}, f)
+        return path
+
+
+def print_breakdown(tracer, clk_freq=CLK_FREQ, baud=BAUD_RATE):
+    info = tracer.breakdown(clk_freq, baud)
+    mean, model = info['mean_ns'], info['model_ns']
+    print(f"Fase latency ({info['requests']} request, rata-rata):")
+    print(f"   submit -> write selesai    : {mean['write'] / 1e6:8.3f} ms")
+    print(f"   write  -> byte pertama     : {mean['to_first_byte'] / 1e6:8.3f} ms")
+    print(f"   byte pertama -> terakhir   : {mean['first_to_last'] / 1e6:8.3f} ms")
+    print(f"   total                      : {mean['total'] / 1e6:8.3f} ms")
+    print(f"   - kabel RX (model)         : {model['wire_rx'] / 1e6:8.3f} ms")
+    print(f"   - hitung FPGA (model)      : {model['compute'] / 1e6:8.5f} ms")
+    print(f"   - kabel TX (model)         : {model['wire_tx'] / 1e6:8.3f} ms")
+    print(f"   = overhead host/USB/OS     : {mean['host_overhead'] / 1e6:8.3f} ms")
+
+
+if __name__ == "__main__":
+    # python latency_trace.py [N]  -> trace N request ke LoopbackSerial (tanpa board)
+    import asyncio
+
+    from fake_serial import LoopbackSerial
+    from transport import SqrtDevice
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    tracer = PhaseTracer()
+
+    async def main():
+        # byte_time meniru kabel 9600 baud (10 bit per byte)
+        async with SqrtDevice(LoopbackSerial(latency=0.0005, byte_time=10 / BAUD_RATE),
+                              depth=1, tracer=tracer) as dev:
+            for val in range(1, n + 1):
+                await dev.sqrt(val)
+
+    asyncio.run(main())
+    print_breakdown(tracer)
+    print(f"Histogram: {tracer.export_histograms('latency_phases.csv')}, "
+          f"trace: {tracer.export_chrome_trace('latency_trace.json')}")
@@ -0,0 +1,233 @@
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+import golden_model
+from analysis import precision_metrics
+from dse import gs_table, nr_table, sqrt_variant
+
+# ================= KONFIGURASI =================
+NR_BITS = 10            # nr_initial_guess: 2^NR_BITS entry (RTL: 10, alamat data_norm(29 downto 20))
+GS_BITS = 8             # gs_initial_guess: 2^GS_BITS entry (RTL: 8, alamat seed(29 downto 22))
+FRAC_BITS = 30          # Bit pecahan yang disimpan per word; sisanya nol di bus Q2.30
+GS_ITERATIONS = 2       # Jumlah iterasi goldschmidt yang dipakai untuk optimasi
+METHOD = 'minimax'      # 'minimax' atau 'rtl' (tepi kiri segmen, floor = tabel lama)
+REFINE_LOG2 = 20        # Offset refinement per entry: 0, +/-1, +/-2, ... +/-2^REFINE_LOG2 ULP
+OUT_DIR = 'generated_rom'
+DOMAIN = 65536
+# ===============================================
+
+
+def seed_tables(nr_bits=NR_BITS, gs_bits=GS_BITS, method=METHOD, frac_bits=FRAC_BITS):
+    """(NR ROM, GS ROM) as Q2.30 int64 arrays, computed in exact integer arithmetic.
+
+    'rtl'     : sqrt / reciprocal of the left edge of each segment, floored
+                (dse.nr_table / dse.gs_table); with the RTL sizes this
+                reproduces the existing ROMs exactly.
+    'minimax' : per segment [lo, hi) the value that minimises the worst error
+                after one step: (sqrt(lo) + sqrt(hi)) / 2 for the NR seed
+                (the NR error (s - sqrt(x))^2 / 2s is then equal at both edges)
+                and 2 / (lo + hi) for the reciprocal, so |1 - seed * guess|,
+                which Goldschmidt squares every iteration, is halved. Rounded.
+    Words keep `frac_bits` fraction bits; the rest of the Q2.30 word is zero.
+    """
+    if method == 'rtl':
+        return nr_table(nr_bits, frac_bits), gs_table(gs_bits, frac_bits=frac_bits)
+    if method != 'minimax':
+        raise ValueError(f"Metode tidak dikenal: {method}")
+    drop = 30 - frac_bits
+    n_nr, n_gs = 1 << nr_bits, 1 << gs_bits
+    nr, gs = [], []
+    extra = 16  # Bit tambahan sebelum pembulatan
+    for i in range(n_nr):
+        lo = math.isqrt(((n_nr + i) << (2 * (frac_bits + extra))) // n_nr)
+        hi = math.isqrt(((n_nr + i + 1) << (2 * (frac_bits + extra))) // n_nr)
+        nr.append((((lo + hi) >> (extra + 1)) + ((lo + hi) >> extra & 1)) << drop)
+    for i in range(n_gs):
+        num, den = (2 * n_gs) << frac_bits, 2 * n_gs + 2 * i + 1
+        gs.append(((num + den // 2) // den) << drop)
+    return np.array(nr, dtype=np.int64), np.array(gs, dtype=np.int64)
+
+
+def _replies(nr, gs, nr_bits, gs_bits, iterations, x):
+    return sqrt_variant(x, nr, gs, gs_bits, iterations, 1, 32, nr_bits=nr_bits)
+
+
+def _refine_table(table, addr, evaluate_with, offsets):
+    # Per entry: offset dengan max error terkecil, lalu SSE terkecil (offset 0 menang kalau seri)
+    n = len(table)
+    maxes = np.zeros((len(offsets), n))
+    sse = np.zeros((len(offsets), n))
+    for k, d in enumerate(offsets):
+        err = evaluate_with(np.clip(table + d, 0, golden_model.MASK_32))
+        np.maximum.at(maxes[k], addr, err)
+        sse[k] = np.bincount(addr, err * err, minlength=n)
+    tied = maxes <= maxes.min(axis=0) + 1e-9
+    best = np.argmin(np.where(tied, sse, np.inf), axis=0)
+    return np.clip(table + offsets[best], 0, golden_model.MASK_32)
+
+
+def refine(nr, gs, nr_bits=NR_BITS, gs_bits=GS_BITS, iterations=GS_ITERATIONS, frac_bits=FRAC_BITS):
+    """Nudge every ROM word so the bit-exact datapath output is minimax per entry.
+
+    The analytic seeds ignore truncation in the multipliers, the NR shift
+    and the post-processor; here each word is tried at log-spaced offsets
+    (in units of its last stored bit) through dse.sqrt_variant with the
+    given iteration count. The NR ROM goes first, then the GS ROM with the
+    final NR seeds; each input depends on one entry of each, so entries are
+    optimised independently.
+    """
+    x = np.arange(1, DOMAIN)
+    truth = np.sqrt(x) * 256.0
+    data_norm, _ = golden_model.normalise(x)
+    step = 1 << (30 - frac_bits)
+    offsets = np.array([0] + [s << k for k in range(REFINE_LOG2 + 1) for s in (-1, 1)], dtype=np.int64) * step
+
+    nr_addr = (data_norm >> (30 - nr_bits)) & ((1 << nr_bits) - 1)
+    nr = _refine_table(nr, nr_addr, lambda t: np.abs(_replies(t, gs, nr_bits, gs_bits, iterations, x) - truth),
+                       offsets)
+    gs_addr = (nr[nr_addr] >> (30 - gs_bits)) & ((1 << gs_bits) - 1)
+    gs = _refine_table(gs, gs_addr, lambda t: np.abs(_replies(nr, t, nr_bits, gs_bits, iterations, x) - truth),
+                       offsets)
+    return nr, gs
+
+
+# ---------------- VHDL ----------------
+
+def emit_nr_vhdl(table, nr_bits=NR_BITS):
+    """nr_initial_guess.vhd for `table`, in the layout of the hand-written file."""
+    n = len(table)
+    lines = [
+        '-- @file nr_initial_guess.vhd',
+        '-- @brief Q2.30 LUT for Sqrt(x) where x in [1.0, 2.0)',
+        'library ieee;',
+        'use ieee.std_logic_1164.all;',
+        'use ieee.numeric_std.all;',
+        '',
+        'entity nr_initial_guess is',
+        f'    port (address : in std_logic_vector({nr_bits - 1} downto 0); '
+        'initial_guess_out : out std_logic_vector(31 downto 0));',
+        'end entity;',
+        '',
+        'architecture rtl of nr_initial_guess is',
+        f'    type rom_type is array (0 to {n - 1}) of std_logic_vector(31 downto 0);',
+        '    constant INITIAL_GUESS_TABLE : rom_type := (',
+    ]
+    lines += [f'        {i} => x"{int(w):08X}"' + (',' if i < n - 1 else '') for i, w in enumerate(table)]
+    lines += [
+        '    );',
+        'begin',
+        '    initial_guess_out <= INITIAL_GUESS_TABLE(to_integer(unsigned(address)));',
+        'end architecture;',
+    ]
+    return '\r\n'.join(lines)
+
+
+def emit_gs_vhdl(table, gs_bits=GS_BITS):
+    """gs_initial_guess.vhd for `table`; addresses in hex when gs_bits is a multiple of 4."""
+    def literal(addr):
+        return f'x"{addr:0{gs_bits // 4}X}"' if gs_bits % 4 == 0 else f'"{addr:0{gs_bits}b}"'
+
+    lines = [
+        '-- @file gs_initial_guess.vhd',
+        '-- @brief Q2.30 LUT for range [1.0, 2.0)',
+        '-- Guesses are in range [1.0, 0.5)',
+        '',
+        'library ieee;',
+        'use ieee.std_logic_1164.all;',
+        'use ieee.numeric_std.all;',
+        '',
+        'entity gs_initial_guess is',
+        '    port (',
+        f'        address   : in std_logic_vector({gs_bits - 1} downto 0);',
+        '        guess_out : out std_logic_vector(31 downto 0)',
+        '    );',
+        'end entity;',
+        '',
+        'architecture behavioral of gs_initial_guess is',
+        'begin',
+        '    process(address)',
+        '    begin',
+        '        case address is',
+    ]
+    lines += [f'            when {literal(a)} => guess_out <= x"{int(w):08X}";' for a, w in enumerate(table)]
+    lines += [
+        '            when others => guess_out <= x"40000000";',
+        '        end case;',
+        '    end process;',
+        'end architecture;',
+    ]
+    return '\r\n'.join(lines)
+
+
+def verify(nr_text, gs_text, nr, gs, nr_bits=NR_BITS, gs_bits=GS_BITS, iterations=GS_ITERATIONS):
+    """Parse the emitted VHDL back (golden_model parsers) and check it bit-for-bit.
+
+    Both the ROM words and the model's 65,536 replies with the parsed ROMs
+    must equal those of the in-memory tables. Returns the parsed ROMs.
+    """
+    nr_parsed = golden_model._parse_nr_lut(nr_text, 1 << nr_bits)
+    gs_parsed = golden_model._parse_gs_lut(gs_text, 1 << gs_bits)
+    if not np.array_equal(nr_parsed, nr):
+        raise ValueError(f"NR ROM VHDL beda di {np.count_nonzero(nr_parsed != nr)} entry")
+    if not np.array_equal(gs_parsed, gs):
+        raise ValueError(f"GS ROM VHDL beda di {np.count_nonzero(gs_parsed != gs)} entry")
+    domain = np.arange(DOMAIN)
+    if not np.array_equal(_replies(nr_parsed, gs_parsed, nr_bits, gs_bits, iterations, domain),
+                          _replies(nr, gs, nr_bits, gs_bits, iterations, domain)):
+        raise ValueError("Model dengan ROM hasil parse tidak identik")
+    return nr_parsed, gs_parsed
+
+
+def accuracy(nr, gs, nr_bits=NR_BITS, gs_bits=GS_BITS, iterations=GS_ITERATIONS):
+    domain = np.arange(DOMAIN)
+    return precision_metrics(domain, _replies(nr, gs, nr_bits, gs_bits, iterations, domain))
+
+
+def generate(nr_bits=NR_BITS, gs_bits=GS_BITS, iterations=GS_ITERATIONS, method=METHOD,
+             frac_bits=FRAC_BITS, out_dir=OUT_DIR):
+    """Compute, refine, emit and verify both ROMs; returns (paths, accuracy metrics)."""
+    nr, gs = seed_tables(nr_bits, gs_bits, method, frac_bits)
+    if method != 'rtl':
+        nr, gs = refine(nr, gs, nr_bits, gs_bits, iterations, frac_bits)
+    nr_text, gs_text = emit_nr_vhdl(nr, nr_bits), emit_gs_vhdl(gs, gs_bits)
+    verify(nr_text, gs_text, nr, gs, nr_bits, gs_bits, iterations)
+
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for name, text in ((golden_model.NR_LUT_FILE, nr_text), (golden_model.GS_LUT_FILE, gs_text)):
+        path = os.path.join(out_dir, name)
+        with open(path, 'w', newline='') as f:
+            f.write(text)
+        paths.append(path)
+    return paths, accuracy(nr, gs, nr_bits, gs_bits, iterations)
+
+
+if __name__ == "__main__":
+    # python lut_gen.py [iterations] [--rtl] [--write]
+    #   --rtl   : metode tepi kiri (harus identik byte-per-byte dengan src/ saat ini)
+    #   --write : tulis langsung ke src/ (default: OUT_DIR)
+    args = sys.argv[1:]
+    method = 'rtl' if '--rtl' in args else METHOD
+    out_dir = golden_model.SRC_DIR if '--write' in args else OUT_DIR
+    args = [a for a in args if not a.startswith('--')]
+    iterations = int(args[0]) if args else GS_ITERATIONS
+
+    t0 = time.perf_counter()
+    paths, metrics = generate(NR_BITS, GS_BITS, iterations, method, FRAC_BITS, out_dir)
+    print(f"ROM {method} (NR {1 << NR_BITS} x Q2.{FRAC_BITS}, GS {1 << GS_BITS}), {iterations} iterasi GS: "
+          f"verified bit-for-bit in {time.perf_counter() - t0:.1f} s")
+    for path in paths:
+        print(f"   -> {path}")
+    rtl = accuracy(*golden_model.load_luts(), 10, 8, golden_model.GS_ITERATIONS)
+    print(f"Generated, {iterations} iter : SQNR {metrics['sqnr_db']:.3f} dB, max {metrics['max_error_lsb']:.3f} LSB")
+    print(f"RTL ROM, {golden_model.GS_ITERATIONS} iter   : SQNR {rtl['sqnr_db']:.3f} dB, "
+          f"max {rtl['max_error_lsb']:.3f} LSB")
+    if NR_BITS != 10 or GS_BITS != 8:
+        print(f"Ubah juga slice alamat: pre_processor data_norm(29 downto {30 - NR_BITS}), "
+              f"divider seed(29 downto {30 - GS_BITS})")
+    if iterations != golden_model.GS_ITERATIONS:
+        print(f"goldschmidt.vhd: count range 0 to {iterations - 1} (sekarang 0 to {golden_model.GS_ITERATIONS - 1})")
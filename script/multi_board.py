@@ -0,0 +1,129 @@
+import asyncio
+import sys
+import time
+
+import numpy as np
+
+from pipelined_io import PIPELINE_DEPTH
+from result_format import save_results
+from transport import RETRIES, TIMEOUT, open_device, serial_opener
+
+# ================= KONFIGURASI =================
+PORTS = ['COM6', 'COM7']   # Satu port per board DE10-Lite
+BAUD_RATE = 9600
+RESULT_DIR = 'multi_board_results'
+CROSS_CHECK = 256          # Vector sampel yang dikirim ke SEMUA board; hanya ini yang dicek silang
+SIM_BAUD = 921600          # Baud board palsu (UartModelSerial) untuk mode sim
+# ===============================================
+
+
+def split_range(values, n_boards):
+    """Split `values` into `n_boards` contiguous shards of (almost) equal size."""
+    return [shard.tolist() for shard in np.array_split(np.asarray(values), n_boards)]
+
+
+async def _run_board(port, baud, values, opener, depth, timeout, retries):
+    async with await open_device(port, baud, depth=depth, timeout=timeout, retries=retries,
+                                 opener=opener) as dev:
+        t0 = time.perf_counter()
+        replies = await dev.sqrt_many(values)
+        elapsed = time.perf_counter() - t0
+    return replies, elapsed, dev.stats
+
+
+async def _run_all(ports, baud, shards, opener, depth, timeout, retries):
+    return await asyncio.gather(*(_run_board(port, baud, shard, opener, depth, timeout, retries)
+                                  for port, shard in zip(ports, shards)))
+
+
+def run_multi_board(ports, values, baud=BAUD_RATE, opener=serial_opener, depth=PIPELINE_DEPTH,
+                    cross_check=CROSS_CHECK, timeout=TIMEOUT, retries=RETRIES):
+    """Sweep `values` across several boards at once and merge the replies.
+
+    Each port gets one contiguous shard plus the same `cross_check` sample
+    and its own device from transport.open_device (`opener(port, baud)`,
+    same pacing and port re-open as a single-board sweep), whose reader
+    thread services that port; all boards run concurrently on one event
+    loop. Returns a dict with the
+    ordered `replies` (-1 where a board failed every retry), per-board
+    `stats` and the cross-check `disagreements`. Only the `cross_checked`
+    sample inputs go to every board, so a board that is wrong elsewhere in
+    its own shard is not caught here (compare against the golden model).
+    """
+    values = np.asarray(values, dtype=np.int64)
+    shards = split_range(values, len(ports))
+    sample = values[np.linspace(0, len(values) - 1, min(cross_check, len(values))).astype(np.int64)].tolist()
+
+    outcomes = asyncio.run(_run_all(ports, baud, [shard + sample for shard in shards], opener, depth,
+                                    timeout, retries))
+
+    # Gabungkan hasil sesuai urutan input asli
+    replies = np.full(len(values), -1, dtype=np.int64)
+    stats = {}
+    sample_replies = {}
+    offset = 0
+    for port, shard, (board_replies, elapsed, dev_stats) in zip(ports, shards, outcomes):
+        own = [-1 if r is None else r for r in board_replies[:len(shard)]]
+        replies[offset:offset + len(own)] = own
+        offset += len(shard)
+        sample_replies[port] = board_replies[len(shard):]
+        missing = board_replies.count(None)
+        stats[port] = {
+            'vectors': len(board_replies) - missing,
+            'missing': missing,
+            'seconds': elapsed,
+            'ops_per_sec': (len(board_replies) - missing) / elapsed if elapsed > 0 else 0.0,
+            'resyncs': dev_stats['resyncs'],
+            'reopens': dev_stats['reopens'],
+        }
+
+    # Cek silang: vector sampel harus dijawab sama oleh semua board
+    disagreements = []
+    for k, val in enumerate(sample):
+        answers = {port: r[k] for port, r in sample_replies.items() if r[k] is not None}
+        if len(set(answers.values())) > 1:
+            disagreements.append((val, answers))
+
+    return {'inputs': values, 'replies': replies, 'stats': stats, 'disagreements': disagreements,
+            'cross_checked': len(sample)}
+
+
+def print_report(result):
+    print("=" * 60)
+    print("MULTI-BOARD HIL SWEEP")
+    print("=" * 60)
+    total_ops = 0.0
+    for port, st in result['stats'].items():
+        total_ops += st['ops_per_sec']
+        print(f"{port:<12}: {st['vectors']:6d} vectors  {st['seconds']:8.2f} s  "
+              f"{st['ops_per_sec']:9.1f} ops/sec  (missing {st['missing']}, reopen {st['reopens']})")
+    print("-" * 60)
+    print(f"Aggregate throughput : {total_ops:.1f} ops/sec")
+    print(f"Unanswered vectors   : {int(np.count_nonzero(result['replies'] < 0))}")
+    print(f"Board disagreements  : {len(result['disagreements'])} "
+          f"(cross-check of {result['cross_checked']} sampled inputs only, not the whole sweep)")
+    for val, answers in result['disagreements'][:10]:
+        detail = ', '.join(f"{p}=0x{r:04X}" for p, r in answers.items())
+        print(f"   input {val}: {detail}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    # python multi_board.py        -> pakai PORTS (hardware)
+    # python multi_board.py sim 4  -> 4 board palsu (UartModelSerial @ SIM_BAUD), tanpa hardware
+    values = range(1, 65536)
+    baud = BAUD_RATE
+    if len(sys.argv) > 1 and sys.argv[1] == 'sim':
+        from fake_serial import fake_opener
+        n = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+        ports, baud, opener = [f'SIM{i}' for i in range(n)], SIM_BAUD, fake_opener(uart_model=True, latency=0.0005)
+    else:
+        ports, opener = PORTS, serial_opener
+
+    result = run_multi_board(ports, values, baud=baud, opener=opener)
+    print_report(result)
+
+    answered = result['replies'] >= 0
+    save_results(RESULT_DIR, result['inputs'][answered], result['replies'][answered],
+                 baud=baud, ports=ports)
+    print(f"Results saved to '{RESULT_DIR}'")
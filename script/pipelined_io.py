@@ -0,0 +1,150 @@
+import struct
+import sys
+import time
+
+# ================= KONFIGURASI =================
+PIPELINE_DEPTH = 1    # Jumlah request yang boleh "in flight" sekaligus (1 = mode lama write -> read)
+WORD_GAP = None       # Detik jeda idle antar word request; None = otomatis (lihat safe_pacing)
+# Catatan: UART_16_Bit_System tidak punya FIFO. Request baru diterima saat
+# FPGA masih mengirim balasan sebelumnya, dan tx_start yang jatuh saat TX
+# sibuk dibuang tanpa jejak: semua balasan sesudahnya tergeser ke request
+# yang salah. Karena itu depth > 1 hanya dipakai kalau host menyisipkan
+# jeda antar word >= durasi TX 2 byte di FPGA (fpga_tx_time).
+# ===============================================
+
+
+def pack_block(values):
+    # Satu panggilan struct.pack untuk satu blok (Little Endian <H)
+    return struct.pack(f'<{len(values)}H', *values)
+
+
+def unpack_block(data):
+    return struct.unpack(f'<{len(data) // 2}H', data[:len(data) - len(data) % 2])
+
+
+def fpga_tx_time(baud, clk_freq=None):
+    """Seconds UART_16_Bit_System's TX needs for one 2-byte reply (fsm_model.wire_cycles)."""
+    from fsm_model import CLK_FREQ, wire_cycles  # numpy: hanya kalau dipakai
+    clk_freq = clk_freq or CLK_FREQ
+    return wire_cycles(clk_freq, baud)['tx'] / clk_freq
+
+
+def safe_pacing(depth, baud, word_gap=WORD_GAP):
+    """(depth, word_gap) that the RTL can take at `baud`.
+
+    depth > 1 needs at least fpga_tx_time(baud) idle seconds between two
+    request words, so every reply is on the wire before the next tx_start.
+    `word_gap=None` picks exactly that gap for depth > 1 (0 for depth 1);
+    an explicit gap that is too short falls back to depth 1.
+    """
+    depth = max(1, depth)
+    if depth == 1:
+        return 1, word_gap or 0.0
+    tx_time = fpga_tx_time(baud)
+    if word_gap is None:
+        return depth, tx_time
+    return (depth, word_gap) if word_gap >= tx_time else (1, word_gap)
+
+
+def wait_until(t):
+    # time.sleep terlalu kasar untuk jeda sub-ms (Windows ~15 ms): tidur dulu, sisanya spin
+    while (left := t - time.perf_counter()) > 0:
+        if left > 0.002:
+            time.sleep(left - 0.002)
+
+
+class WordPacer:
+    """Writes request words with at least `word_gap` idle seconds between them.
+
+    With word_gap = 0 a block goes out in one write(). Otherwise every word
+    is written on its own, once the previous one has had its two frames on
+    the wire (10 bits each at ser.baudrate) plus the gap; the pacing holds
+    across calls, so blocks written back to back are spaced too.
+    """
+
+    def __init__(self, word_gap=0.0):
+        self.word_gap = word_gap
+        self.line_free = 0.0
+
+    def write(self, ser, data):
+        if self.word_gap <= 0:
+            return ser.write(data)
+        frame = 10.0 / ser.baudrate
+        n = 0
+        for k in range(0, len(data), 2):
+            word = data[k:k + 2]
+            wait_until(self.line_free)
+            n += ser.write(word)
+            self.line_free = time.perf_counter() + len(word) * frame + self.word_gap
+        return n
+
+
+def run_pipelined(ser, values, depth=PIPELINE_DEPTH, progress=None, progress_every=1000, word_gap=WORD_GAP):
+    """Send `values` with up to `depth` requests in flight; return replies in order.
+
+    Replies are matched to requests purely by order, like the FPGA answers
+    them, so depth and word gap go through safe_pacing first: a reply the
+    RTL drops would shift every later one. On timeout the returned list is
+    shorter than `values`; the caller decides what to do with the vectors
+    that never got an answer. `progress(done, total)` is called every
+    `progress_every` replies.
+    """
+    values = list(values)
+    total = len(values)
+    depth, word_gap = safe_pacing(depth, ser.baudrate, word_gap)
+    pacer = WordPacer(word_gap)
+    read_chunk = max(1, depth // 2)  # Sisakan setengah window tetap terisi
+
+    replies = []
+    sent = 0
+    last_report = 0
+    while len(replies) < total:
+        # 1. Isi ulang window
+        n_send = min(depth - (sent - len(replies)), total - sent)
+        if n_send > 0:
+            pacer.write(ser, pack_block(values[sent:sent + n_send]))
+            sent += n_send
+
+        # 2. Baca balasan dalam satu buffer besar
+        n_read = min(read_chunk, sent - len(replies))
+        response = ser.read(2 * n_read)
+        replies.extend(unpack_block(response))
+
+        if progress is not None and len(replies) // progress_every != last_report:
+            last_report = len(replies) // progress_every
+            progress(len(replies), total)
+
+        if len(response) < 2 * n_read:
+            break  # TIMEOUT: kembalikan hasil parsial
+
+    return replies
+
+
+def benchmark_loopback(n_vectors=2000, depth=32, latency=0.001, baud=921600):
+    """Compare depth=1 against `depth` on a UartModelSerial (RTL UART timing); return ops/s for both."""
+    from fake_serial import UartModelSerial, golden_q88
+
+    values = range(1, n_vectors + 1)
+    expected = [golden_q88(v) for v in values]
+    result = {}
+    for d in (1, depth):
+        ser = UartModelSerial(baudrate=baud, latency=latency)
+        t0 = time.perf_counter()
+        replies = run_pipelined(ser, values, depth=d)
+        elapsed = time.perf_counter() - t0
+        if replies != expected or ser.lost:
+            raise AssertionError(f"UART model mismatch at depth={d} ({ser.lost} replies dropped by the RTL)")
+        result[d] = n_vectors / elapsed
+    return result
+
+
+if __name__ == "__main__":
+    # python pipelined_io.py [depth] [baud]
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    baud = int(sys.argv[2]) if len(sys.argv) > 2 else 921600
+    rates = benchmark_loopback(depth=depth, baud=baud)
+    print(f"UART model throughput ({baud} baud, latency 1 ms per request, "
+          f"word gap {safe_pacing(depth, baud)[1] * 1e3:.3f} ms):")
+    for d, ops in rates.items():
+        print(f"   depth={d:<4d}: {ops:10.1f} ops/sec")
+    print(f"   Speed-up   : {rates[depth] / rates[1]:.1f}x")
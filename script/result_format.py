@@ -0,0 +1,122 @@
+import csv
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# ================= FORMAT HASIL (BINARY) =================
+# Satu result set = satu folder berisi kolom .npy + meta.json:
+#   input.npy       uint16   nilai input
+#   reply.npy       uint16   balasan mentah FPGA (Q8.8)
+#   latency_ns.npy  uint64   round-trip per vector (0 = tidak diukur)
+# Setiap kolom dibuka dengan np.load(mmap_mode='r'), jadi tanpa parsing teks.
+# =========================================================
+RESULT_COLUMNS = (('input', np.uint16), ('reply', np.uint16), ('latency_ns', np.uint64))
+META_FILE = 'meta.json'
+
+
+class ResultSet:
+    """Column arrays of one sweep (`input`, `reply`, `latency_ns`) plus metadata."""
+
+    def __init__(self, input, reply, latency_ns=None, meta=None):
+        self.input = input
+        self.reply = reply
+        self.latency_ns = np.zeros(len(input), dtype=np.uint64) if latency_ns is None else latency_ns
+        self.meta = meta or {}
+
+    def __len__(self):
+        return len(self.input)
+
+
+def save_results(path, inputs, replies, latency_ns=None, **meta):
+    """Write a result set folder; `meta` (build id, baud, ...) goes to meta.json."""
+    n = len(replies)
+    columns = {
+        'input': np.asarray(inputs)[:n],
+        'reply': np.asarray(replies),
+        'latency_ns': np.zeros(n) if latency_ns is None else np.asarray(latency_ns)[:n],
+    }
+    os.makedirs(path, exist_ok=True)
+    for name, dtype in RESULT_COLUMNS:
+        np.save(os.path.join(path, name + '.npy'), columns[name].astype(dtype, copy=False))
+
+    meta = dict(meta, count=n, created=time.strftime('%Y-%m-%d %H:%M:%S'))
+    with open(os.path.join(path, META_FILE), 'w') as f:
+        json.dump(meta, f, indent=2)
+    return path
+
+
+def load_results(path):
+    """Open a result set zero-copy; legacy CSV files are parsed as a fallback.
+
+    `path` may be a result folder, a CSV file, or a base name such as
+    'scientific_results' (the folder is preferred over 'scientific_results.csv').
+    """
+    if not os.path.isdir(path) and not os.path.isfile(path) and os.path.isfile(path + '.csv'):
+        path = path + '.csv'
+    if os.path.isfile(path):
+        return _load_csv(path)
+
+    columns = {name: np.load(os.path.join(path, name + '.npy'), mmap_mode='r')
+               for name, _ in RESULT_COLUMNS}
+    meta_path = os.path.join(path, META_FILE)
+    meta = {}
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+    return ResultSet(columns['input'], columns['reply'], columns['latency_ns'], meta)
+
+
+def _load_csv(path):
+    # Format CSV lama: scientific_results / latency_results / test_results / export_csv
+    inputs, replies, latencies = [], [], []
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            inputs.append(int(row.get('input_decimal') or row.get('Input (Dec)')))
+
+            raw_hex = row.get('reply_hex') or row.get('fpga_result_hex') or row.get('fpga_raw_hex')
+            if raw_hex:
+                replies.append(int(raw_hex, 16))
+            else:
+                replies.append(int(round(float(row['FPGA (Q8.8)']) * 256)))
+
+            if row.get('latency_ns'):
+                latencies.append(int(row['latency_ns']))
+            elif row.get('latency_seconds'):
+                latencies.append(int(round(float(row['latency_seconds']) * 1e9)))
+            else:
+                latencies.append(0)
+
+    return ResultSet(np.array(inputs, dtype=np.uint16), np.array(replies, dtype=np.uint16),
+                     np.array(latencies, dtype=np.uint64), {'source': path})
+
+
+def export_csv(results, csv_path):
+    """Optional human-readable export of a result set."""
+    if isinstance(results, str):
+        results = load_results(results)
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['input_decimal', 'reply_hex', 'reply_q88', 'latency_ns'])
+        for val, raw_val, lat in zip(results.input.tolist(), results.reply.tolist(),
+                                     results.latency_ns.tolist()):
+            writer.writerow([val, f"0x{raw_val:04X}", f"{raw_val / 256.0:.4f}", lat])
+    return csv_path
+
+
+if __name__ == "__main__":
+    # Konversi: python result_format.py <sumber> <tujuan>
+    #   sumber CSV  -> tujuan folder binary
+    #   sumber folder -> tujuan .csv
+    if len(sys.argv) != 3:
+        print("Usage: python result_format.py <source.csv|result_dir> <result_dir|target.csv>")
+        sys.exit(1)
+    src, dst = sys.argv[1], sys.argv[2]
+    results = load_results(src)
+    if dst.endswith('.csv'):
+        export_csv(results, dst)
+    else:
+        save_results(dst, results.input, results.reply, results.latency_ns, **results.meta)
+    print(f"{len(results)} vectors: '{src}' -> '{dst}'")
@@ -0,0 +1,300 @@
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+from sqrt_table import sqrt_q88
+from transport import open_device
+from vector_source import ShuffledSource
+
+# ================= KONFIGURASI =================
+PORT_NAME = 'COM6'
+BAUD_RATE = 9600
+DEPTH = 1                     # Request in flight; > 1 pakai jeda antar word + probe sync per blok, di 9600 baud lebih lambat
+                              # dari depth 1 (baud_bench.model_ops_per_sec: depth 4 = 160 vs 217 ops/s)
+WINDOW_SECONDS = 10.0         # Satu baris time-series per window
+RING_SIZE = 8640              # Window yang disimpan (8640 x 10 s = 24 jam), file tetap ukurannya
+SERIES_FILE = 'soak_series.npy'
+ALERT_FILE = 'soak_alerts.jsonl'
+BLOCK = 256                   # Vector per panggilan sqrt_many
+PROBE_INTERVAL = 0.05         # Detik antar probe latency (round-trip tunggal, di tengah beban)
+WARMUP_WINDOWS = 1            # Window awal yang dilewati (port baru dibuka, cache/driver dingin: p99 jauh lebih tinggi)
+BASELINE_WINDOWS = 6          # Window sesudah warm-up yang membentuk baseline envelope
+# Envelope per metrik: (arah, toleransi relatif, toleransi absolut)
+#   'low'  = alert kalau nilai < baseline * (1 - rel) - abs
+#   'high' = alert kalau nilai > baseline * (1 + rel) + abs
+ENVELOPES = {
+    'ops_per_sec':    ('low', 0.10, 0.0),
+    'latency_p99_ms': ('high', 0.50, 1.0),
+    'jitter_ms':      ('high', 1.00, 0.5),
+    'error_rate':     ('high', 0.0, 1e-4),
+}
+STALL_ALERT = 'stalled'       # Window tanpa satu blok pun selesai (selalu alert, juga saat baseline)
+# ===============================================
+
+SERIES_DTYPE = np.dtype([
+    ('seq', '<u8'),            # 0 = slot kosong; nomor window naik terus (ring ditulis memutar)
+    ('t_end', '<f8'),          # Epoch detik
+    ('vectors', '<u8'),
+    ('ops_per_sec', '<f8'),
+    ('mismatches', '<u8'),
+    ('failed', '<u8'),         # Vector tanpa balasan setelah semua retry
+    ('error_rate', '<f8'),     # (mismatches + failed) / vectors
+    ('latency_p50_ms', '<f8'),
+    ('latency_p99_ms', '<f8'),
+    ('jitter_ms', '<f8'),      # Std latency probe dalam window
+    ('resyncs', '<u8'),
+    ('alerts', '<u4'),         # Bit per metrik di ENVELOPES yang keluar envelope
+])
+ALERT_BITS = {name: 1 << k for k, name in enumerate((*ENVELOPES, STALL_ALERT))}
+
+
+class SeriesRing:
+    """Fixed-size, memory-mapped ring of per-window metrics (SERIES_DTYPE).
+
+    The file never grows: window n goes to slot n % size and carries its
+    `seq`, so the newest slot is found after a restart and a crash loses
+    at most the window being written.
+    """
+
+    def __init__(self, path=SERIES_FILE, size=RING_SIZE):
+        self.path = path
+        if os.path.exists(path):
+            self.data = np.load(path, mmap_mode='r+')
+            if self.data.dtype != SERIES_DTYPE:
+                raise ValueError(f"'{path}' bukan file time-series soak (dtype beda)")
+        else:
+            self.data = np.lib.format.open_memmap(path, mode='w+', dtype=SERIES_DTYPE, shape=(size,))
+        self.next_seq = int(self.data['seq'].max()) + 1
+
+    def append(self, row):
+        row = dict(row, seq=self.next_seq)
+        slot = self.data[(self.next_seq - 1) % len(self.data)]
+        for name in SERIES_DTYPE.names:
+            slot[name] = row.get(name, 0)
+        self.data.flush()
+        self.next_seq += 1
+
+    def ordered(self):
+        """Filled rows, oldest first (a copy)."""
+        rows = self.data[self.data['seq'] > 0]
+        return np.sort(rows, order='seq')
+
+
+def load_series(path=SERIES_FILE):
+    return SeriesRing(path).ordered()
+
+
+class Envelope:
+    """Baseline from `n_windows` windows after `warmup`; checks later windows against ENVELOPES."""
+
+    def __init__(self, envelopes=ENVELOPES, n_windows=BASELINE_WINDOWS, warmup=WARMUP_WINDOWS):
+        self.envelopes = envelopes
+        self.n_windows = n_windows
+        self.warmup = warmup
+        self.history = {name: [] for name in envelopes}
+        self.baseline = None
+
+    def check(self, row):
+        """List of (metric, value, limit) outside the envelope; [] during warm-up and while the baseline builds."""
+        if self.warmup > 0:
+            self.warmup -= 1
+            return []
+        if self.baseline is None:
+            for name in self.envelopes:
+                if math.isfinite(row[name]):
+                    self.history[name].append(row[name])
+            if min(len(v) for v in self.history.values()) >= self.n_windows:
+                self.baseline = {name: float(np.median(v)) for name, v in self.history.items()}
+            return []
+
+        out = []
+        for name, (direction, rel, abs_tol) in self.envelopes.items():
+            base, value = self.baseline[name], row[name]
+            if direction == 'low':
+                limit = base * (1 - rel) - abs_tol
+                bad = value < limit
+            else:
+                limit = base * (1 + rel) + abs_tol
+                bad = value > limit
+            if bad or not math.isfinite(value):
+                out.append((name, value, limit))
+        return out
+
+
+def soak_vectors(seed=0):
+    """Endless random inputs: a fresh ShuffledSource permutation of 0..65535 every pass."""
+    while True:
+        for chunk in ShuffledSource(0, 65536, seed=seed).blocks(BLOCK):
+            yield chunk
+        seed += 1
+
+
+def _window_row(vectors, seconds, mismatches, failed, probes, resyncs):
+    lat = np.asarray(probes, dtype=np.float64)
+    nan = float('nan')
+    return {
+        't_end': time.time(),
+        'vectors': vectors,
+        'ops_per_sec': vectors / seconds if seconds > 0 else 0.0,
+        'mismatches': mismatches,
+        'failed': failed,
+        'error_rate': (mismatches + failed) / vectors if vectors else nan,
+        'latency_p50_ms': float(np.percentile(lat, 50)) if len(lat) else nan,
+        'latency_p99_ms': float(np.percentile(lat, 99)) if len(lat) else nan,
+        'jitter_ms': float(np.std(lat, ddof=1)) if len(lat) > 1 else nan,
+        'resyncs': resyncs,
+    }
+
+
+async def soak(dev, duration=None, ring=None, envelope=None, on_window=None, seed=0, alert_file=None):
+    """Run `dev` until `duration` seconds have passed (None = until cancelled).
+
+    One coroutine streams randomised inputs with sqrt_many and checks every
+    reply against the lookup table (sqrt_table); another sends a single
+    round-trip probe every PROBE_INTERVAL for latency under load. Every
+    WINDOW_SECONDS the window's metrics go to `ring` and through
+    `envelope`; alerts are appended to `alert_file` (default: ALERT_FILE
+    next to the ring's file). A window in which no
+    block finished is still written, flagged STALL_ALERT and kept out of
+    the baseline. Memory stays bounded: only the current window's probe
+    latencies are kept.
+    """
+    ring = ring or SeriesRing()
+    envelope = envelope or Envelope()
+    alert_file = alert_file or os.path.join(os.path.dirname(ring.path), ALERT_FILE)
+    t_start = time.perf_counter()
+    stop = asyncio.Event()
+    probes = []
+    win = {'vectors': 0, 'mismatches': 0, 'failed': 0}
+
+    async def stream():
+        for chunk in soak_vectors(seed):
+            if stop.is_set():
+                return
+            replies = await dev.sqrt_many(chunk.tolist())
+            got = np.array([-1 if r is None else r for r in replies], dtype=np.int64)
+            answered = got >= 0
+            win['vectors'] += len(chunk)
+            win['failed'] += int(np.count_nonzero(~answered))
+            win['mismatches'] += int(np.count_nonzero(got[answered] != sqrt_q88(chunk[answered])))
+
+    async def probe():
+        rng = np.random.default_rng(seed + 1)
+        while not stop.is_set():
+            val = int(rng.integers(1, 65536))
+            t0 = time.perf_counter_ns()
+            if await dev.sqrt(val) is not None:
+                probes.append((time.perf_counter_ns() - t0) / 1e6)
+            await asyncio.sleep(PROBE_INTERVAL)
+
+    async def windows():
+        last, resyncs = time.perf_counter(), dev.stats.get('resyncs', 0)
+        while not stop.is_set():
+            await asyncio.sleep(WINDOW_SECONDS)
+            now = time.perf_counter()
+            row = _window_row(win['vectors'], now - last, win['mismatches'], win['failed'], probes,
+                              dev.stats.get('resyncs', 0) - resyncs)
+            win.update(vectors=0, mismatches=0, failed=0)
+            probes.clear()
+            last, resyncs = now, dev.stats.get('resyncs', 0)
+
+            if row['vectors']:
+                alerts = envelope.check(row)
+            else:
+                alerts = [(STALL_ALERT, 0.0, 1.0)]   # (metric, vectors, batas)
+            row['alerts'] = sum(ALERT_BITS[name] for name, _, _ in alerts)
+            ring.append(row)
+            for name, value, limit in alerts:
+                with open(alert_file, 'a') as f:
+                    f.write(json.dumps({'time': time.strftime('%Y-%m-%d %H:%M:%S'), 'window': ring.next_seq - 1,
+                                        'metric': name, 'value': value, 'limit': limit,
+                                        'baseline': (envelope.baseline or {}).get(name)}) + '\n')
+            if on_window is not None:
+                on_window(row, alerts)
+            if duration is not None and now - t_start >= duration:
+                stop.set()
+
+    tasks = [asyncio.ensure_future(stream()), asyncio.ensure_future(probe())]
+    try:
+        await windows()
+        await asyncio.wait(tasks, timeout=WINDOW_SECONDS)  # Blok yang sedang jalan boleh selesai
+    finally:
+        for task in tasks:
+            task.cancel()   # Aliran macet tidak menahan akhir soak
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return ring
+
+
+def drift_per_hour(series, metric):
+    """Least-squares slope of `metric` over time, in units per hour (nan with < 3 windows)."""
+    ok = np.isfinite(series[metric])
+    if np.count_nonzero(ok) < 3:
+        return float('nan')
+    hours = (series['t_end'][ok] - series['t_end'][ok][0]) / 3600.0
+    return float(np.polyfit(hours, series[metric][ok], 1)[0])
+
+
+def print_window(row, alerts):
+    flag = '  ALERT: ' + ', '.join(f"{n} {v:.4g} (batas {lim:.4g})" for n, v, lim in alerts) if alerts else ''
+    print(f"   {time.strftime('%H:%M:%S')} {row['ops_per_sec']:8.1f} ops/s  p50 {row['latency_p50_ms']:6.2f} ms  "
+          f"p99 {row['latency_p99_ms']:6.2f} ms  jitter {row['jitter_ms']:5.2f} ms  "
+          f"error {row['error_rate']:.2e}  resync {row['resyncs']}{flag}")
+
+
+def print_report(series):
+    if not len(series):
+        print("Time-series kosong.")
+        return
+    hours = (series['t_end'][-1] - series['t_end'][0]) / 3600.0
+    print(f"Soak: {len(series)} window ({hours:.2f} jam), {int(series['vectors'].sum())} vectors, "
+          f"{int(series['mismatches'].sum())} mismatch, {int(series['failed'].sum())} gagal, "
+          f"{int(np.count_nonzero(series['alerts']))} window dengan alert")
+    for metric in ENVELOPES:
+        values = series[metric][np.isfinite(series[metric])]
+        if len(values):
+            print(f"   {metric:<15s} median {np.median(values):10.4g}  min {values.min():10.4g}  "
+                  f"max {values.max():10.4g}  drift {drift_per_hour(series, metric):+.4g}/jam")
+
+
+def _open_sim(baud):
+    from fake_serial import UartModelSerial
+    return UartModelSerial(baudrate=baud, latency=0.0005)
+
+
+async def _main(port, baud, minutes):
+    if port is None:
+        from transport import SqrtDevice
+        dev = await SqrtDevice(_open_sim(baud), depth=DEPTH).start()
+    else:
+        dev = await open_device(port, baud, depth=DEPTH)
+    print(f"   depth {dev.depth}, jeda antar word {dev.word_gap * 1e3:.3f} ms")
+    async with dev:
+        await soak(dev, None if minutes is None else minutes * 60.0, on_window=print_window)
+
+
+def run_soak(port=None, baud=BAUD_RATE, minutes=None):
+    """Blocking soak on `port` (None = UartModelSerial at `baud`) for `minutes` (None = until Ctrl+C)."""
+    asyncio.run(_main(port, baud, minutes))
+
+
+if __name__ == "__main__":
+    # python soak.py [--hw | --port COM6] [--minutes M]  -> soak (default: simulasi UartModelSerial)
+    # python soak.py report [file]                 -> ringkasan & drift dari time-series
+    args = sys.argv[1:]
+    if args[:1] == ['report']:
+        print_report(load_series(args[1] if len(args) > 1 else SERIES_FILE))
+        sys.exit(0)
+    port = args[args.index('--port') + 1] if '--port' in args else (PORT_NAME if '--hw' in args else None)
+    minutes = float(args[args.index('--minutes') + 1]) if '--minutes' in args else None
+    print(f"Soak test ({port or 'simulasi'}, {BAUD_RATE} baud, window {WINDOW_SECONDS:.0f} s, "
+          f"time-series '{SERIES_FILE}', Ctrl+C untuk berhenti):")
+    try:
+        run_soak(port, BAUD_RATE, minutes)
+    except KeyboardInterrupt:
+        pass
+    print_report(load_series())
@@ -0,0 +1,313 @@
+import argparse
+import sys
+import time
+
+# ================= KONFIGURASI =================
+PORT_NAME = 'COM6'     # Default --port
+BAUD_RATE = 9600       # Default --baud, harus sama dengan VHDL
+QUERY_TIMEOUT = 0.5    # Detik menunggu balasan satu query
+QUERY_RETRIES = 3
+QUERY_SETTLE = 0.0     # Jeda setelah port dibuka (query). Naikkan (mis. 2.0) untuk board yang auto-reset
+SIM_CACHE_DIR = 'sweep_cache_sim'  # Cache + checkpoint untuk --sim, terpisah dari hasil board asli
+# ===============================================
+# Default opsi yang ikut checkpoint. Di argparse default-nya None, jadi
+# --resume hanya mengisi opsi yang tidak diketik user.
+SWEEP_DEFAULTS = {'baud': BAUD_RATE, 'source': 'range:1:65536', 'depth': 1, 'tol': 0, 'out': 'test_results',
+                  'checkpoint_every': 1024, 'timeout': 1.0, 'retries': 3, 'csv': None, 'protocol': 'uart16',
+                  'faults': None}
+PRECISION_DEFAULTS = {'baud': BAUD_RATE, 'source': 'range:1:65536', 'depth': 1, 'tol': 0,
+                      'out': 'scientific_results', 'checkpoint_every': 1024, 'timeout': 1.0, 'retries': 3,
+                      'csv': None, 'faults': None}
+LATENCY_DEFAULTS = {'baud': BAUD_RATE, 'source': 'range:0:65536', 'out': 'latency_results', 'timeout': 1.0,
+                    'retries': 3, 'csv': None, 'faults': None}
+# Modul berat (numpy, asyncio, script HIL) hanya di-import di dalam subcommand
+# yang memakainya: `query` dan `ports` cukup dengan pyserial + struct, jadi satu
+# query ke board selesai dalam ~20-40 ms termasuk start Python (diukur: 2 input,
+# pty sebagai board, Python 3.11). `query --sim` juga memuat numpy + golden model,
+# jadi lebih lambat; berapa lama tergantung mesin (start numpy).
+
+
+def _open_serial(args, timeout):
+    if args.sim:
+        from fake_serial import UartModelSerial
+        return UartModelSerial(baudrate=args.baud, timeout=timeout)
+    import serial
+    return serial.Serial(args.port, args.baud, timeout=timeout)
+
+
+def cmd_query(args):
+    """Send each value as one 2-byte request; print the raw reply and its Q8.8 value."""
+    from pipelined_io import pack_block, unpack_block
+
+    ser = _open_serial(args, args.timeout)
+    failed = 0
+    try:
+        if args.settle > 0:
+            time.sleep(args.settle)
+        for val in args.values:
+            reply = None
+            for _ in range(args.retries):
+                ser.reset_input_buffer()   # Byte sisa (mis. balasan telat) tidak ikut terbaca
+                ser.write(pack_block([val]))
+                data = ser.read(2)
+                if len(data) == 2:
+                    reply = unpack_block(data)[0]
+                    break
+            if reply is None:
+                failed += 1
+                print(f"{val}\tTIMEOUT")
+            elif args.raw:
+                print(reply)
+            else:
+                print(f"{val}\t0x{reply:04X}\t{reply / 256.0:.4f}")
+    finally:
+        ser.close()
+    return 1 if failed else 0
+
+
+def cmd_ports(args):
+    from serial.tools import list_ports
+    for port in sorted(list_ports.comports()):
+        print(f"{port.device}\t{port.description}")
+    return 0
+
+
+def _link_setup(args, script, task, defaults):
+    """Fill a HIL script's KONFIGURASI from the arguments, then the checkpoint (--resume), then `defaults`."""
+    cache_dir = SIM_CACHE_DIR if args.sim else script.CACHE_DIR
+    if args.resume:
+        from sweep_cache import load_checkpoint
+        checkpoint = load_checkpoint(cache_dir)
+        if checkpoint is None or checkpoint.get('task') != task:
+            print(f"Tidak ada checkpoint {task} di '{cache_dir}' untuk dilanjutkan.")
+            return False
+        print(f"Melanjutkan {task} ({checkpoint['source']}): {checkpoint.get('position', 0)}/"
+              f"{checkpoint.get('total', '?')} data, {checkpoint.get('failed', 0)} gagal, "
+              f"checkpoint {checkpoint['updated']}")
+        for key in defaults:
+            if getattr(args, key) is None and checkpoint.get(key) is not None:
+                setattr(args, key, checkpoint[key])
+        args.port = args.port or checkpoint['port']
+    for key, value in defaults.items():
+        if getattr(args, key) is None:
+            setattr(args, key, value)
+    args.port = args.port or PORT_NAME
+    script.PORT_NAME, script.BAUD_RATE = args.port, args.baud
+    script.INPUT_SOURCE = args.source
+    script.RESULT_DIR = args.out
+    script.CACHE_DIR = cache_dir
+    if args.csv:
+        script.EXPORT_CSV, script.OUTPUT_FILE = True, args.csv
+    script.FAULTS = args.faults
+    if args.sim and getattr(args, 'protocol', 'uart16') != 'uart16':
+        from framed_protocol import ReferenceEndpoint
+        script.SERIAL_OPENER = lambda port, baud: ReferenceEndpoint(port, baud)
+    elif args.sim:
+        from fake_serial import fake_opener
+        script.SERIAL_OPENER = fake_opener(args.faults, uart_model=True)
+    return True
+
+
+def cmd_sweep(args):
+    # Script HIL lama dipakai apa adanya; KONFIGURASI-nya diisi dari argumen
+    import full_test_suite as suite
+    if not _link_setup(args, suite, 'sweep', SWEEP_DEFAULTS):
+        return 1
+    suite.PIPELINE_DEPTH = args.depth
+    suite.GOLDEN_LSB_TOLERANCE = args.tol
+    suite.CHECKPOINT_EVERY = args.checkpoint_every
+    suite.TIMEOUT, suite.RETRIES = args.timeout, args.retries
+    suite.PROTOCOL = args.protocol
+    try:
+        if args.quick:
+            suite.run_quick_test()
+        else:
+            suite.run_fpga_test()
+    except KeyboardInterrupt:
+        print("\nDihentikan. Hasil sampai checkpoint terakhir tersimpan; lanjutkan dengan --resume.")
+        return 130
+    return 0
+
+
+def cmd_precision(args):
+    import test_system_output as test
+    if not _link_setup(args, test, 'precision', PRECISION_DEFAULTS):
+        return 1
+    test.PIPELINE_DEPTH = args.depth
+    test.GOLDEN_LSB_TOLERANCE = args.tol
+    test.CHECKPOINT_EVERY = args.checkpoint_every
+    test.TIMEOUT, test.RETRIES = args.timeout, args.retries
+    try:
+        test.run_scientific_test()
+    except KeyboardInterrupt:
+        print("\nDihentikan. Hasil sampai checkpoint terakhir tersimpan; lanjutkan dengan --resume.")
+        return 130
+    return 0
+
+
+def cmd_latency(args):
+    import system_latency_test as test
+    if not _link_setup(args, test, 'latency', LATENCY_DEFAULTS):
+        return 1
+    test.TIMEOUT, test.RETRIES = args.timeout, args.retries
+    try:
+        test.run_latency_test()
+    except KeyboardInterrupt:
+        print("\nDihentikan. Hasil sampai checkpoint terakhir tersimpan; lanjutkan dengan --resume.")
+        return 130
+    return 0
+
+
+def cmd_report(args):
+    from analysis import analyze
+    from stream_stats import TOLERANCES_LSB
+    try:
+        metrics = analyze(args.results, args.latency, tolerances=args.tol or TOLERANCES_LSB, golden=True)
+    except FileNotFoundError as e:
+        print(f"ERROR: hasil tidak ditemukan: {e}")
+        return 1
+    for key, value in metrics.items():
+        print(f"{key:<16}: {value}")
+    return 0
+
+
+def cmd_compare(args):
+    """Every run against the first one (or one run against the golden model), see compare_runs.py."""
+    import numpy as np
+    from compare_runs import align, compare, print_comparison, save_heatmaps
+
+    try:
+        runs = align(args.results, golden=args.golden or len(args.results) == 1)
+    except FileNotFoundError as e:
+        print(f"ERROR: hasil tidak ditemukan: {e}")
+        return 1
+    results = compare(runs)
+    print_comparison(runs, results, tol=args.tol, show=args.show)
+    if args.heatmap:
+        print(f"Heatmap per oktaf: '{save_heatmaps(runs, args.heatmap)}'")
+    over = sum(int(np.count_nonzero(np.abs(r['bits']['delta_lsb']) > args.tol)) for r in results)
+    return 1 if over else 0
+
+
+def cmd_soak(args):
+    import soak
+    port = None if args.sim else args.port
+    try:
+        soak.run_soak(port, args.baud, args.minutes)
+    except KeyboardInterrupt:
+        pass
+    soak.print_report(soak.load_series())
+    return 0
+
+
+def _uint16(s):
+    # Tipe argparse untuk input query: desimal atau 0x.., harus muat di 2 byte request
+    try:
+        value = int(s, 0)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{s}' bukan bilangan bulat")
+    if not 0 <= value <= 0xFFFF:
+        raise argparse.ArgumentTypeError(f"{s} di luar rentang input uint16 (0..65535)")
+    return value
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='sqrt_cli', description='FPGA Q8.8 square root: HIL tools')
+    link = argparse.ArgumentParser(add_help=False)
+    link.add_argument('--port', help=f"serial port (default {PORT_NAME})")
+    link.add_argument('--baud', type=int, help=f"baud rate (default {BAUD_RATE})")
+    sim = argparse.ArgumentParser(add_help=False)
+    sim.add_argument('--sim', action='store_true', help="simulasi tanpa board (fake_serial.UartModelSerial @ --baud)")
+    resume = argparse.ArgumentParser(add_help=False)
+    resume.add_argument('--resume', action='store_true', help="lanjutkan sweep terakhir dari checkpoint")
+    resume.add_argument('--faults', help="dengan --sim: 'drop=0.001,dup=0.001,delay=0.001,disconnect=40000' "
+                                         "(--resume --sim memakai fault dari checkpoint)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('query', parents=[link, sim], help="hitung sqrt untuk beberapa input")
+    p.add_argument('values', nargs='+', type=_uint16, help="input uint16 (desimal atau 0x..)")
+    p.add_argument('--timeout', type=float, default=QUERY_TIMEOUT)
+    p.add_argument('--retries', type=int, default=QUERY_RETRIES)
+    p.add_argument('--settle', type=float, default=QUERY_SETTLE, help="detik tunggu setelah port dibuka")
+    p.add_argument('--raw', action='store_true', help="cetak balasan mentah saja")
+    p.set_defaults(func=cmd_query)
+
+    p = sub.add_parser('ports', help="daftar serial port")
+    p.set_defaults(func=cmd_ports)
+
+    d = SWEEP_DEFAULTS
+    p = sub.add_parser('sweep', parents=[link, sim, resume], help="sweep presisi (full_test_suite.py)")
+    p.add_argument('--source', help=f"spec vector_source.py (default {d['source']})")
+    p.add_argument('--quick', action='store_true', help="sampling strata + adaptif (sweep_planner.py)")
+    p.add_argument('--depth', type=int,
+                   help=f"request in flight; > 1 dengan jeda antar word (pipelined_io.safe_pacing) (default {d['depth']})")
+    p.add_argument('--tol', type=int, help=f"selisih maksimum vs golden model, LSB (default {d['tol']})")
+    p.add_argument('--checkpoint-every', type=int, help=f"vector per checkpoint (default {d['checkpoint_every']})")
+    p.add_argument('--timeout', type=float, help=f"detik tunggu balasan sebelum resync (default {d['timeout']})")
+    p.add_argument('--retries', type=int, help=f"kirim ulang maksimal per vector (default {d['retries']})")
+    p.add_argument('--out', help=f"folder hasil (default {d['out']})")
+    p.add_argument('--csv', help="export CSV format lama")
+    p.add_argument('--protocol', choices=('uart16', 'framed', 'auto'),
+                   help="uart16 = 2 byte per request, framed = batch + CRC (framed_protocol.py), auto = deteksi "
+                        f"(default {d['protocol']})")
+    p.set_defaults(func=cmd_sweep)
+
+    d = PRECISION_DEFAULTS
+    p = sub.add_parser('precision', parents=[link, sim, resume],
+                       help="presisi + SQNR/ENOB (test_system_output.py)")
+    p.add_argument('--source', help=f"spec vector_source.py (default {d['source']})")
+    p.add_argument('--depth', type=int,
+                   help=f"request in flight; > 1 dengan jeda antar word (pipelined_io.safe_pacing) (default {d['depth']})")
+    p.add_argument('--tol', type=int, help=f"selisih maksimum vs golden model, LSB (default {d['tol']})")
+    p.add_argument('--checkpoint-every', type=int, help=f"vector per checkpoint (default {d['checkpoint_every']})")
+    p.add_argument('--timeout', type=float, help=f"detik tunggu balasan sebelum resync (default {d['timeout']})")
+    p.add_argument('--retries', type=int, help=f"kirim ulang maksimal per vector (default {d['retries']})")
+    p.add_argument('--out', help=f"folder hasil (default {d['out']})")
+    p.add_argument('--csv', help="export CSV format lama")
+    p.set_defaults(func=cmd_precision)
+
+    p = sub.add_parser('latency', parents=[link, sim, resume], help="ukur round-trip latency (system_latency_test.py)")
+    d = LATENCY_DEFAULTS
+    p.add_argument('--source', help=f"spec vector_source.py (default {d['source']})")
+    p.add_argument('--timeout', type=float, help=f"detik tunggu balasan sebelum resync (default {d['timeout']})")
+    p.add_argument('--retries', type=int, help=f"kirim ulang maksimal per vector (default {d['retries']})")
+    p.add_argument('--out', help=f"folder hasil (default {d['out']})")
+    p.add_argument('--csv', help="export CSV format lama")
+    p.set_defaults(func=cmd_latency)
+
+    p = sub.add_parser('report', help="metrik presisi & latency dari hasil (analysis.py)")
+    p.add_argument('results', help="folder hasil atau CSV")
+    p.add_argument('--latency', help="hasil latency terpisah")
+    p.add_argument('--tol', type=float, nargs='+', help="toleransi pass rate, LSB (default stream_stats.TOLERANCES_LSB)")
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser('compare', help="bandingkan beberapa hasil (compare_runs.py)")
+    p.add_argument('results', nargs='+', help="folder hasil / CSV; semua dibandingkan dengan yang pertama")
+    p.add_argument('--golden', action='store_true', help="golden model sebagai referensi (otomatis untuk 1 hasil)")
+    p.add_argument('--heatmap', help="simpan heatmap error per oktaf ke CSV")
+    p.add_argument('--tol', type=int, default=0, help="selisih yang masih dianggap sama, LSB")
+    p.add_argument('--show', type=int, default=10, help="jumlah input beda yang dicetak")
+    p.set_defaults(func=cmd_compare)
+
+    p = sub.add_parser('soak', parents=[link, sim], help="soak test dengan drift monitoring (soak.py)")
+    p.add_argument('--minutes', type=float, help="durasi (default: sampai Ctrl+C)")
+    p.set_defaults(func=cmd_soak)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, 'faults', None):
+        if not args.sim:
+            parser.error("--faults hanya berlaku dengan --sim (board asli tidak bisa diberi fault)")
+        if getattr(args, 'protocol', None) not in (None, 'uart16'):
+            parser.error("--faults hanya untuk --protocol uart16")
+    if getattr(args, 'resume', None) is None and hasattr(args, 'port'):
+        args.port = args.port or PORT_NAME
+        args.baud = args.baud or BAUD_RATE
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import golden_model
+
+# ================= KONFIGURASI =================
+TABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sqrt_table')
+DOMAIN = 65536
+# ===============================================
+
+
+def lut_hash(src_dir=golden_model.SRC_DIR):
+    """Version of the table: hash of the NR and GS ROM contents parsed from the RTL."""
+    nr_lut, gs_lut = golden_model.load_luts(src_dir)
+    h = hashlib.sha256()
+    h.update(nr_lut.astype('<u4').tobytes())
+    h.update(gs_lut.astype('<u4').tobytes())
+    return 'lut-' + h.hexdigest()[:16]
+
+
+def table_path(version, table_dir=TABLE_DIR):
+    return os.path.join(table_dir, f"sqrt_q88_{version}.npy")
+
+
+def stored_versions(table_dir=TABLE_DIR):
+    """Versions of the tables in `table_dir`, oldest first (by file time)."""
+    if not os.path.isdir(table_dir):
+        return []
+    names = [n for n in os.listdir(table_dir) if n.startswith('sqrt_q88_') and n.endswith('.npy')
+             and not n.endswith('.tmp.npy')]
+    names.sort(key=lambda n: os.path.getmtime(os.path.join(table_dir, n)))
+    return [n[len('sqrt_q88_'):-len('.npy')] for n in names]
+
+
+def resolve_version(version=None, table_dir=TABLE_DIR):
+    """`version`, else the current LUTs' lut_hash, else (no RTL tree) the newest stored table."""
+    if version is not None:
+        return version
+    try:
+        return lut_hash()
+    except OSError:
+        # Tanpa src/*.vhd (mis. hanya script/ yang dipasang): pakai tabel terbaru yang tersimpan
+        stored = stored_versions(table_dir)
+        if not stored:
+            raise FileNotFoundError(f"RTL tidak ditemukan dan belum ada tabel di '{table_dir}'") from None
+        return stored[-1]
+
+
+def write_table(replies, version, table_dir=TABLE_DIR, **meta):
+    """Store a full 65,536-entry reply table (128 KB) atomically, plus its .json metadata."""
+    replies = np.asarray(replies, dtype=np.uint16)
+    if replies.shape != (DOMAIN,):
+        raise ValueError(f"Tabel harus berisi tepat {DOMAIN} balasan, dapat {replies.shape}")
+    os.makedirs(table_dir, exist_ok=True)
+    path = table_path(version, table_dir)
+    np.save(path + '.tmp.npy', replies)
+    os.replace(path + '.tmp.npy', path)
+
+    meta = dict(meta, version=version, created=time.strftime('%Y-%m-%d %H:%M:%S'))
+    with open(path[:-len('.npy')] + '.json', 'w') as f:
+        json.dump(meta, f, indent=2)
+    return path
+
+
+def import_sweep(cache, version=None, table_dir=TABLE_DIR):
+    """Store a complete HIL sweep (SweepCache) as a table, versioned by the sweep's build_id.
+
+    Replies that differ from the golden model are kept (the table serves what
+    the hardware does) but counted in the metadata. Look it up with
+    table(version=cache.build_id).
+    """
+    if not cache.done.all():
+        raise ValueError(f"Sweep '{cache.path}' belum lengkap: {DOMAIN - int(cache.done.sum())} input belum ada")
+    version = version or cache.build_id
+    replies = np.array(cache.replies)
+    mismatches = int(np.count_nonzero(replies != golden_model.sqrt_q88(np.arange(DOMAIN))))
+    _reset()
+    return write_table(replies, version, table_dir, source='hil', build_id=cache.build_id,
+                       baud=cache.baud, golden_mismatches=mismatches)
+
+
+def _current_lut_hash():
+    try:
+        return lut_hash()
+    except OSError:
+        return None   # Tanpa RTL: tidak ada tabel golden yang bisa dibuat
+
+
+_TABLES = {}   # (table_dir, version) -> memmap
+_DEFAULT = {}  # table_dir -> versi default (RTL cukup di-parse sekali)
+
+
+def _reset():
+    _TABLES.clear()
+    _DEFAULT.clear()
+
+
+def table(table_dir=TABLE_DIR, version=None):
+    """A reply table, memory-mapped read-only.
+
+    `version` defaults to resolve_version: the current LUTs when the RTL is
+    there, else the newest stored table. Loaded once per (table_dir,
+    version); a missing golden-model table is generated once, but only
+    for the current LUTs (version == lut_hash()).
+    """
+    if version is None:
+        if table_dir not in _DEFAULT:
+            _DEFAULT[table_dir] = resolve_version(None, table_dir)
+        version = _DEFAULT[table_dir]
+    key = (os.path.abspath(table_dir), version)
+    if key not in _TABLES:
+        path = table_path(version, table_dir)
+        if not os.path.exists(path):
+            if not version.startswith('lut-'):
+                raise FileNotFoundError(f"Tabel '{path}' tidak ada (import dulu dengan import_sweep)")
+            if version != _current_lut_hash():
+                # Versi LUT lain tidak bisa dibuat dari ROM yang ada sekarang
+                raise FileNotFoundError(f"Tabel '{path}' tidak ada dan bukan versi LUT RTL saat ini")
+            write_table(golden_model.sqrt_q88(np.arange(DOMAIN)), version, table_dir, source='golden')
+        _TABLES[key] = np.load(path, mmap_mode='r')
+    return _TABLES[key]
+
+
+def sqrt_q88(values, version=None):
+    """Hardware-identical Q8.8 sqrt of uint16 inputs by table lookup.
+
+    uint16 arrays index the table directly; other integer inputs are
+    wrapped to 16 bits like the UART word, anything else raises TypeError.
+    Returns uint16 (int for a scalar). `version` picks a stored table (e.g.
+    a HIL sweep's build_id), see table().
+    """
+    x = np.asarray(values)
+    if x.dtype != np.uint16:
+        if not np.issubdtype(x.dtype, np.integer):
+            raise TypeError(f"Input harus bilangan bulat (uint16), dapat dtype {x.dtype}")
+        x = (x.astype(np.int64) & 0xFFFF).astype(np.uint16)
+    out = table(version=version)[x]
+    return out if out.ndim else int(out)
+
+
+if __name__ == "__main__":
+    # python sqrt_table.py                       -> buat/cek tabel + benchmark lookup
+    # python sqrt_table.py import <build> <baud> -> pakai sweep HIL lengkap dari sweep_cache
+    if len(sys.argv) > 1 and sys.argv[1] == 'import':
+        from sweep_cache import SweepCache
+        print(f"Tabel HIL tersimpan di '{import_sweep(SweepCache(sys.argv[2], int(sys.argv[3])))}'")
+        sys.exit(0)
+
+    t0 = time.perf_counter()
+    lookup = table()
+    print(f"Table {resolve_version()}: {lookup.nbytes // 1024} KB, ready in {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    inputs = np.random.default_rng(0).integers(0, DOMAIN, 10000000, dtype=np.uint16)
+    t0 = time.perf_counter()
+    out = sqrt_q88(inputs)
+    elapsed = time.perf_counter() - t0
+    print(f"Lookup : {len(inputs)} inputs in {elapsed * 1000:.1f} ms "
+          f"({len(inputs) * 4 / elapsed / 1e9:.2f} GB/s in+out)")
+
+    t0 = time.perf_counter()
+    ok = np.array_equal(out[:1000000], golden_model.sqrt_q88(inputs[:1000000]))
+    print(f"Golden : 1000000 inputs in {(time.perf_counter() - t0) * 1000:.1f} ms, identical = {ok}")
@@ -0,0 +1,245 @@
+import math
+import os
+import sys
+
+import numpy as np
+
+from golden_model import sqrt_q88
+
+# ================= KONFIGURASI =================
+TOLERANCES_LSB = (2.0, 10.0)   # Pass rate dihitung untuk setiap toleransi ini
+HIST_BIN_LSB = 0.25            # Lebar bin histogram error
+HIST_MAX_LSB = 64.0            # Error di atas ini masuk bin overflow (terakhir)
+SKETCH_ALPHA = 0.01            # Akurasi relatif quantile latency (1%)
+SKETCH_BUCKETS = 2048          # gamma^2048 ns >> latency apa pun
+# ===============================================
+
+
+def merge_moments(n_a, mean_a, m2_a, n_b, mean_b, m2_b):
+    # Welford/Chan: gabungkan (n, mean, M2) dua kelompok data tanpa data mentahnya
+    n = n_a + n_b
+    if n_b == 0:
+        return n_a, mean_a, m2_a
+    delta = mean_b - mean_a
+    mean = mean_a + delta * n_b / n
+    m2 = m2_a + m2_b + delta * delta * n_a * n_b / n
+    return n, mean, m2
+
+
+def block_moments(x):
+    n = len(x)
+    if n == 0:
+        return 0, 0.0, 0.0
+    mean = float(np.mean(x))
+    return n, mean, float(np.sum((x - mean) ** 2))
+
+
+class QuantileSketch:
+    """Mergeable log-bucket quantile sketch (DDSketch style) for positive values.
+
+    Every estimate is within `alpha` relative error of the true quantile;
+    memory is a fixed array of `buckets` counters, so two sketches merge by
+    adding their counts.
+    """
+
+    def __init__(self, alpha=SKETCH_ALPHA, buckets=SKETCH_BUCKETS):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self.counts = np.zeros(buckets, dtype=np.uint64)
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[values > 0]
+        idx = np.ceil(np.log(values) / math.log(self.gamma)).astype(np.int64)
+        np.add.at(self.counts, np.clip(idx, 0, len(self.counts) - 1), 1)
+
+    def merge(self, other):
+        if other.alpha != self.alpha or len(other.counts) != len(self.counts):
+            raise ValueError("QuantileSketch: alpha/bucket count tidak sama, tidak bisa digabung")
+        self.counts += other.counts
+
+    def quantile(self, q):
+        total = int(self.counts.sum())
+        if total == 0:
+            return float('nan')
+        rank = q * (total - 1)
+        i = int(np.searchsorted(np.cumsum(self.counts), rank, side='right'))
+        return 2 * self.gamma ** i / (self.gamma + 1)
+
+
+class StreamStats:
+    """Incremental precision/latency statistics, updated one block at a time.
+
+    Precision (per `update`): Welford mean/variance of the LSB error against
+    math.sqrt, running signal and error power for SQNR, pass counts at fixed
+    LSB tolerances, bit-exact agreement with the golden model and a
+    fixed-bin error histogram. Latency (per `update_latency`): Welford
+    mean/jitter, min/max and a QuantileSketch for P50/P99. Every field is a
+    sum or a mergeable moment, so partial accumulators from several runs
+    combine with `merge` and `summary()` can be queried at any time.
+    """
+
+    def __init__(self, tolerances=TOLERANCES_LSB, bin_lsb=HIST_BIN_LSB, max_lsb=HIST_MAX_LSB):
+        self.tolerances = tuple(float(t) for t in tolerances)
+        self.bin_lsb = bin_lsb
+        self.max_lsb = max_lsb
+
+        self.n = 0
+        self.err_mean = 0.0
+        self.err_m2 = 0.0
+        self.err_max = 0.0
+        self.signal_power = 0.0
+        self.error_power = 0.0
+        self.golden_exact = 0
+        self.pass_counts = np.zeros(len(self.tolerances), dtype=np.int64)
+        self.hist = np.zeros(int(round(max_lsb / bin_lsb)) + 1, dtype=np.int64)
+
+        self.lat_n = 0
+        self.lat_mean = 0.0
+        self.lat_m2 = 0.0
+        self.lat_min = math.inf
+        self.lat_max = 0.0
+        self.sketch = QuantileSketch()
+
+    # ---------------- update ----------------
+    def update(self, inputs, replies, golden=True):
+        """Fold one block of (input, raw Q8.8 reply) pairs into the precision stats.
+
+        `golden=False` skips the bit-exact comparison with the golden model
+        (the costliest step), leaving `golden_exact` uncounted for this block.
+        """
+        inputs = np.asarray(inputs, dtype=np.int64)
+        replies = np.asarray(replies, dtype=np.int64)
+        if len(inputs) == 0:
+            return self
+
+        expected = np.sqrt(inputs)
+        abs_error = np.abs(replies / 256.0 - expected)
+        error_lsb = abs_error * 256.0
+
+        self.n, self.err_mean, self.err_m2 = merge_moments(
+            self.n, self.err_mean, self.err_m2, *block_moments(error_lsb))
+        self.err_max = max(self.err_max, float(error_lsb.max()))
+        self.signal_power += float(np.sum(expected ** 2))
+        self.error_power += float(np.sum(abs_error ** 2))
+        if golden:
+            self.golden_exact += int(np.count_nonzero(replies == sqrt_q88(inputs)))
+        # Semua toleransi dari satu sort + searchsorted, bukan satu pass per toleransi
+        self.pass_counts += np.searchsorted(np.sort(error_lsb), self.tolerances, side='right')
+
+        bins = np.minimum((error_lsb / self.bin_lsb).astype(np.int64), len(self.hist) - 1)
+        self.hist += np.bincount(bins, minlength=len(self.hist))
+        return self
+
+    def update_latency(self, latency_ns):
+        """Fold one block of round-trip latencies (ns, 0 = not measured)."""
+        lat = np.asarray(latency_ns, dtype=np.float64)
+        lat = lat[lat > 0]
+        if len(lat) == 0:
+            return self
+        self.lat_n, self.lat_mean, self.lat_m2 = merge_moments(
+            self.lat_n, self.lat_mean, self.lat_m2, *block_moments(lat))
+        self.lat_min = min(self.lat_min, float(lat.min()))
+        self.lat_max = max(self.lat_max, float(lat.max()))
+        self.sketch.add(lat)
+        return self
+
+    def merge(self, other):
+        """Add another accumulator (e.g. a partial or parallel run) into this one."""
+        if (other.tolerances != self.tolerances or other.bin_lsb != self.bin_lsb
+                or len(other.hist) != len(self.hist)):
+            raise ValueError("StreamStats: toleransi/bin histogram tidak sama, tidak bisa digabung")
+        self.n, self.err_mean, self.err_m2 = merge_moments(
+            self.n, self.err_mean, self.err_m2, other.n, other.err_mean, other.err_m2)
+        self.err_max = max(self.err_max, other.err_max)
+        self.signal_power += other.signal_power
+        self.error_power += other.error_power
+        self.golden_exact += other.golden_exact
+        self.pass_counts += other.pass_counts
+        self.hist += other.hist
+
+        self.lat_n, self.lat_mean, self.lat_m2 = merge_moments(
+            self.lat_n, self.lat_mean, self.lat_m2, other.lat_n, other.lat_mean, other.lat_m2)
+        self.lat_min = min(self.lat_min, other.lat_min)
+        self.lat_max = max(self.lat_max, other.lat_max)
+        self.sketch.merge(other.sketch)
+        return self
+
+    # ---------------- query ----------------
+    def summary(self):
+        """Current metrics as a dict (NaN where nothing has been recorded yet)."""
+        nan = float('nan')
+        if self.error_power == 0:
+            sqnr = 999.0 if self.n else nan  # Perfect score
+        else:
+            sqnr = 10 * math.log10(self.signal_power / self.error_power)
+        avg_lat_ms = self.lat_mean / 1e6 if self.lat_n else nan
+        return {
+            'vectors': self.n,
+            'pass_rate': {t: 100.0 * int(c) / self.n if self.n else nan
+                          for t, c in zip(self.tolerances, self.pass_counts)},
+            'golden_exact': self.golden_exact,
+            'avg_error_lsb': self.err_mean if self.n else nan,
+            'max_error_lsb': self.err_max if self.n else nan,
+            'std_error_lsb': math.sqrt(self.err_m2 / (self.n - 1)) if self.n > 1 else nan,
+            'sqnr_db': sqnr,
+            'enob': (sqnr - 1.76) / 6.02,
+            'latency_vectors': self.lat_n,
+            'avg_latency_ms': avg_lat_ms,
+            'min_latency_ms': self.lat_min / 1e6 if self.lat_n else nan,
+            'max_latency_ms': self.lat_max / 1e6 if self.lat_n else nan,
+            'jitter_ms': math.sqrt(self.lat_m2 / (self.lat_n - 1)) / 1e6 if self.lat_n > 1 else nan,
+            'p50_latency_ms': self.sketch.quantile(0.50) / 1e6,
+            'p99_latency_ms': self.sketch.quantile(0.99) / 1e6,
+            'throughput': 1000.0 / avg_lat_ms if self.lat_n and avg_lat_ms > 0 else nan,
+        }
+
+    def histogram(self):
+        """(bin lower edges in LSB, counts); the last bin collects everything >= max_lsb."""
+        return np.arange(len(self.hist)) * self.bin_lsb, self.hist.copy()
+
+    # ---------------- persistence ----------------
+    def save(self, path):
+        """Write the accumulator atomically, so a crash never leaves a half-written file."""
+        tmp = path + '.tmp.npz'
+        np.savez(tmp, tolerances=np.array(self.tolerances), bin_lsb=self.bin_lsb, max_lsb=self.max_lsb,
+                 precision=np.array([self.n, self.err_mean, self.err_m2, self.err_max,
+                                     self.signal_power, self.error_power, self.golden_exact]),
+                 pass_counts=self.pass_counts, hist=self.hist,
+                 latency=np.array([self.lat_n, self.lat_mean, self.lat_m2, self.lat_min, self.lat_max]),
+                 sketch_alpha=self.sketch.alpha, sketch=self.sketch.counts)
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            stats = cls(tuple(f['tolerances'].tolist()), float(f['bin_lsb']), float(f['max_lsb']))
+            n, stats.err_mean, stats.err_m2, stats.err_max, \
+                stats.signal_power, stats.error_power, golden = f['precision'].tolist()
+            stats.n, stats.golden_exact = int(n), int(golden)
+            stats.pass_counts = f['pass_counts'].copy()
+            stats.hist = f['hist'].copy()
+            lat_n, stats.lat_mean, stats.lat_m2, stats.lat_min, stats.lat_max = f['latency'].tolist()
+            stats.lat_n = int(lat_n)
+            stats.sketch = QuantileSketch(float(f['sketch_alpha']), len(f['sketch']))
+            stats.sketch.counts = f['sketch'].copy()
+        return stats
+
+
+def load_merged(paths):
+    """Load and merge several saved accumulators into one."""
+    merged = None
+    for path in paths:
+        stats = StreamStats.load(path)
+        merged = stats if merged is None else merged.merge(stats)
+    return merged
+
+
+if __name__ == "__main__":
+    # python stream_stats.py a.npz b.npz ...  -> gabungkan & tampilkan ringkasan
+    if len(sys.argv) < 2:
+        print("Usage: python stream_stats.py <stats.npz> [<stats.npz> ...]")
+        sys.exit(1)
+    for key, value in load_merged(sys.argv[1:]).summary().items():
+        print(f"{key:<16}: {value}")
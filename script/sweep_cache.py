@@ -0,0 +1,198 @@
+import asyncio
+import glob
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from golden_model import SRC_DIR
+from pipelined_io import PIPELINE_DEPTH
+from transport import PROTOCOL, RETRIES, TIMEOUT, open_device, serial_opener
+from vector_source import VectorSource, iter_blocks
+
+# ================= KONFIGURASI =================
+CACHE_DIR = 'sweep_cache'                         # Relatif terhadap folder kerja
+BITSTREAM_FILE = 'top_squarerootdigital_uart.sof' # Hasil compile Quartus
+BLOCK_SIZE = 1024                                 # Vector per checkpoint
+DOMAIN = 65536                                    # Semua input uint16
+CHECKPOINT_FILE = 'checkpoint.json'               # Di CACHE_DIR: sweep terakhir yang belum selesai (--resume)
+# ===============================================
+
+
+def build_hash(bitstream_file=BITSTREAM_FILE, src_dir=SRC_DIR):
+    """Identify the build under test: hash of the .sof, else of the RTL sources."""
+    h = hashlib.sha256()
+    if bitstream_file and os.path.exists(bitstream_file):
+        with open(bitstream_file, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        return 'sof-' + h.hexdigest()[:16]
+
+    for path in sorted(glob.glob(os.path.join(src_dir, '*.vhd'))):
+        h.update(os.path.basename(path).encode())
+        with open(path, 'rb') as f:
+            h.update(f.read())
+    return 'rtl-' + h.hexdigest()[:16]
+
+
+class SweepCache:
+    """Persistent per-build result store for the 65,536-input domain.
+
+    Memory-mapped .npy arrays indexed by input value: `replies` (uint16),
+    `latency_ns` (uint64, 0 = not measured), `done` (bool) and `failures`
+    (uint8, sweeps in which the input failed every retry). Writes go
+    straight to disk, so an interrupted sweep keeps everything it finished
+    and the next run only sends what is still missing.
+    """
+
+    def __init__(self, build_id, baud, cache_dir=CACHE_DIR):
+        self.build_id = build_id
+        self.baud = baud
+        self.path = os.path.join(cache_dir, f"{build_id}_{baud}")
+        os.makedirs(self.path, exist_ok=True)
+
+        self.replies = self._open('replies.npy', np.uint16)
+        self.latency_ns = self._open('latency_ns.npy', np.uint64)
+        self.done = self._open('done.npy', np.bool_)
+        self.failures = self._open('failures.npy', np.uint8)
+
+        self._meta_file = os.path.join(self.path, 'meta.json')
+        if os.path.exists(self._meta_file):
+            with open(self._meta_file) as f:
+                self.meta = json.load(f)
+        else:
+            self.meta = {'build_id': build_id, 'baud': baud,
+                         'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+                         'sweep_seconds': 0.0}
+            self._write_meta()
+
+    def _open(self, name, dtype):
+        path = os.path.join(self.path, name)
+        if os.path.exists(path):
+            return np.load(path, mmap_mode='r+')
+        return np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(DOMAIN,))
+
+    def _write_meta(self):
+        self.meta['updated'] = time.strftime('%Y-%m-%d %H:%M:%S')
+        self.meta['completed'] = int(np.count_nonzero(self.done))
+        self.meta['failed'] = int(np.count_nonzero(self.failures & ~self.done))
+        with open(self._meta_file, 'w') as f:
+            json.dump(self.meta, f, indent=2)
+
+    def missing(self, values, need_latency=False):
+        """Values (in the given order) that still have no cached reply/latency.
+
+        `values` may be an array-like or a vector_source.VectorSource.
+        """
+        if isinstance(values, VectorSource):
+            parts = [self.missing(chunk, need_latency) for chunk in values.blocks()]
+            return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+        values = np.asarray(values, dtype=np.int64)
+        if need_latency:
+            return values[self.latency_ns[values] == 0]
+        return values[~self.done[values]]
+
+    def record(self, values, replies, latency_ns=None, seconds=0.0):
+        idx = np.asarray(values, dtype=np.int64)[:len(replies)]
+        self.replies[idx] = replies
+        self.done[idx] = True
+        if latency_ns is not None:
+            self.latency_ns[idx] = np.asarray(latency_ns)[:len(idx)]
+        self.failures[idx] = 0
+        self.meta['sweep_seconds'] += seconds
+        self.flush()
+
+    def record_failed(self, values):
+        """Count inputs that got no reply after every retry; they stay missing for a re-run."""
+        idx = np.asarray(values, dtype=np.int64)
+        if len(idx):
+            self.failures[idx] = np.minimum(self.failures[idx].astype(np.int64) + 1, 255)
+            self.flush()
+
+    def failed_inputs(self):
+        return np.flatnonzero(self.failures & ~self.done)
+
+    def flush(self):
+        self.replies.flush()
+        self.latency_ns.flush()
+        self.done.flush()
+        self.failures.flush()
+        self._write_meta()
+
+
+def save_checkpoint(settings, cache_dir=CACHE_DIR):
+    """Remember how the running sweep was started (task, port, source spec, ...) for --resume."""
+    os.makedirs(cache_dir, exist_ok=True)
+    settings = dict(settings, updated=time.strftime('%Y-%m-%d %H:%M:%S'))
+    tmp = os.path.join(cache_dir, CHECKPOINT_FILE + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(settings, f, indent=2)
+    os.replace(tmp, os.path.join(cache_dir, CHECKPOINT_FILE))  # Atomic: crash tidak merusak checkpoint lama
+
+
+def load_checkpoint(cache_dir=CACHE_DIR):
+    path = os.path.join(cache_dir, CHECKPOINT_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def clear_checkpoint(cache_dir=CACHE_DIR):
+    path = os.path.join(cache_dir, CHECKPOINT_FILE)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+async def sweep_cached(dev, cache, values, block=BLOCK_SIZE, progress=None, on_block=None, checkpoint=None):
+    """Sweep the uncached part of `values` on an open SqrtDevice, checkpointing per block.
+
+    `values` is an array-like or a VectorSource; it is walked block by
+    block, so a lazy source is never materialised. Returns True when every
+    value has a cached reply. Vectors that failed all transport retries
+    stay uncached and are counted in `cache.failures`, so a re-run only
+    sends those. `on_block(values, replies)` sees each answered block right
+    after it is cached (e.g. to feed a StreamStats); `progress(done,
+    total)` counts all of `values`. With a `checkpoint` dict the position
+    is saved after every block (save_checkpoint) and the checkpoint is
+    removed once the sweep is complete.
+    """
+    total = len(values)
+    done = 0
+    if checkpoint is not None:
+        save_checkpoint(dict(checkpoint, cache=cache.path, position=0, total=total), os.path.dirname(cache.path))
+    for source_block in iter_blocks(values, block):
+        done += len(source_block)
+        chunk = cache.missing(source_block).tolist()
+        if not chunk:
+            continue
+        t0 = time.perf_counter()
+        replies = await dev.sqrt_many(chunk)
+        answered = [(val, r) for val, r in zip(chunk, replies) if r is not None]
+        block_vals, block_replies = [val for val, _ in answered], [r for _, r in answered]
+        cache.record(block_vals, block_replies, seconds=time.perf_counter() - t0)
+        cache.record_failed([val for val, r in zip(chunk, replies) if r is None])
+        if checkpoint is not None:
+            save_checkpoint(dict(checkpoint, cache=cache.path, position=done, total=total,
+                                 failed=int(cache.meta['failed'])), os.path.dirname(cache.path))
+        if on_block is not None:
+            on_block(block_vals, block_replies)
+        if progress is not None:
+            progress(done, total)
+    complete = not any(len(cache.missing(chunk)) for chunk in iter_blocks(values, block))
+    if complete and checkpoint is not None:
+        clear_checkpoint(os.path.dirname(cache.path))
+    return complete
+
+
+def run_cached(port, baud, cache, values, depth=PIPELINE_DEPTH, progress=None, on_block=None,
+               block=BLOCK_SIZE, timeout=TIMEOUT, retries=RETRIES, opener=serial_opener, checkpoint=None,
+               protocol=PROTOCOL):
+    """Blocking wrapper: open `port`, sweep what the cache is missing, close."""
+    async def main():
+        async with await open_device(port, baud, depth=depth, timeout=timeout, retries=retries,
+                                     opener=opener, protocol=protocol) as dev:
+            return await sweep_cached(dev, cache, values, block, progress, on_block, checkpoint)
+    return asyncio.run(main())
@@ -0,0 +1,193 @@
+import math
+import time
+
+import numpy as np
+
+import golden_model
+
+# ================= KONFIGURASI =================
+DOMAIN = 65536
+PER_STRATUM = 2        # Vector awal per strata (oktaf msb_detector x index GS ROM)
+PEAK_COUNT = 16        # Error terbesar yang dipadatkan di setiap ronde
+PEAK_RADIUS = 8        # Tetangga +/- di sekitar setiap puncak error
+SQNR_CI_DB = 0.05      # Berhenti kalau setengah lebar interval SQNR <= ini
+MAX_GROWTH_LSB = 0.05  # ... dan max error naik kurang dari ini di ronde terakhir
+CONFIDENCE_Z = 1.96    # 95%
+MAX_ROUNDS = 8
+# ===============================================
+
+
+def input_strata():
+    """Per input 0..65535: (octave, NR ROM address, GS ROM address), as the RTL computes them.
+
+    octave = MSB position from msb_detector (shift S = 30 - octave); input 0
+    takes the FSM bypass and gets octave -1.
+    """
+    nr_lut, _ = golden_model._luts()
+    x = np.arange(DOMAIN, dtype=np.int64)
+    data_norm, shift = golden_model.normalise(np.where(x == 0, 1, x))
+    nr_addr = (data_norm >> 20) & 0x3FF
+    gs_addr = (nr_lut[nr_addr] >> 22) & 0xFF
+    octave = np.where(x == 0, -1, golden_model.NORM_MSB - shift)
+    return octave, nr_addr, gs_addr
+
+
+class SweepPlanner:
+    """Chooses which inputs to send, batch by batch, for a quick regression sweep.
+
+    Round 0 is a stratified plan: `per_stratum` inputs from every
+    (octave, GS ROM index) stratum, one input for every reachable NR ROM
+    index, and the edge cases (0, 1, 65535, 2^k and 2^k - 1). Every later
+    round adds `per_stratum` random inputs per stratum and densifies around
+    the largest LSB errors seen so far. The planner stops once the 95%
+    interval of the SQNR estimate is within `sqnr_ci_db` and a round raised
+    the max error by less than MAX_GROWTH_LSB, after `max_rounds`, or when
+    the domain is covered.
+
+    Usage: `while (batch := planner.next_batch()) is not None:` send the
+    batch, then `planner.add_results(inputs, replies)`.
+    """
+
+    def __init__(self, per_stratum=PER_STRATUM, sqnr_ci_db=SQNR_CI_DB, max_rounds=MAX_ROUNDS, seed=0):
+        self.per_stratum = per_stratum
+        self.sqnr_ci_db = sqnr_ci_db
+        self.max_rounds = max_rounds
+        self.rng = np.random.default_rng(seed)
+
+        self.octave, self.nr_addr, self.gs_addr = input_strata()
+        strata_key = (self.octave + 1) * 256 + self.gs_addr
+        self.stratum_ids, self.stratum = np.unique(strata_key, return_inverse=True)
+        self.stratum_size = np.bincount(self.stratum)
+
+        self.sent = np.zeros(DOMAIN, dtype=bool)
+        self.random = np.zeros(DOMAIN, dtype=bool)   # Masuk estimasi SQNR (bukan sampel bias puncak)
+        self.answered = np.zeros(DOMAIN, dtype=bool)
+        self.error_lsb = np.zeros(DOMAIN, dtype=np.float64)
+
+        self.round = 0
+        self.history = []   # estimate() setelah setiap ronde
+        self._last_max = -1.0
+
+    # ---------------- rencana ----------------
+    def _stratified(self):
+        picks = []
+        order = np.argsort(self.stratum, kind='stable')
+        bounds = np.cumsum(self.stratum_size)[:-1]
+        for members in np.split(order, bounds):
+            idx = np.linspace(0, len(members) - 1, min(self.per_stratum, len(members))).round().astype(np.int64)
+            picks.append(members[idx])
+        picks = np.concatenate(picks)
+        self.random[picks] = True
+
+        # Satu input untuk setiap index NR ROM yang bisa dicapai
+        covered = np.zeros(1024, dtype=bool)
+        covered[self.nr_addr[picks]] = True
+        first_per_addr = np.unique(self.nr_addr, return_index=True)[1]
+        extra = first_per_addr[~covered[self.nr_addr[first_per_addr]]]
+
+        powers = 1 << np.arange(16)
+        edges = np.concatenate(([0, 1, DOMAIN - 1], powers, powers - 1))
+        return np.unique(np.concatenate((picks, extra, edges)))
+
+    def _refine(self):
+        # Sampel acak tambahan per strata (untuk estimasi) ...
+        picks = []
+        for s in range(len(self.stratum_size)):
+            free = np.flatnonzero((self.stratum == s) & ~self.sent)
+            if len(free):
+                picks.append(self.rng.choice(free, min(self.per_stratum, len(free)), replace=False))
+        picks = np.concatenate(picks) if picks else np.zeros(0, dtype=np.int64)
+        self.random[picks] = True
+
+        # ... plus pemadatan di sekitar puncak error (hanya untuk max error)
+        done = np.flatnonzero(self.answered)
+        peaks = done[np.argsort(self.error_lsb[done])[-PEAK_COUNT:]]
+        around = (peaks[:, None] + np.arange(-PEAK_RADIUS, PEAK_RADIUS + 1)).ravel()
+        around = around[(around >= 0) & (around < DOMAIN)]
+        return np.unique(np.concatenate((picks, around)))
+
+    def next_batch(self):
+        """Inputs to send next (sorted int64 array), or None when the sweep can stop."""
+        if self.round == 0:
+            batch = self._stratified()
+        else:
+            if self.round >= self.max_rounds or self.sent.all():
+                return None
+            est = self.history[-1]
+            if est['sqnr_halfwidth_db'] <= self.sqnr_ci_db and not est['max_grew']:
+                return None
+            batch = self._refine()
+        batch = batch[~self.sent[batch]]
+        self.sent[batch] = True
+        self.round += 1
+        return batch if len(batch) else self.next_batch()
+
+    # ---------------- hasil ----------------
+    def add_results(self, inputs, replies):
+        inputs = np.asarray(inputs, dtype=np.int64)
+        replies = np.asarray(replies, dtype=np.float64)
+        self.error_lsb[inputs] = np.abs(replies - np.sqrt(inputs) * 256.0)
+        self.answered[inputs] = True
+        self.history.append(self.estimate())
+
+    def estimate(self):
+        """Current estimate: stratified SQNR with a 95% interval, max error and LUT coverage."""
+        use = self.answered & self.random
+        err_pow = (self.error_lsb / 256.0) ** 2
+        n_h = np.bincount(self.stratum[use], minlength=len(self.stratum_size))
+        sum_h = np.bincount(self.stratum[use], err_pow[use], minlength=len(self.stratum_size))
+        sq_h = np.bincount(self.stratum[use], err_pow[use] ** 2, minlength=len(self.stratum_size))
+
+        # Estimator strata: total = sum(N_h * mean_h), var = sum(N_h^2 * s_h^2 / n_h * fpc)
+        sampled = n_h > 0
+        N_h, n = self.stratum_size[sampled], n_h[sampled]
+        mean_h = sum_h[sampled] / n
+        var_h = np.where(n > 1, (sq_h[sampled] - n * mean_h ** 2) / np.maximum(n - 1, 1), 0.0)
+        total = float(np.sum(N_h * mean_h))
+        std = math.sqrt(float(np.sum(N_h ** 2 * np.maximum(var_h, 0) / n * (1 - n / N_h))))
+
+        signal = float(DOMAIN * (DOMAIN - 1) / 2)   # sum(sqrt(x)^2) = sum(x)
+        sqnr = lambda e: 10 * math.log10(signal / e) if e > 0 else 999.0
+        low, high = sqnr(total + CONFIDENCE_Z * std), sqnr(max(total - CONFIDENCE_Z * std, 0.0))
+
+        max_err = float(self.error_lsb[self.answered].max()) if self.answered.any() else 0.0
+        n_random = int(use.sum())
+        est = {
+            'round': self.round,
+            'vectors': int(self.answered.sum()),
+            'sqnr_db': sqnr(total),
+            'sqnr_low_db': low,
+            'sqnr_high_db': high,
+            'sqnr_halfwidth_db': (high - low) / 2,
+            'max_error_lsb': max_err,
+            'max_grew': max_err > self._last_max + MAX_GROWTH_LSB,
+            # Batas atas (95%) fraksi input yang error-nya melebihi max yang terlihat
+            'exceed_fraction': 1 - 0.05 ** (1 / n_random) if n_random else 1.0,
+            'strata_covered': f"{int(sampled.sum())}/{len(self.stratum_size)}",
+            'nr_covered': f"{len(np.unique(self.nr_addr[self.answered]))}/{len(np.unique(self.nr_addr))}",
+            'gs_covered': f"{len(np.unique(self.gs_addr[self.answered]))}/{len(np.unique(self.gs_addr))}",
+            'shifts_covered': f"{len(np.unique(self.octave[self.answered]))}/17",
+        }
+        self._last_max = max(self._last_max, max_err)
+        return est
+
+
+if __name__ == "__main__":
+    # python sweep_planner.py  -> jalankan planner terhadap golden model (tanpa FPGA)
+    truth = golden_model.sqrt_q88(np.arange(DOMAIN))
+    planner = SweepPlanner()
+    t0 = time.perf_counter()
+    while (batch := planner.next_batch()) is not None:
+        planner.add_results(batch, truth[batch])
+        est = planner.history[-1]
+        print(f"Round {est['round']}: {est['vectors']:6d} vectors  SQNR {est['sqnr_db']:.3f} dB "
+              f"[{est['sqnr_low_db']:.3f}, {est['sqnr_high_db']:.3f}]  max {est['max_error_lsb']:.3f} LSB")
+    elapsed = time.perf_counter() - t0
+
+    err = np.abs(truth - np.sqrt(np.arange(DOMAIN)) * 256.0)
+    true_sqnr = 10 * math.log10(np.sum(np.arange(DOMAIN)) / np.sum((err / 256.0) ** 2))
+    est = planner.history[-1]
+    print(f"Planned in {elapsed:.2f} s: {est['vectors']} of {DOMAIN} vectors "
+          f"({100 * est['vectors'] / DOMAIN:.1f}%), coverage NR {est['nr_covered']}, "
+          f"GS {est['gs_covered']}, shifts {est['shifts_covered']}")
+    print(f"Full sweep: SQNR {true_sqnr:.3f} dB, max {err.max():.3f} LSB")
@@ -1,27 +1,150 @@
+import asyncio
 import csv
 import serial
-import struct
 import time
 import math
-import statistics
+
+import numpy as np
+
+from fsm_model import CLK_FREQ, predict_latency_ns
+from latency_trace import PhaseTracer, print_breakdown
+from result_format import save_results
+from stream_stats import StreamStats
+from sweep_cache import BLOCK_SIZE, SweepCache, build_hash, clear_checkpoint, save_checkpoint
+from transport import open_device, serial_opener
+from vector_source import from_spec
 
 # ================= KONFIGURASI =================
 PORT_NAME = 'COM6'   # SESUAIKAN COM PORT KAMU!
 BAUD_RATE = 9600     
-INPUT_FILE = 'input_vectors.csv' # Pastikan file ini sudah ada dari langkah sebelumnya
-OUTPUT_FILE = 'latency_results.csv'
+INPUT_SOURCE = 'range:0:65536'      # Spec vector_source.py (dibuat lazy, tanpa file input)
+RESULT_DIR = 'latency_results'      # Hasil binary (kolom .npy)
+OUTPUT_FILE = 'latency_results.csv' # Export CSV opsional
+STATS_FILE = 'latency_stats.npz'    # Akumulator statistik (P50/P99), disimpan tiap blok
+TRACE_FILE = 'latency_trace.json'   # Timeline per fase (buka di chrome://tracing / Perfetto)
+PHASE_HIST_FILE = 'latency_phases.csv'  # Histogram per fase
+EXPORT_CSV = False
+TIMEOUT = 1.0        # Detik menunggu satu balasan sebelum resync
+RETRIES = 3          # Kirim ulang maksimal per vector; yang tetap gagal dicatat di cache (failures.npy)
+SERIAL_OPENER = serial_opener  # (port, baud) -> serial; fake_serial.fake_opener() untuk uji tanpa board
+FAULTS = None        # Spec fake_serial.parse_faults dari board palsu (hanya dicatat di checkpoint)
+CACHE_DIR = 'sweep_cache'      # Folder cache + checkpoint.json (board palsu: folder lain)
 # ===============================================
 
-def run_latency_test():
-    print(f"[INFO] Membuka koneksi ke {PORT_NAME} untuk pengukuran delay...")
-    
-    try:
-        ser = serial.Serial(PORT_NAME, BAUD_RATE, timeout=1)
-        time.sleep(2)  # Tunggu FPGA stabil
+async def measure_latency(cache, stats, tracer, todo, total_tests):
+    # Satu request in flight (depth=1) supaya yang terukur benar-benar round-trip
+    async with await open_device(PORT_NAME, BAUD_RATE, depth=1, timeout=TIMEOUT, retries=RETRIES, tracer=tracer,
+                                 opener=SERIAL_OPENER) as dev:
+        print(f"[START] Memulai pengukuran untuk {len(todo)} data ({total_tests - len(todo)} dari cache)...")
         
-        # List untuk menampung data latency
-        latencies = []
+        # Buffer hasil, disimpan ke cache setiap BLOCK_SIZE data (checkpoint)
+        block_vals, block_replies, block_lat, block_failed = [], [], [], []
+        retried = 0
+        checkpoint = {'task': 'latency', 'port': PORT_NAME, 'baud': BAUD_RATE, 'source': INPUT_SOURCE,
+                      'out': RESULT_DIR, 'timeout': TIMEOUT, 'retries': RETRIES,
+                      'csv': OUTPUT_FILE if EXPORT_CSV else None, 'faults': FAULTS, 'total': total_tests}
+        save_checkpoint(dict(checkpoint, cache=cache.path, position=total_tests - len(todo)), CACHE_DIR)
+
+        # Catat waktu mulai total
+        total_start_time = time.perf_counter()
         
+        for i in todo:
+            val = i
+            
+            # === MULAI STOPWATCH (Per Proses) ===
+            t_start = time.perf_counter_ns()
+            
+            # Kirim & Terima (timeout -> resync & retry di transport.py)
+            raw_val, attempts = await dev.sqrt_attempts(val)
+            
+            # === STOP STOPWATCH (Per Proses) ===
+            t_end = time.perf_counter_ns()
+            
+            # Hitung durasi per item
+            duration_ns = t_end - t_start
+            
+            if raw_val is not None:
+                block_vals.append(val)
+                block_replies.append(raw_val)
+                # Durasi vector yang di-retry termasuk timeout + resync, bukan round-trip:
+                # balasannya disimpan, latency-nya tetap 0 ("belum diukur") dan diukur ulang run berikutnya
+                block_lat.append(max(1, duration_ns) if attempts == 1 else 0)
+                if attempts > 1:
+                    retried += 1
+            else:
+                block_failed.append(val)
+                print(f"TIMEOUT pada input {val}, dilewati (jalankan ulang untuk mengukur ulang)")
+
+            if len(block_vals) + len(block_failed) >= BLOCK_SIZE:
+                cache.record(block_vals, block_replies, block_lat)
+                cache.record_failed(block_failed)
+                stats.update_latency(block_lat).save(STATS_FILE)
+                block_vals, block_replies, block_lat, block_failed = [], [], [], []
+                save_checkpoint(dict(checkpoint, cache=cache.path, failed=cache.meta['failed'],
+                                     position=total_tests - len(cache.missing(todo, need_latency=True))), CACHE_DIR)
+            
+            # Progress bar sederhana
+            if i % 5000 == 0:
+                live = stats.summary()
+                print(f"   Progress: {i}/{total_tests} ... (Latest: {duration_ns / 1e6:.2f} ms, "
+                      f"P50 {live['p50_latency_ms']:.2f} ms, P99 {live['p99_latency_ms']:.2f} ms)")
+
+        # Catat waktu selesai total
+        total_end_time = time.perf_counter()
+        total_duration = total_end_time - total_start_time
+        cache.record(block_vals, block_replies, block_lat, seconds=total_duration)
+        cache.record_failed(block_failed)
+        stats.update_latency(block_lat).save(STATS_FILE)
+        if retried:
+            print(f"[INFO] {retried} input dijawab setelah retry; latency-nya tidak dicatat "
+                  "(jalankan ulang untuk mengukur ulang)")
+    if not len(cache.missing(todo, need_latency=True)):
+        clear_checkpoint(CACHE_DIR)
+    return total_duration
+
+
+def run_latency_test():
+    # Kita pakai data input yang sama (0 - 65535), dibuat lazy oleh vector_source.py
+    test_range = from_spec(INPUT_SOURCE)
+    total_tests = len(test_range)
+
+    # Cache per bitstream & baud: input yang latency-nya sudah terukur tidak diukur ulang
+    cache = SweepCache(build_hash(), BAUD_RATE, CACHE_DIR)
+    todo = cache.missing(test_range, need_latency=True).tolist()
+    total_duration = 0.0
+    tracer = PhaseTracer()  # Timestamp submit / write selesai / byte pertama / byte terakhir
+
+    # Statistik streaming: latency yang sudah ada di cache ikut dihitung
+    stats = StreamStats().update_latency(cache.latency_ns[test_range.values()])
+    
+    if len(todo) == 0:
+        print(f"[INFO] Semua {total_tests} latency sudah ada di cache '{cache.path}'.")
+    else:
+        print(f"[INFO] Membuka koneksi ke {PORT_NAME} untuk pengukuran delay...")
+        try:
+            total_duration = asyncio.run(measure_latency(cache, stats, tracer, todo, total_tests))
+        except serial.SerialException:
+            print(f"ERROR: Port {PORT_NAME} tidak bisa dibuka atau sedang dipakai.")
+            return
+    stats.save(STATS_FILE)
+
+    # Ambil semua latency dari cache (termasuk hasil run sebelumnya)
+    arr_input = test_range.values()
+    arr_failed = arr_input[(cache.latency_ns[arr_input] == 0) & (cache.failures[arr_input] > 0)]
+    arr_input = arr_input[cache.latency_ns[arr_input] != 0]
+    arr_raw = cache.replies[arr_input]
+    arr_latency_ns = cache.latency_ns[arr_input]
+    if not len(arr_input):
+        print(f"[ERROR] Tidak ada latency yang terukur ({len(cache.failed_inputs())} input gagal semua retry). "
+              f"Cek koneksi {PORT_NAME}, lalu jalankan ulang.")
+        return
+
+    # Simpan hasil binary (kolom .npy, lihat result_format.py); input yang gagal semua retry ikut di meta.json
+    save_results(RESULT_DIR, arr_input, arr_raw, arr_latency_ns,
+                 build_id=cache.build_id, baud=BAUD_RATE, failed_inputs=arr_failed.tolist())
+
+    # Export CSV (opsional, format lama)
+    if EXPORT_CSV:
         with open(OUTPUT_FILE, mode='w', newline='') as outfile:
             writer = csv.writer(outfile)
             # Header CSV
@@ -32,87 +155,58 @@ def run_latency_test():
                 'latency_seconds', 
                 'latency_ms'
             ])
-            
-            # Kita pakai data input yang sama (0 - 65535)
-            # Jika file csv belum ada, kita generate range-nya langsung di sini
-            test_range = range(0, 65536) 
-            total_tests = len(test_range)
-            
-            print(f"[START] Memulai pengukuran untuk {total_tests} data...")
-            
-            # Catat waktu mulai total
-            total_start_time = time.perf_counter()
-            
-            for i in test_range:
-                val = i
-                
-                # 1. Packing Data
-                data_to_send = struct.pack('<H', val)
-                
-                # === MULAI STOPWATCH (Per Proses) ===
-                t_start = time.perf_counter()
-                
-                # 2. Kirim & Terima
-                ser.write(data_to_send)
-                response = ser.read(2)
-                
-                # === STOP STOPWATCH (Per Proses) ===
-                t_end = time.perf_counter()
-                
-                # Hitung durasi per item
-                duration = t_end - t_start
-                duration_ms = duration * 1000.0 # Ubah ke milidetik
-                
-                if len(response) == 2:
-                    raw_val = struct.unpack('<H', response)[0]
-                    
-                    # Simpan ke list untuk statistik akhir
-                    latencies.append(duration)
-                    
-                    # Tulis ke CSV
-                    writer.writerow([
-                        val, 
-                        f"0x{val:04X}", 
-                        f"0x{raw_val:04X}", 
-                        f"{duration:.6f}", 
-                        f"{duration_ms:.3f}"
-                    ])
-                else:
-                    print(f"TIMEOUT pada input {val}")
-                    break
-                
-                # Progress bar sederhana
-                if i % 5000 == 0:
-                    print(f"   Progress: {i}/{total_tests} ... (Latest: {duration_ms:.2f} ms)")
-
-            # Catat waktu selesai total
-            total_end_time = time.perf_counter()
-            
-        # ================= HITUNG STATISTIK =================
-        total_duration = total_end_time - total_start_time
-        avg_latency = statistics.mean(latencies)
-        min_latency = min(latencies)
-        max_latency = max(latencies)
-        throughput = total_tests / total_duration
-        
-        print("\n" + "="*40)
-        print("HASIL PENGUKURAN DELAY (Input -> Output)")
-        print("="*40)
-        print(f"Total Data Proses : {total_tests} item")
-        print(f"Total Waktu Real  : {total_duration:.2f} detik ({total_duration/60:.2f} menit)")
-        print("-" * 40)
-        print(f"Delay Rata-rata   : {avg_latency*1000:.3f} ms / proses")
-        print(f"Delay Minimum     : {min_latency*1000:.3f} ms")
-        print(f"Delay Maximum     : {max_latency*1000:.3f} ms")
-        print("-" * 40)
-        print(f"Throughput        : {throughput:.2f} operasi / detik")
-        print("="*40)
-        print(f"Detail tersimpan di '{OUTPUT_FILE}'")
+            for val, raw_val, latency_ns in zip(arr_input.tolist(), arr_raw.tolist(), arr_latency_ns.tolist()):
+                duration = latency_ns / 1e9
+                writer.writerow([
+                    val, 
+                    f"0x{val:04X}", 
+                    f"0x{raw_val:04X}", 
+                    f"{duration:.6f}", 
+                    f"{duration * 1000.0:.3f}"
+                ])
         
-        ser.close()
+    # ================= HITUNG STATISTIK =================
+    latencies = arr_latency_ns / 1e9
+    avg_latency = float(np.mean(latencies))
+    min_latency = float(np.min(latencies))
+    max_latency = float(np.max(latencies))
+    final = stats.summary()
 
-    except serial.SerialException:
-        print(f"ERROR: Port {PORT_NAME} tidak bisa dibuka atau sedang dipakai.")
+    # Pisahkan latency: hitung FPGA (model siklus) vs kabel UART vs overhead host/USB
+    compute_ns, wire_ns = predict_latency_ns(arr_input, CLK_FREQ, BAUD_RATE)
+    avg_compute = float(np.mean(compute_ns)) / 1e9
+    wire = wire_ns / 1e9
+    host_overhead = avg_latency - avg_compute - wire
+    if total_duration > 0:
+        measured = len(todo) - len(cache.missing(todo, need_latency=True))
+        throughput = measured / total_duration
+    else:
+        throughput = 1.0 / avg_latency  # Semua dari cache: estimasi dari rata-rata latency
+    
+    print("\n" + "="*40)
+    print("HASIL PENGUKURAN DELAY (Input -> Output)")
+    print("="*40)
+    print(f"Total Data Proses : {len(latencies)} item")
+    print(f"Total Waktu Real  : {total_duration:.2f} detik ({total_duration/60:.2f} menit)")
+    print("-" * 40)
+    print(f"Delay Rata-rata   : {avg_latency*1000:.3f} ms / proses")
+    print(f"Delay Minimum     : {min_latency*1000:.3f} ms")
+    print(f"Delay Maximum     : {max_latency*1000:.3f} ms")
+    print(f"Delay P50 / P99   : {final['p50_latency_ms']:.3f} / {final['p99_latency_ms']:.3f} ms")
+    print("-" * 40)
+    print(f"  Hitung FPGA     : {avg_compute*1e6:.3f} us (model FSM @ {CLK_FREQ/1e6:.0f} MHz)")
+    print(f"  Kabel UART      : {wire*1000:.3f} ms (2 byte RX + 2 byte TX)")
+    print(f"  Overhead host   : {host_overhead*1000:.3f} ms (USB/driver/OS)")
+    print("-" * 40)
+    print(f"Throughput        : {throughput:.2f} operasi / detik")
+    print("="*40)
+    if tracer.value:
+        print_breakdown(tracer, CLK_FREQ, BAUD_RATE)
+        tracer.export_histograms(PHASE_HIST_FILE)
+        tracer.export_chrome_trace(TRACE_FILE)
+        print(f"Histogram fase: '{PHASE_HIST_FILE}', timeline: '{TRACE_FILE}'")
+        print("="*40)
+    print(f"Detail tersimpan di '{RESULT_DIR}'" + (f" dan '{OUTPUT_FILE}'" if EXPORT_CSV else ""))
 
 if __name__ == "__main__":
     run_latency_test()
\ No newline at end of file
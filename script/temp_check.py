@@ -1,9 +1,9 @@
-import csv
 import math
-import numpy as np
+
+from analysis import analyze
 
 # ================= KONFIGURASI BARU =================
-INPUT_CSV = 'scientific_results.csv'
+INPUT_RESULTS = 'scientific_results'  # Folder binary, atau fallback ke scientific_results.csv
 REPORT_OUTPUT = 'FINAL_REVISED_REPORT.txt'
 
 # Kita longgarkan toleransi jadi 8 LSB (Aman karena Max Error lu cuma 8 LSB)
@@ -13,43 +13,35 @@ NEW_LSB_TOLERANCE = 8.0
 def reanalyze():
     print(f"Menganalisis ulang data dengan Toleransi {NEW_LSB_TOLERANCE} LSB...")
     
-    errors_lsb = []
-    pass_count = 0
-    total_vectors = 0
-    
     try:
-        with open(INPUT_CSV, 'r') as f:
-            reader = csv.DictReader(f)
-            
-            for row in reader:
-                total_vectors += 1
-                
-                # Ambil nilai Error LSB dari CSV
-                # Format di CSV: "3.94 LSB", kita buang teksnya
-                try:
-                    err_val = float(row['Error (LSB)'].replace(' LSB', ''))
-                except ValueError:
-                    continue # Skip header/bad data
-                
-                errors_lsb.append(err_val)
-                
-                # --- PENILAIAN ULANG ---
-                # Kalau error <= 10 LSB, kita anggap PASS
-                if err_val <= NEW_LSB_TOLERANCE:
-                    pass_count += 1
-            
-            # Statistik Baru
-            max_err = max(errors_lsb)
-            avg_err = np.mean(errors_lsb)
-            pass_rate = (pass_count / total_vectors) * 100
-            
-            # Hitung SQNR (Estimasi dari data error)
-            rmse_lsb = np.sqrt(np.mean(np.array(errors_lsb)**2))
-            rmse_real = rmse_lsb / 256.0
-            sqnr = 20 * math.log10(255.0 / rmse_real) if rmse_real > 0 else 99.9
+        # Semua metrik dalam satu pass NumPy (lihat analysis.py)
+        metrics = analyze(INPUT_RESULTS, tolerances=(NEW_LSB_TOLERANCE,), golden=True)
+    except FileNotFoundError:
+        print(f"File {INPUT_RESULTS} gak ketemu. Pastikan ada di folder ini.")
+        return
 
-            # --- BIKIN LAPORAN TEKS BARU ---
-            report = f"""
+    total_vectors = metrics['vectors']
+
+    # --- PENILAIAN ULANG ---
+    # Kalau error <= toleransi, kita anggap PASS
+    pass_count = metrics['pass_count'][NEW_LSB_TOLERANCE]
+    pass_rate = metrics['pass_rate'][NEW_LSB_TOLERANCE]
+
+    # Bandingkan output mentah FPGA dengan golden model (0 LSB)
+    # Golden model bit-exact: pengganti toleransi manual
+    exact_count = metrics['golden_exact']
+    
+    # Statistik Baru
+    max_err = metrics['max_error_lsb']
+    avg_err = metrics['avg_error_lsb']
+    exact_rate = (exact_count / total_vectors) * 100
+    
+    # Hitung SQNR (Estimasi dari data error)
+    rmse_real = metrics['rms_error_lsb'] / 256.0
+    sqnr = 20 * math.log10(255.0 / rmse_real) if rmse_real > 0 else 99.9
+
+    # --- BIKIN LAPORAN TEKS BARU ---
+    report = f"""
 ================================================================
    LAPORAN FINAL VERIFIKASI FPGA (REVISI SPESIFIKASI)
 ================================================================
@@ -61,6 +53,7 @@ def reanalyze():
 2. HASIL AKHIR (Pass/Fail)
    - Vectors Passed      : {pass_count}
    - Success Rate        : {pass_rate:.2f}%  <-- (HARUSNYA 100% SEKARANG)
+   - Bit-exact vs Golden : {exact_count} ({exact_rate:.2f}%)  <-- (0 LSB vs model RTL)
 
 3. ANALISIS AKURASI
    - Rata-rata Error     : {avg_err:.4f} LSB
@@ -73,17 +66,14 @@ def reanalyze():
    Hardware dinyatakan VALID untuk implementasi Q8.8.
 
 ================================================================
-Status Akhir: {'✅ PASSED (APPROVED)' if pass_rate == 100 else '⚠️ WARNING'}
+Status Akhir: {'✅ PASSED (APPROVED)' if exact_count == total_vectors else '⚠️ WARNING'}
 ================================================================
 """
-            print(report)
-            
-            with open(REPORT_OUTPUT, 'w') as f:
-                f.write(report)
-            print(f"Laporan baru tersimpan di: {REPORT_OUTPUT}")
-
-    except FileNotFoundError:
-        print(f"File {INPUT_CSV} gak ketemu. Pastikan ada di folder ini.")
+    print(report)
+    
+    with open(REPORT_OUTPUT, 'w') as f:
+        f.write(report)
+    print(f"Laporan baru tersimpan di: {REPORT_OUTPUT}")
 
 if __name__ == "__main__":
     reanalyze()
\ No newline at end of file
@@ -1,143 +1,151 @@
 import csv
-import serial
-import struct
 import time
-import math
-import sys
-import os
 import numpy as np  # Kita butuh numpy buat ngitung SQNR/Statistik biar gaya
 
+from golden_model import sqrt_q88
+from result_format import save_results
+from stream_stats import StreamStats
+from sweep_cache import BLOCK_SIZE, SweepCache, build_hash, run_cached
+from transport import serial_opener
+from vector_source import from_spec
+
 # ================= KONFIGURASI =================
 PORT_NAME = 'COM6'   
 BAUD_RATE = 9600     
-INPUT_FILE = 'input_vectors.csv' 
-OUTPUT_FILE = 'scientific_results.csv' # Nama file biar keren dikit
+INPUT_SOURCE = 'range:1:65536'         # Spec vector_source.py (mis. 'file:input_vectors.csv')
+RESULT_DIR = 'scientific_results'      # Hasil binary (kolom .npy)
+OUTPUT_FILE = 'scientific_results.csv' # Export CSV opsional (nama file biar keren dikit)
+STATS_FILE = 'scientific_stats.npz'    # Akumulator statistik, disimpan tiap blok
+EXPORT_CSV = False
 
-# Toleransi Error dalam LSB (2 LSB = toleransi selisih 2 bit terakhir)
-# Untuk Q8.8, 1 LSB = 1/256 = ~0.0039
-MAX_LSB_TOLERANCE = 2.0 
+# Toleransi terhadap golden model bit-exact (0 = output FPGA harus identik).
+# Error (LSB) terhadap math.sqrt tetap dicatat untuk SQNR, tapi bukan kriteria PASS.
+GOLDEN_LSB_TOLERANCE = 0
+PIPELINE_DEPTH = 1   # Request in-flight; > 1 pakai jeda antar word (pipelined_io.safe_pacing)
+CHECKPOINT_EVERY = BLOCK_SIZE  # Vector per checkpoint ke cache (jalankan ulang / --resume melanjutkan dari sini)
+TIMEOUT = 1.0        # Detik menunggu satu balasan sebelum resync
+RETRIES = 3          # Kirim ulang maksimal per vector; yang tetap gagal dicatat di cache (failures.npy)
+SERIAL_OPENER = serial_opener  # (port, baud) -> serial; fake_serial.fake_opener() untuk uji tanpa board
+FAULTS = None        # Spec fake_serial.parse_faults dari board palsu (hanya dicatat di checkpoint)
+CACHE_DIR = 'sweep_cache'      # Folder cache + checkpoint.json (board palsu: folder lain)
 # ===============================================
 
 def run_scientific_test():
-    if not os.path.exists(INPUT_FILE):
-        print(f"ERROR: File '{INPUT_FILE}' tidak ditemukan!")
+    # Vector lazy per blok, tidak perlu membaca CSV input dulu
+    try:
+        values = from_spec(INPUT_SOURCE)
+        total_tests = len(values)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: Sumber input '{INPUT_SOURCE}' tidak bisa dibaca: {e}")
         return
 
-    print(f"[1/2] Connecting to {PORT_NAME}...")
-    
     try:
-        ser = serial.Serial(PORT_NAME, BAUD_RATE, timeout=1)
-        time.sleep(2)
-        
-        # Array untuk menampung data statistik akhir
-        list_expected = []
-        list_actual = []
-        list_errors = []
+        # Cache per bitstream & baud: hanya vector yang belum ada yang dikirim ke FPGA
+        cache = SweepCache(build_hash(), BAUD_RATE, CACHE_DIR)
+        todo = cache.missing(values)
+        start_time = time.time()
+
+        # Statistik streaming: vector dari cache dulu, lalu setiap blok baru dari FPGA
+        stats = StreamStats()
+        for chunk in values.blocks():
+            cached = chunk[cache.done[chunk]]
+            stats.update(cached, cache.replies[cached])
+
+        def on_block(block_vals, block_replies):
+            stats.update(block_vals, block_replies).save(STATS_FILE)
+            live = stats.summary()
+            print(f"      Processing: {live['vectors']}/{total_tests}... "
+                  f"(avg {live['avg_error_lsb']:.2f} LSB, max {live['max_error_lsb']:.2f} LSB, "
+                  f"SQNR {live['sqnr_db']:.2f} dB)")
+
+        if len(todo) == 0:
+            print(f"[1/2] All {total_tests} vectors already cached in '{cache.path}', FPGA not needed.")
+        else:
+            print(f"[1/2] Connecting to {PORT_NAME}...")
+            print(f"[2/2] Running precision test on {len(todo)} vectors ({total_tests - len(todo)} cached)...")
+            checkpoint = {'task': 'precision', 'port': PORT_NAME, 'baud': BAUD_RATE, 'source': INPUT_SOURCE,
+                          'depth': PIPELINE_DEPTH, 'tol': GOLDEN_LSB_TOLERANCE, 'out': RESULT_DIR,
+                          'checkpoint_every': CHECKPOINT_EVERY, 'timeout': TIMEOUT, 'retries': RETRIES,
+                          'csv': OUTPUT_FILE if EXPORT_CSV else None, 'faults': FAULTS}
+            complete = run_cached(PORT_NAME, BAUD_RATE, cache, values, depth=PIPELINE_DEPTH, on_block=on_block,
+                                  block=CHECKPOINT_EVERY, timeout=TIMEOUT, retries=RETRIES, opener=SERIAL_OPENER,
+                                  checkpoint=checkpoint)
+            if not complete:
+                failed = cache.missing(values)
+                print(f"TIMEOUT: {len(failed)} vectors failed after retries, e.g. input {failed[0]} "
+                      "(run again, or sqrt_cli.py precision --resume, to resume)")
+        stats.save(STATS_FILE)
+
+        # Ambil semua vector yang sudah terjawab dari cache
+        arr_input = values.values()
+        arr_failed = arr_input[~cache.done[arr_input] & (cache.failures[arr_input] > 0)]
+        arr_input = arr_input[cache.done[arr_input]]
+        arr_raw = cache.replies[arr_input]
+
+        # Simpan hasil binary (kolom .npy, lihat result_format.py); input yang gagal semua retry ikut di meta.json
+        save_results(RESULT_DIR, arr_input, arr_raw, build_id=cache.build_id, baud=BAUD_RATE,
+                     failed_inputs=arr_failed.tolist())
+
+        # --- PERHITUNGAN ELEGAN (sekaligus untuk semua vector) ---
+        arr_signal = np.sqrt(arr_input)                 # Expected (Float)
+        arr_actual = arr_raw / 256.0                    # FPGA (Q8.8)
+        arr_error = np.abs(arr_actual - arr_signal)     # Abs Error
         
-        with open(OUTPUT_FILE, mode='w', newline='') as outfile:
-            writer = csv.writer(outfile)
-            writer.writerow([
-                'Input (Dec)', 
-                'Expected (Float)', 
-                'FPGA (Q8.8)', 
-                'Abs Error', 
-                'Error (LSB)',   # <--- Kolom Baru yang Elegan
-                'Status'
-            ])
-            
-            with open(INPUT_FILE, mode='r') as infile:
-                reader = csv.DictReader(infile)
-                rows = list(reader)
-                total_tests = len(rows)
-                
-                print(f"[2/2] Running precision test on {total_tests} vectors...")
-                start_time = time.time()
-                
-                pass_count = 0
-                
-                for idx, row in enumerate(rows):
-                    try:
-                        val = int(row['decimal_input'])
-                        
-                        # 1. Kirim
-                        ser.write(struct.pack('<H', val))
-                        
-                        # 2. Terima
-                        response = ser.read(2)
-                        
-                        if len(response) == 2:
-                            raw_val = struct.unpack('<H', response)[0]
-                            fpga_float = raw_val / 256.0
-                            expected_float = math.sqrt(val)
-                            
-                            # --- PERHITUNGAN ELEGAN ---
-                            abs_error = abs(fpga_float - expected_float)
-                            
-                            # Konversi Error ke satuan LSB
-                            # Rumus: Error / (1/256)  SAMA DENGAN  Error * 256
-                            error_in_lsb = abs_error * 256.0
-                            
-                            # Pass/Fail berdasarkan presisi hardware (bukan angka asal 0.1)
-                            is_pass = error_in_lsb <= MAX_LSB_TOLERANCE
-                            status = 'PASS' if is_pass else 'FAIL'
-                            
-                            if is_pass: pass_count += 1
-                            
-                            # Simpan data untuk statistik global
-                            list_expected.append(expected_float)
-                            list_actual.append(fpga_float)
-                            list_errors.append(abs_error)
-
-                            writer.writerow([
-                                val,
-                                f"{expected_float:.4f}",
-                                f"{fpga_float:.4f}",
-                                f"{abs_error:.6f}",
-                                f"{error_in_lsb:.2f} LSB", # Keren nih di CSV
-                                status
-                            ])
-                            
-                            if (idx + 1) % 1000 == 0:
-                                print(f"      Processing: {idx + 1}/{total_tests}...")
-                        else:
-                            print(f"TIMEOUT @ Input {val}")
-                            break
-                            
-                    except ValueError:
-                        continue
+        # Pass/Fail: harus sama dengan golden model bit-exact
+        arr_golden = sqrt_q88(arr_input)
+        arr_pass = np.abs(arr_raw.astype(np.int64) - arr_golden) <= GOLDEN_LSB_TOLERANCE
+        pass_count = int(np.count_nonzero(arr_pass))
+
+        # Export CSV (opsional, format lama)
+        if EXPORT_CSV:
+            with open(OUTPUT_FILE, mode='w', newline='') as outfile:
+                writer = csv.writer(outfile)
+                writer.writerow([
+                    'Input (Dec)', 
+                    'Expected (Float)', 
+                    'FPGA (Q8.8)', 
+                    'Golden (Q8.8)',
+                    'Abs Error', 
+                    'Error (LSB)',   # <--- Kolom Baru yang Elegan
+                    'Status'
+                ])
+                for row in zip(arr_input.tolist(), arr_signal.tolist(), arr_actual.tolist(),
+                               arr_golden.tolist(), arr_error.tolist(), arr_pass.tolist()):
+                    val, expected_float, fpga_float, golden_val, abs_error, is_pass = row
+                    writer.writerow([
+                        val,
+                        f"{expected_float:.4f}",
+                        f"{fpga_float:.4f}",
+                        f"{golden_val / 256.0:.4f}",
+                        f"{abs_error:.6f}",
+                        f"{abs_error * 256.0:.2f} LSB", # Error / (1/256) = Error * 256
+                        'PASS' if is_pass else 'FAIL'
+                    ])
 
         # --- STATISTIK AKHIR (Buat Laporan) ---
         duration = time.time() - start_time
         
-        # Hitung SQNR (Signal to Quantization Noise Ratio)
+        # SQNR, max/avg error dari akumulator (lihat stream_stats.py)
         # Rumus: 10 * log10( Power_Signal / Power_Error )
-        arr_signal = np.array(list_expected)
-        arr_error = np.array(list_errors)
-        
-        # Hindari division by zero
-        power_signal = np.sum(arr_signal ** 2)
-        power_error = np.sum(arr_error ** 2)
-        
-        if power_error == 0:
-            sqnr = 999.0 # Perfect score
-        else:
-            sqnr = 10 * np.log10(power_signal / power_error)
-            
-        max_lsb_error = max(list_errors) * 256.0
-        avg_lsb_error = np.mean(list_errors) * 256.0
+        final = stats.summary()
+        sqnr = final['sqnr_db']
+        max_lsb_error = final['max_error_lsb']
+        avg_lsb_error = final['avg_error_lsb']
 
         print("\n" + "="*50)
         print("          FINAL STATISTICAL REPORT          ")
         print("="*50)
         print(f"Total Vectors  : {total_tests}")
-        print(f"Passed         : {pass_count} ({(pass_count/total_tests)*100:.2f}%)")
+        pass_rate = 100.0 * pass_count / total_tests if total_tests else float('nan')  # Sumber kosong: nan
+        print(f"Passed         : {pass_count} ({pass_rate:.2f}%)")
         print("-" * 50)
         print(f"Max Error      : {max_lsb_error:.2f} LSB")
         print(f"Avg Error      : {avg_lsb_error:.2f} LSB")
         print(f"SQNR           : {sqnr:.2f} dB  <-- Masukkan ini ke laporan!")
+        print(f"ENOB           : {final['enob']:.2f} bit")
         print("="*50)
-        print(f"Results saved to '{OUTPUT_FILE}'")
-        ser.close()
+        print(f"Results saved to '{RESULT_DIR}'" + (f" and '{OUTPUT_FILE}'" if EXPORT_CSV else "")
+              + f", stats in '{STATS_FILE}'")
 
     except Exception as e:
         print(f"ERROR: {e}")
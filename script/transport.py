@@ -0,0 +1,444 @@
+import asyncio
+import collections
+import math
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from golden_model import reply_table
+from pipelined_io import PIPELINE_DEPTH, WORD_GAP, WordPacer, pack_block, safe_pacing
+
+# ================= KONFIGURASI =================
+TIMEOUT = 1.0        # Detik menunggu satu balasan sebelum dianggap hilang
+RETRIES = 3          # Kirim ulang maksimal per vector
+SETTLE_TIME = 2.0    # Tunggu FPGA reset setelah port dibuka (auto-reset)
+READ_POLL = 0.05     # Timeout baca thread reader (cek stop flag)
+PROBE_VALUE = 0x0102 # Vector uji sinkronisasi; hasilnya beda kalau FPGA bergeser 1 byte
+SANITY_LSB = 32      # Balasan yang meleset lebih jauh dari ini dianggap desync (byte hilang)
+REOPEN_ATTEMPTS = 5  # Port hilang (USB dicabut / error driver): coba buka ulang sebanyak ini
+REOPEN_DELAY = 1.0   # Detik antar percobaan buka ulang
+SYNC_CHECK = True     # Probe word di akhir tiap blok pipelined (+1 word/blok): balasan yang bergeser 1 word ketahuan
+PROTOCOL = 'uart16'  # 'uart16' (2 byte), 'framed' (framed_protocol.py) atau 'auto' (PING, fallback ke uart16)
+# ===============================================
+
+
+class _Dropped(Exception):
+    # Request dibatalkan saat resync; dikirim ulang tanpa resync baru
+    pass
+
+
+def _plausible(val, word):
+    # Byte yang hilang menggeser framing; word hasil geseran hampir selalu jauh dari sqrt
+    return abs(word - math.isqrt(val << 16)) <= SANITY_LSB
+
+
+class SqrtDevice:
+    """Asyncio front-end for the 2-byte `<H` protocol of UART_16_Bit_System.
+
+    Replies come strictly in order and are matched to a FIFO of pending
+    futures, with at most `depth` requests in flight. Lost or shifted
+    replies are resynchronised and re-sent up to `retries` times; a failed
+    port is re-opened through `reopen()`.
+    """
+
+    def __init__(self, ser, depth=PIPELINE_DEPTH, timeout=TIMEOUT, retries=RETRIES, tracer=None, reopen=None,
+                 sync_check=SYNC_CHECK, word_gap=WORD_GAP):
+        self.ser = ser
+        self.depth, self.word_gap = safe_pacing(depth, ser.baudrate, word_gap)
+        self.timeout = timeout
+        self.retries = retries
+        self.tracer = tracer
+        self.reopen = reopen
+        self.sync_check = sync_check
+        self.failed = []   # Vector yang tetap gagal setelah semua retry
+        self.stats = {'timeouts': 0, 'desyncs': 0, 'retries': 0, 'resyncs': 0, 'reopens': 0}
+        self._port_lost = False  # Di-set thread reader/writer saat port error
+
+        self._pending = collections.deque()  # Future per request, urut sesuai write
+        self._rx = bytearray()
+        self._rx_times = []  # perf_counter_ns per byte di _rx (hanya kalau ada tracer)
+        self._generation = 0
+        self._writer = ThreadPoolExecutor(max_workers=1)  # Urutan write terjaga
+        self._pacer = WordPacer(self.word_gap)             # Jeda antar word (hanya dari thread writer)
+        self._stop = threading.Event()
+        self._reader = None
+
+    # ---------------- lifecycle ----------------
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._slots = asyncio.Semaphore(self.depth)
+        self._submit_lock = asyncio.Lock()
+        self._resync_lock = asyncio.Lock()
+        self._ready = asyncio.Event()
+        self._ready.set()
+
+        self._start_reader()
+        return self
+
+    def _start_reader(self):
+        self.ser.timeout = READ_POLL
+        self._reader = threading.Thread(target=self._read_loop, args=(self.ser,), daemon=True)
+        self._reader.start()
+
+    async def close(self):
+        self._stop.set()
+        if self._reader is not None:
+            await self._loop.run_in_executor(None, self._reader.join)
+        self._writer.shutdown(wait=True)
+        if self.ser is not None:  # None: port hilang dan gagal dibuka ulang
+            self.ser.close()
+
+    async def __aenter__(self):
+        return self if self._reader is not None else await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # ---------------- I/O ----------------
+    def _read_loop(self, ser):
+        # Satu thread per port: berhenti kalau port diganti (_reopen) atau error
+        while not self._stop.is_set() and ser is self.ser:
+            try:
+                data = ser.read(max(1, ser.in_waiting))
+            except Exception:
+                if not self._stop.is_set():
+                    self._port_lost = True  # Port error/dicabut; _resync membuka ulang
+                break
+            if data:
+                self._loop.call_soon_threadsafe(self._on_bytes, data, time.perf_counter_ns())
+
+    def _on_bytes(self, data, t_ns=0):
+        self._rx.extend(data)
+        if self.tracer is not None:
+            self._rx_times.extend([t_ns] * len(data))
+        while len(self._rx) >= 2 and self._pending:
+            fut = self._pending.popleft()
+            word = self._rx[0] | (self._rx[1] << 8)
+            del self._rx[:2]
+            if self.tracer is not None:
+                if getattr(fut, 'trace_id', None) is not None:
+                    self.tracer.received(fut.trace_id, self._rx_times[0], self._rx_times[1])
+                del self._rx_times[:2]
+            self._release(fut)
+            if not fut.done():
+                fut.set_result(word)
+        if not self._pending:
+            self._rx.clear()  # Byte tanpa request = sampah
+            self._rx_times.clear()
+
+    def _release(self, fut):
+        if getattr(fut, 'slot', False):
+            self._slots.release()
+
+    def _write(self, data, trace_ids=None):
+        def write():
+            try:
+                n = self._pacer.write(self.ser, data)
+            except Exception:
+                self._port_lost = True  # Request hilang; timeout -> _resync membuka ulang
+                return 0
+            if trace_ids is not None:
+                self.tracer.written(trace_ids, time.perf_counter_ns())
+            return n
+        return self._loop.run_in_executor(self._writer, write)
+
+    async def _submit(self, values):
+        async with self._submit_lock:
+            for _ in values:
+                await self._slots.acquire()
+            await self._ready.wait()  # Jangan kirim saat resync berjalan
+            # Trace mulai setelah slot didapat: waktu antre menunggu depth bukan latency
+            trace_ids = self.tracer.begin(values) if self.tracer is not None else None
+            futs = []
+            for _ in values:
+                fut = self._loop.create_future()
+                fut.slot = True
+                fut.generation = self._generation  # Resync sesudah write ini membuang future-nya
+                futs.append(fut)
+            if trace_ids is not None:
+                for fut, rid in zip(futs, trace_ids):
+                    fut.trace_id = rid
+            self._pending.extend(futs)
+            self._write(pack_block(values), trace_ids)
+        return futs
+
+    # ---------------- recovery ----------------
+    async def _flush(self):
+        while self._pending:
+            fut = self._pending.popleft()
+            self._release(fut)
+            if not fut.done():
+                fut.set_exception(_Dropped())
+                fut.exception()  # Tandai sudah diambil (hindari warning asyncio)
+        try:
+            await self._loop.run_in_executor(self._writer, self.ser.reset_input_buffer)
+        except Exception:
+            self._port_lost = True
+        await asyncio.sleep(2 * READ_POLL)  # Biarkan byte yang sudah terbaca masuk dulu
+        self._rx.clear()
+        self._rx_times.clear()
+
+    async def _probe(self):
+        fut = self._loop.create_future()
+        self._pending.append(fut)
+        self._write(pack_block([PROBE_VALUE]))
+        try:
+            word = await asyncio.wait_for(asyncio.shield(fut), self.timeout)
+        except asyncio.TimeoutError:
+            if fut in self._pending:
+                self._pending.remove(fut)
+            return False
+        return word == reply_table()[PROBE_VALUE]
+
+    async def _confirm(self, value):
+        """Reply to `value` sent directly behind a probe word, or None if the probe fails."""
+        # Balasan implausible yang berulang: FPGA yang bergeser 1 byte menjawab input tetangga
+        # dengan word salah yang sama (high byte-nya sama), jadi pengulangan saja bukan bukti.
+        # Kalau jawaban ini tetap setelah probe, itu jawaban asli hardware dan disimpan.
+        # Probe dan request dikirim satu per satu (write berikutnya setelah balasan: tanpa
+        # tabrakan TX di depth berapa pun) dan submit lock menahan request lain, jadi probe
+        # yang benar berarti framing request ini juga benar.
+        words = []
+        async with self._submit_lock:
+            for word_in in (PROBE_VALUE, value):
+                await self._slots.acquire()
+                await self._ready.wait()
+                fut = self._loop.create_future()
+                fut.slot = True
+                self._pending.append(fut)
+                self._write(pack_block([word_in]))
+                try:
+                    words.append(await asyncio.wait_for(asyncio.shield(fut), self.timeout))
+                except (asyncio.TimeoutError, _Dropped):
+                    return None   # Slot dilepas oleh balasan telat atau _flush saat resync
+        probe, word = words
+        return word if probe == reply_table()[PROBE_VALUE] else None
+
+    async def _in_sync(self, fut):
+        # Future probe dari _submit: benar berarti semua balasan sebelumnya pada tempatnya
+        try:
+            word = await asyncio.wait_for(asyncio.shield(fut), self.timeout)
+        except (asyncio.TimeoutError, _Dropped):
+            return False
+        return word == reply_table()[PROBE_VALUE]
+
+    async def _reopen(self):
+        """Replace a failed port with a fresh one from `reopen()`; False if every attempt fails."""
+        old, old_reader = self.ser, self._reader
+        self.ser = None  # Thread reader lama berhenti (ser is not self.ser)
+        try:
+            await self._loop.run_in_executor(self._writer, old.close)
+        except Exception:
+            pass
+        await self._loop.run_in_executor(None, old_reader.join)
+        for _ in range(REOPEN_ATTEMPTS):
+            try:
+                self.ser = await self._loop.run_in_executor(None, self.reopen)
+            except Exception:
+                await asyncio.sleep(REOPEN_DELAY)  # Port belum muncul lagi
+                continue
+            self.stats['reopens'] += 1
+            self._port_lost = False
+            self._start_reader()
+            await asyncio.sleep(SETTLE_TIME)
+            return True
+        return False
+
+    async def _resync(self, generation):
+        # Dipanggil saat balasan tidak datang dalam `timeout`, atau jauh dari sqrt (_plausible):
+        # byte yang hilang menggeser framing. Flush + probe word, plus 1 byte pad kalau FPGA
+        # memegang setengah word. Port yang error / probe tanpa jawaban -> buka ulang (_reopen).
+        # Resync di tengah blok pipelined membuat balasan sesudahnya mungkin milik request lain,
+        # jadi _run_block membuang blok itu dan mengirim ulang satu per satu. Dengan sync_check,
+        # probe word menutup setiap blok: word yang hilang/dobel menggeser balasan ke tetangganya
+        # (tetap lolos _plausible), tapi probe-nya salah dan blok dibuang dengan cara yang sama.
+        # RTL tanpa FIFO membuang balasan yang tx_start-nya datang saat TX sibuk: depth > 1
+        # hanya dengan jeda antar word >= waktu TX FPGA (pipelined_io.safe_pacing).
+        async with self._resync_lock:
+            if generation != self._generation:
+                return  # Sudah di-resync oleh request lain
+            self._generation += 1
+            self.stats['resyncs'] += 1
+            self._ready.clear()
+            try:
+                await asyncio.sleep(self.timeout)  # Tunggu balasan terlambat / jalur sepi
+                for attempt in range(2 if self.reopen is not None else 1):
+                    if self._port_lost or attempt:
+                        # Port error, atau probe tetap tanpa jawaban: buka ulang port
+                        if self.reopen is None or not await self._reopen():
+                            return
+                    await self._flush()
+                    for _ in range(2):
+                        if await self._probe():
+                            return
+                        # FPGA memegang setengah word: 1 byte pad menggenapkannya
+                        await self._write(b'\x00')
+                        await asyncio.sleep(self.timeout)
+                        await self._flush()
+            finally:
+                self._ready.set()
+
+    # ---------------- API ----------------
+    async def _run_block(self, values, attempts=None):
+        # attempts (opsional): diisi jumlah kirim per vector; > 1 berarti ada timeout/resync di tengahnya
+        results = [None] * len(values)
+        suspect = {}  # index -> balasan implausible terakhir
+        todo = list(range(len(values)))
+        one_by_one = False
+        for attempt in range(self.retries + 1):
+            if not todo:
+                break
+            if attempt:
+                self.stats['retries'] += len(todo)
+            if attempts is not None:
+                for i in todo:
+                    attempts[i] += 1
+            sync = self.sync_check and (one_by_one or len(todo) > 1)
+            if not one_by_one:
+                futs = await self._submit([values[i] for i in todo] + ([PROBE_VALUE] if sync else []))
+                generation = futs[0].generation
+            still, accepted, lost = [], [], False
+            for k, i in enumerate(todo):
+                if one_by_one:
+                    fut = (await self._submit([values[i]]))[0]
+                    generation = fut.generation
+                else:
+                    fut = futs[k]
+                try:
+                    word = await asyncio.wait_for(asyncio.shield(fut), self.timeout)
+                    if _plausible(values[i], word):
+                        # Probe dikirim setelah balasan datang (RTL tanpa FIFO TX), bukan sekaligus
+                        probe = (await self._submit([PROBE_VALUE]))[0] if one_by_one and sync else None
+                        if probe is not None and not await self._in_sync(probe):
+                            self.stats['desyncs'] += 1
+                            still.append(i)
+                            await self._resync(probe.generation)
+                            continue
+                        results[i] = word
+                        accepted.append(i)
+                    elif suspect.get(i) == word and (confirmed := await self._confirm(values[i])) is not None:
+                        results[i] = confirmed
+                        accepted.append(i)
+                    else:
+                        suspect[i] = word
+                        self.stats['desyncs'] += 1
+                        still.append(i)
+                        await self._resync(generation)
+                except asyncio.TimeoutError:
+                    self.stats['timeouts'] += 1
+                    still.append(i)
+                    lost = True
+                    await self._resync(generation)
+                except _Dropped:
+                    still.append(i)
+            if sync and not one_by_one and not lost and generation == self._generation \
+                    and not await self._in_sync(futs[-1]):
+                self.stats['desyncs'] += 1
+                lost = True
+                await self._resync(generation)
+            if (lost or generation != self._generation) and not one_by_one:
+                # Balasan yang hilang (mis. tx_start saat TX sibuk) atau byte ekstra menggeser
+                # semua balasan sesudahnya ke request yang salah, dan tetangga sqrt lolos
+                # _plausible. Kalau attempt ini kena timeout atau resync (dari worker mana pun),
+                # buang seluruh attempt dan kirim ulang satu per satu.
+                for i in accepted:
+                    results[i] = None
+                still = sorted(still + accepted)
+                one_by_one = True
+            todo = still
+        self.failed.extend(values[i] for i in todo)
+        return results
+
+    async def sqrt(self, value):
+        """One Q8.8 result (None if every retry timed out)."""
+        return (await self._run_block([value]))[0]
+
+    async def sqrt_attempts(self, value):
+        """(result, attempts) for one value; attempts > 1 means the result came after a timeout or resync."""
+        attempts = [0]
+        result = (await self._run_block([value], attempts))[0]
+        return result, attempts[0]
+
+    async def sqrt_many(self, values, progress=None):
+        """Q8.8 results for `values` in order; None marks vectors that failed all retries."""
+        values = list(values)
+        block = max(1, self.depth // 2)
+        results = [None] * len(values)
+        starts = iter(range(0, len(values), block))
+        done = 0
+
+        async def worker():
+            # Dua worker = dua blok in flight (request lain, mis. probe, tidak antre lama);
+            # tanpa pipelining satu worker saja, blok dikirim berurutan
+            nonlocal done
+            for start in starts:
+                chunk = values[start:start + block]
+                results[start:start + len(chunk)] = await self._run_block(chunk)
+                done += len(chunk)
+                if progress is not None:
+                    progress(done, len(values))
+
+        await asyncio.gather(*(worker() for _ in range(2 if self.depth > 1 else 1)))
+        return results
+
+
+def serial_opener(port, baud):
+    import serial
+    return serial.Serial(port, baud, timeout=READ_POLL)
+
+
+async def open_device(port, baud, depth=PIPELINE_DEPTH, timeout=TIMEOUT, retries=RETRIES, tracer=None,
+                      opener=serial_opener, word_gap=WORD_GAP, protocol=PROTOCOL):
+    """Open a serial port, wait for the FPGA to settle and start a SqrtDevice.
+
+    `opener(port, baud)` makes the serial object (pyserial by default, or a
+    fake_serial port); the device calls it again to re-open a failed port.
+    `protocol` 'framed' starts a framed_protocol.FramedDevice instead, 'auto'
+    does so only if the board answers a PING frame; there `depth` is the
+    number of frames in flight.
+    """
+    loop = asyncio.get_running_loop()
+    ser = await loop.run_in_executor(None, opener, port, baud)
+    await asyncio.sleep(SETTLE_TIME)
+    if protocol not in ('uart16', 'framed', 'auto'):
+        raise ValueError(f"Protokol tidak dikenal: '{protocol}' (pilihan: uart16, framed, auto)")
+    if protocol != 'uart16':
+        from framed_protocol import FramedDevice, detect_framed   # framed_protocol meng-import modul ini
+        if protocol == 'framed' or await loop.run_in_executor(None, detect_framed, ser):
+            return await FramedDevice(ser, window=depth, timeout=timeout, retries=retries, tracer=tracer,
+                                      reopen=lambda: opener(port, baud)).start()
+    return await SqrtDevice(ser, depth, timeout, retries, tracer, reopen=lambda: opener(port, baud),
+                            word_gap=word_gap).start()
+
+
+async def _demo(n_vectors):
+    # Sweep + latency probe berbagi satu koneksi (UartModelSerial @921600, tanpa board);
+    # depth 32 dengan jeda antar word otomatis dari safe_pacing
+    from fake_serial import UartModelSerial
+
+    ser = UartModelSerial(baudrate=921600, latency=0.001)
+    async with SqrtDevice(ser, depth=32) as dev:
+        probes = []
+
+        async def probe_latency():
+            for val in range(1, 200, 20):
+                t0 = time.perf_counter_ns()
+                await dev.sqrt(val)
+                probes.append((time.perf_counter_ns() - t0) / 1e6)
+                await asyncio.sleep(0.02)
+
+        t0 = time.perf_counter()
+        replies, _ = await asyncio.gather(dev.sqrt_many(range(1, n_vectors + 1)), probe_latency())
+        elapsed = time.perf_counter() - t0
+
+    table = reply_table()
+    errors = sum(r != table[v] for v, r in zip(range(1, n_vectors + 1), replies))
+    print(f"Sweep  : {n_vectors} vectors in {elapsed:.2f} s ({n_vectors / elapsed:.0f} ops/sec), {errors} mismatches")
+    print(f"Probes : {len(probes)} concurrent latency probes, avg {sum(probes) / len(probes):.2f} ms")
+    print(f"Stats  : {dev.stats}, depth {dev.depth}, word gap {dev.word_gap * 1e3:.3f} ms, "
+          f"{ser.lost} replies dropped by the RTL model")
+
+
+if __name__ == "__main__":
+    asyncio.run(_demo(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -0,0 +1,311 @@
+import csv
+import math
+import sys
+import time
+
+import numpy as np
+
+# ================= KONFIGURASI =================
+BLOCK = 4096            # Vector per blok yang dihasilkan sekaligus
+DOMAIN = 65536          # Input uint16 yang dipahami FPGA
+DEFAULT_SPEC = 'range:1:65536'
+# ===============================================
+
+
+class VectorSource:
+    """Lazily produced input vectors, handed out in int64 blocks.
+
+    Subclasses implement `_blocks(block)`; nothing holds more than one
+    block in memory, so a source may be much larger than the 16-bit domain
+    (e.g. a repeated sweep). `values()` materialises everything for the
+    places that need one array (result sets over the 65,536-input domain).
+    """
+
+    name = 'source'
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def _blocks(self, block):
+        raise NotImplementedError
+
+    def blocks(self, block=BLOCK):
+        for chunk in self._blocks(max(1, block)):
+            if len(chunk):
+                yield np.asarray(chunk, dtype=np.int64)
+
+    def __iter__(self):
+        for chunk in self.blocks():
+            yield from chunk.tolist()
+
+    def values(self):
+        parts = list(self.blocks())
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name}: {len(self)} vectors>"
+
+
+class RangeSource(VectorSource):
+    """start, start + step, ... < stop, like range()."""
+
+    def __init__(self, start=1, stop=DOMAIN, step=1):
+        self.start, self.stop, self.step = start, stop, step
+        self.name = f"range:{start}:{stop}" + (f":{step}" if step != 1 else '')
+
+    def __len__(self):
+        return len(range(self.start, self.stop, self.step))
+
+    def _blocks(self, block):
+        span = block * self.step
+        for first in range(self.start, self.stop, span):
+            last = min(first + span, self.stop) if self.step > 0 else max(first + span, self.stop)
+            yield np.arange(first, last, self.step, dtype=np.int64)
+
+
+class StridedSource(VectorSource):
+    """Every value of start..stop-1 once, visited as start + (k * stride mod n).
+
+    `stride` must be coprime to n; neighbouring requests then land far
+    apart in the domain (different octaves / ROM entries) without any
+    permutation table.
+    """
+
+    def __init__(self, start=1, stop=DOMAIN, stride=40499):
+        self.start, self.n, self.stride = start, stop - start, stride
+        if math.gcd(stride, self.n) != 1:
+            raise ValueError(f"Stride {stride} tidak coprime dengan {self.n}")
+        self.name = f"strided:{start}:{stop}:{stride}"
+
+    def __len__(self):
+        return self.n
+
+    def _blocks(self, block):
+        for k in range(0, self.n, block):
+            idx = np.arange(k, min(k + block, self.n), dtype=np.int64)
+            yield self.start + (idx * self.stride) % self.n
+
+
+class ShuffledSource(VectorSource):
+    """A seeded pseudo-random permutation of start..stop-1, generated per block.
+
+    Index i in [0, 2^bits) goes through a keyed bijective hash (xor key,
+    multiply by an odd constant, xorshift, all mod 2^bits); hashed values
+    >= n are skipped. That is a true permutation of n values with no
+    table in memory and at most 2x the work.
+    """
+
+    _MULTIPLIERS = (0x2C1B3C6D, 0x297A2D39, 0x5F356495)
+
+    def __init__(self, start=1, stop=DOMAIN, seed=0):
+        self.start, self.n, self.seed = start, stop - start, seed
+        self.bits = max(2, (self.n - 1).bit_length())
+        self.name = f"shuffle:{start}:{stop}:{seed}"
+        rng = np.random.default_rng(seed)
+        self._keys = rng.integers(0, 1 << self.bits, len(self._MULTIPLIERS), dtype=np.int64)
+
+    def __len__(self):
+        return self.n
+
+    def _permute(self, idx):
+        mask = (1 << self.bits) - 1
+        x = idx.copy()
+        for key, mult in zip(self._keys, self._MULTIPLIERS):
+            x ^= key
+            x = (x * (mult & mask | 1)) & mask
+            x ^= x >> (self.bits // 2 + 1)
+        return x
+
+    def _blocks(self, block):
+        out = []
+        pending = 0
+        for k in range(0, 1 << self.bits, block):
+            idx = np.arange(k, min(k + block, 1 << self.bits), dtype=np.int64)
+            hashed = self._permute(idx)
+            hashed = hashed[hashed < self.n]
+            out.append(hashed)
+            pending += len(hashed)
+            if pending >= block:
+                merged = np.concatenate(out)
+                yield self.start + merged[:block]
+                out, pending = [merged[block:]], len(merged) - block
+        if pending:
+            yield self.start + np.concatenate(out)
+
+
+class FileSource(VectorSource):
+    """Vectors from a file: .npy (memory-mapped), raw little-endian uint16 (.bin) or CSV.
+
+    Binary files are never read whole, only sliced block by block. A CSV
+    is streamed row by row (column `decimal_input`, the format of the old
+    input_vectors.csv, or the first column).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.name = f"file:{path}"
+        self._csv = path.lower().endswith('.csv')
+        self._length = None
+
+    def _array(self):
+        if self.path.lower().endswith('.npy'):
+            return np.load(self.path, mmap_mode='r')
+        return np.memmap(self.path, dtype='<u2', mode='r')
+
+    def __len__(self):
+        if self._length is None:
+            if self._csv:
+                self._length = sum(len(chunk) for chunk in self._blocks(BLOCK))
+            else:
+                self._length = len(self._array())
+        return self._length
+
+    def _blocks(self, block):
+        if not self._csv:
+            data = self._array()
+            for k in range(0, len(data), block):
+                yield np.asarray(data[k:k + block], dtype=np.int64)
+            return
+        with open(self.path, newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            column = header.index('decimal_input') if 'decimal_input' in header else 0
+            chunk = []
+            if header and header[0].strip().isdigit():
+                chunk.append(int(header[0]))   # Tanpa header: baris pertama sudah data
+            for row in reader:
+                try:
+                    chunk.append(int(row[column]))
+                except (ValueError, IndexError):
+                    continue
+                if len(chunk) == block:
+                    yield np.array(chunk, dtype=np.int64)
+                    chunk = []
+            yield np.array(chunk, dtype=np.int64)
+
+
+class CornerSource(VectorSource):
+    """Edge cases: 0, 1, max, 2^k and 2^k +/- 1, and both sides of every LUT boundary.
+
+    A LUT boundary is an input x where the octave (msb_detector), the NR
+    ROM address or the GS ROM address differs from x - 1 (see
+    sweep_planner.input_strata); x - 1 and x are both included.
+    """
+
+    name = 'corners'
+
+    def __init__(self, start=0, stop=DOMAIN):
+        self.start, self.stop = start, stop
+        self._cases = None
+
+    def _all(self):
+        if self._cases is None:
+            from sweep_planner import input_strata
+            octave, nr_addr, gs_addr = input_strata()
+            x = np.arange(1, DOMAIN)
+            changed = x[(octave[1:] != octave[:-1]) | (nr_addr[1:] != nr_addr[:-1]) | (gs_addr[1:] != gs_addr[:-1])]
+            powers = 1 << np.arange(17)
+            cases = np.concatenate(([0, 1, DOMAIN - 1], powers, powers - 1, powers + 1, changed - 1, changed))
+            cases = np.unique(cases)
+            self._cases = cases[(cases >= self.start) & (cases < self.stop)]
+        return self._cases
+
+    def __len__(self):
+        return len(self._all())
+
+    def _blocks(self, block):
+        cases = self._all()
+        for k in range(0, len(cases), block):
+            yield cases[k:k + block]
+
+
+class ChainSource(VectorSource):
+    """Several sources one after another, optionally `repeat` times (soak / repeated domains)."""
+
+    def __init__(self, *sources, repeat=1):
+        self.sources, self.repeat = sources, repeat
+        self.name = '+'.join(s.name for s in sources) + (f"x{repeat}" if repeat != 1 else '')
+
+    def __len__(self):
+        return self.repeat * sum(len(s) for s in self.sources)
+
+    def _blocks(self, block):
+        for _ in range(self.repeat):
+            for source in self.sources:
+                yield from source.blocks(block)
+
+
+def from_spec(spec=DEFAULT_SPEC):
+    """Build a source from a short text spec, e.g. for a CONFIG constant or the CLI.
+
+    range:<start>:<stop>[:<step>], strided:<start>:<stop>:<stride>,
+    shuffle:<start>:<stop>[:<seed>], corners, file:<path>; join with '+'
+    and append 'x<N>' to repeat, e.g. 'corners+shuffle:1:65536x3'. The
+    suffix is only read from a last part that is not file: (a path may
+    end in 'x3'), so 'file:data/box3' is one file, never 'data/bo' x 3.
+    """
+    repeat = 1
+    head, plus, last = spec.rpartition('+')
+    if not last.startswith('file:'):
+        body, sep, tail = last.rpartition('x')
+        if sep and tail.isdigit() and body:
+            spec, repeat = head + plus + body, int(tail)
+    sources = []
+    for part in spec.split('+'):
+        kind, _, rest = part.partition(':')
+        if kind == 'file':
+            sources.append(FileSource(rest))
+            continue
+        args = [int(a) for a in rest.split(':') if a != '']
+        if kind == 'range':
+            sources.append(RangeSource(*args))
+        elif kind == 'strided':
+            sources.append(StridedSource(*args))
+        elif kind == 'shuffle':
+            sources.append(ShuffledSource(*args))
+        elif kind == 'corners':
+            sources.append(CornerSource(*args))
+        else:
+            raise ValueError(f"Sumber vector tidak dikenal: '{part}'")
+    return sources[0] if len(sources) == 1 and repeat == 1 else ChainSource(*sources, repeat=repeat)
+
+
+def iter_blocks(values, block=BLOCK):
+    """Blocks of a VectorSource, or of any array-like (split without copying)."""
+    if isinstance(values, VectorSource):
+        yield from values.blocks(block)
+        return
+    values = np.asarray(values, dtype=np.int64)
+    for k in range(0, len(values), block):
+        yield values[k:k + block]
+
+
+def write_binary(source, path):
+    """Stream a source to a raw little-endian uint16 file (readable by FileSource)."""
+    with open(path, 'wb') as f:
+        for chunk in source.blocks():
+            f.write(chunk.astype('<u2').tobytes())
+    return path
+
+
+if __name__ == "__main__":
+    # python vector_source.py [spec] [out.bin]  -> isi & memori sumber (default DEFAULT_SPEC)
+    import tracemalloc
+
+    spec = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SPEC
+    source = from_spec(spec)
+    seen = np.zeros(DOMAIN, dtype=np.int64)
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    count = 0
+    for chunk in source.blocks():
+        count += len(chunk)
+        np.add.at(seen, chunk & 0xFFFF, 1)
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{source!r}: {count} vectors in {elapsed * 1000:.1f} ms, peak {peak / 1024:.0f} KB")
+    print(f"   first: {next(source.blocks(8)).tolist()}")
+    print(f"   distinct inputs: {int(np.count_nonzero(seen))}, max repeats: {int(seen.max())}")
+    if len(sys.argv) > 2:
+        print(f"   written: {write_binary(source, sys.argv[2])}")
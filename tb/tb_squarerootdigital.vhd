@@ -1,6 +1,7 @@
 -- @file system_tb.vhd
 -- @brief Exhaustive Integration Test for Newton-Raphson Sqrt Machine
 -- @output system_results.csv
+-- Generics START_VAL/END_VAL/OUT_FILE let script/cosim.py run input-range shards in GHDL.
 
 library ieee;
 use ieee.std_logic_1164.all;
@@ -8,6 +9,11 @@ use ieee.numeric_std.all;
 use std.textio.all;
 
 entity system_tb is
+    generic (
+        START_VAL : integer := 1;
+        END_VAL   : integer := 65535;
+        OUT_FILE  : string  := "system_results.csv"
+    );
 end entity;
 
 architecture behavior of system_tb is
@@ -32,13 +38,14 @@ architecture behavior of system_tb is
     signal tx_busy       : std_logic;
     signal data_in       : std_logic_vector(15 downto 0) := (others => '0');
     signal data_out      : std_logic_vector(15 downto 0);
+    signal sim_done      : std_logic := '0';
     
     constant CLK_PERIOD : time := 10 ns;
 
 begin
 
-    -- Clock Generation
-    clk <= not clk after CLK_PERIOD/2;
+    -- Clock Generation (berhenti setelah sweep, supaya simulasi selesai sendiri)
+    clk <= not clk after CLK_PERIOD/2 when sim_done = '0' else '0';
 
     -- DUT Instantiation
     dut: squarerootdigital
@@ -54,7 +61,7 @@ begin
 
     -- Main Stimulus Process
     process
-        file out_file : text open write_mode is "system_results.csv";
+        file out_file : text open write_mode is OUT_FILE;
         variable out_line : line;
         variable i : integer;
     begin
@@ -68,8 +75,8 @@ begin
         rst <= '0';
         wait for 20 ns;
 
-        -- Exhaustive Sweep 1 to 65535
-        for i in 1 to 65535 loop
+        -- Exhaustive Sweep START_VAL to END_VAL (default 1 to 65535)
+        for i in START_VAL to END_VAL loop
             
             -- 1. Drive Input
             data_in <= std_logic_vector(to_unsigned(i, 16));
@@ -106,6 +113,7 @@ begin
         end loop;
 
         report "Full System Exhaustive Test Complete.";
+        sim_done <= '1';
         wait;
     end process;
 
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Script HIL saling import sebagai modul datar (python script/xxx.py), jadi folder script/ masuk sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'script'))
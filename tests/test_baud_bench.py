@@ -0,0 +1,34 @@
+import pytest
+
+from baud_bench import BAUD_RATES, DEPTHS, check_regressions, model_ops_per_sec, save_baseline
+
+
+def _point(baud, depth, ops, model=1000.0):
+    return {'baud': baud, 'depth': depth, 'ops_per_sec': ops, 'model_ops_per_sec': model}
+
+
+def test_regression_only_against_baseline_of_same_mode(tmp_path):
+    path = str(tmp_path / 'baseline.json')
+    save_baseline([_point(115200, 1, 1000.0), _point(115200, 4, 1500.0)], 'sim', path)
+    slow = [_point(115200, 1, 500.0), _point(115200, 4, 1450.0)]
+    assert check_regressions(slow, 'sim', path) == []   # Simulasi: hanya throughput model yang dibandingkan
+    slow_model = [_point(115200, 1, 1000.0, 800.0)]
+    assert check_regressions(slow_model, 'sim', path) == [(115200, 1, 800.0, 1000.0)]
+    assert check_regressions(slow, 'hw', path) == []
+
+
+def test_hw_compares_measured_throughput_and_missing_baseline_fails(tmp_path):
+    path = str(tmp_path / 'baseline.json')
+    with pytest.raises(FileNotFoundError):
+        check_regressions([_point(9600, 1, 200.0)], 'hw', path)
+    save_baseline([_point(9600, 1, 200.0)], 'hw', path)
+    assert check_regressions([_point(9600, 1, 150.0)], 'hw', path) == [(9600, 1, 150.0, 200.0)]
+
+
+def test_committed_sim_baseline_matches_the_model():
+    # data/bench/bench_baseline_sim.json: angka model deterministik, jadi CI tidak bergantung CPU
+    results = [{'baud': b, 'depth': d, 'model_ops_per_sec': model_ops_per_sec(b, d)}
+               for b in BAUD_RATES for d in DEPTHS]
+    assert check_regressions(results, 'sim', tolerance=1e-9) == []
+    # Depth 4 @ 9600 dibatasi pacing (jeda antar word + probe sync): lebih lambat dari depth 1
+    assert model_ops_per_sec(9600, 4) < model_ops_per_sec(9600, 1)
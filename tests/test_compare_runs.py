@@ -0,0 +1,72 @@
+import math
+
+import numpy as np
+
+from compare_runs import HEAT_MAX_LSB, align, bit_diff, ks_test, mann_whitney, octave_heatmap, paired_test
+from result_format import ResultSet
+
+
+def _runs(*pairs):
+    # Tiap pasangan (inputs, replies) jadi satu run tanpa latency
+    return align([ResultSet(np.array(x), np.array(r)) for x, r in pairs], labels=[f"r{k}" for k in range(len(pairs))])
+
+
+def test_align_keeps_each_run_on_its_own_inputs():
+    runs = _runs(([1, 2, 3], [10, 20, 30]), ([3, 4], [31, 40]))
+    assert np.flatnonzero(runs.present[0]).tolist() == [1, 2, 3]
+    assert np.flatnonzero(runs.present[1]).tolist() == [3, 4]
+    assert runs.reply[0, [1, 2, 3, 4]].tolist() == [10, 20, 30, -1]
+    assert runs.reply[1, [1, 2, 3, 4]].tolist() == [-1, -1, 31, 40]
+    assert runs.common(0, 1).tolist() == [3]
+
+    with_golden = align([ResultSet(np.array([256]), np.array([0x1000]))], labels=['hw'], golden=True)
+    assert with_golden.labels == ['golden', 'hw'] and with_golden.present[0].all()
+    assert with_golden.common(0, 1).tolist() == [256]
+
+
+def test_bit_diff_index_zero_is_lsb():
+    runs = _runs(([5, 6, 7], [0x0000, 0x0000, 0x1234]), ([5, 6, 7, 8], [0x0001, 0x8000, 0x1234, 0x0000]))
+    diff = bit_diff(runs, 0, 1)
+    assert (diff['common'], diff['changed']) == (3, 2)
+    assert diff['bit_flips'].tolist() == [1] + [0] * 14 + [1]
+    assert diff['inputs'].tolist() == [5, 6] and diff['delta_lsb'].tolist() == [1, 0x8000]
+    assert diff['max_delta_lsb'] == 0x8000
+
+
+def test_ks_test_on_known_samples():
+    a = np.arange(50)
+    assert ks_test(a, a) == (0.0, 1.0)
+    d, p = ks_test(a, a + 100)
+    assert d == 1.0 and p < 1e-6
+    assert math.isnan(ks_test([], a)[0])
+
+
+def test_mann_whitney_on_known_samples():
+    a = np.arange(30)
+    p_greater, p = mann_whitney(a, a + 100)
+    assert p_greater == 1.0 and p < 1e-6
+    assert mann_whitney(a + 100, a)[0] == 0.0
+    # Sampel identik (semua kembar): U tepat di tengah
+    assert mann_whitney(a, a) == (0.5, 1.0)
+
+
+def test_paired_test_on_known_samples():
+    mean, ci, p = paired_test([1, 2, 3, 4], [2, 4, 3, 5])
+    se = math.sqrt(2 / 3) / 2                      # diff = [1, 2, 0, 1]
+    assert mean == 1.0
+    assert math.isclose(ci, 1.96 * se)
+    assert math.isclose(p, math.erfc(1 / se / math.sqrt(2)))
+    # Selisih konstan: tanpa variansi
+    assert paired_test([1, 2, 3], [3, 4, 5]) == (2.0, 0.0, 0.0)
+    assert paired_test([1, 2, 3], [1, 2, 3]) == (0.0, 0.0, 1.0)
+
+
+def test_octave_heatmap_rows_and_columns():
+    # Baris = oktaf MSB + 1 (input 0 di baris 0), kolom = floor error + HEAT_MAX_LSB
+    runs = _runs(([0, 4, 256, 1024], [0, 512 + 20, 0x1000, 8192 - 3]))
+    heat = octave_heatmap(runs, 0)
+    assert heat.shape == (17, 2 * HEAT_MAX_LSB + 1) and heat.sum() == 4
+    assert heat[0, HEAT_MAX_LSB] == 1                   # input 0, error 0
+    assert heat[3, 2 * HEAT_MAX_LSB] == 1               # oktaf 2, +20 LSB dipotong ke +HEAT_MAX_LSB
+    assert heat[9, HEAT_MAX_LSB] == 1                   # oktaf 8, tepat
+    assert heat[11, HEAT_MAX_LSB - 3] == 1              # oktaf 10, -3 LSB
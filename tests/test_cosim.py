@@ -0,0 +1,38 @@
+import numpy as np
+
+from cosim import diff_golden, read_shard, shard_bounds
+from golden_model import sqrt_q88
+
+
+def test_shard_bounds_cover_the_range_without_gaps():
+    for first, last, n in ((1, 65535, 8), (0, 9, 3), (5, 5, 4), (10, 12, 16)):
+        shards = shard_bounds(first, last, n)
+        assert len(shards) == min(n, last - first + 1)
+        assert shards[0][0] == first and shards[-1][1] == last
+        assert all(b + 1 == c for (_, b), (c, _) in zip(shards[:-1], shards[1:]))
+        sizes = [b - a + 1 for a, b in shards]
+        assert min(sizes) >= 1 and max(sizes) - min(sizes) <= 1
+
+
+def test_read_shard_parses_system_tb_output(tmp_path):
+    path = tmp_path / 'shard_00001_00003.csv'
+    path.write_text("input_dec,output_q8_8_hex\n1,0100\n2,016a\n65535,FFF8\n")
+    inputs, replies = read_shard(str(path))
+    assert inputs.dtype == np.uint16 and replies.dtype == np.uint16
+    assert inputs.tolist() == [1, 2, 65535] and replies.tolist() == [0x100, 0x16A, 0xFFF8]
+
+    # Shard satu baris tetap 2-D (ndmin=2)
+    path.write_text("input_dec,output_q8_8_hex\n4,0200\n")
+    assert [a.tolist() for a in read_shard(str(path))] == [[4], [0x200]]
+
+
+def test_diff_golden_counts_and_lists_mismatches():
+    inputs = np.arange(1, 101)
+    replies = sqrt_q88(inputs).astype(np.int64)
+    assert diff_golden(inputs, replies) == {'vectors': 100, 'mismatches': 0, 'examples': []}
+
+    replies[[4, 9, 49]] += 1
+    report = diff_golden(inputs, replies, show=2)
+    assert (report['vectors'], report['mismatches']) == (100, 3)
+    assert report['examples'] == [(5, int(sqrt_q88(5)) + 1, int(sqrt_q88(5))),
+                                  (10, int(sqrt_q88(10)) + 1, int(sqrt_q88(10)))]
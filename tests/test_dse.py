@@ -0,0 +1,19 @@
+import numpy as np
+
+import golden_model
+from dse import gs_table, nr_table
+
+
+def test_generated_tables_match_rtl_roms():
+    nr_lut, gs_lut = golden_model.load_luts()
+    assert np.array_equal(gs_table(8), gs_lut)
+    assert np.array_equal(nr_table(10), nr_lut)
+
+
+def test_gs_table_is_truncated_reciprocal():
+    for bits in (4, 10):
+        table = gs_table(bits)
+        edges = (1 << bits) + np.arange(1 << bits)
+        # floor: entry x tepi <= 2^(30+bits) < (entry + 1) x tepi
+        assert np.all(table * edges <= 1 << (30 + bits))
+        assert np.all((table + 1) * edges > 1 << (30 + bits))
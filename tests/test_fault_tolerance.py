@@ -0,0 +1,242 @@
+import asyncio
+import json
+import struct
+import threading
+
+import numpy as np
+import pytest
+
+import full_test_suite
+import sqrt_cli
+import system_latency_test
+import test_system_output
+import transport
+from fake_serial import FaultySerial, LoopbackSerial, fake_opener, golden_q88
+from framed_protocol import ReferenceEndpoint
+from sweep_cache import SweepCache, build_hash, load_checkpoint, save_checkpoint
+
+VALUES = list(range(1, 501))
+
+
+@pytest.fixture(autouse=True)
+def fast_settle(monkeypatch):
+    # Board palsu tidak auto-reset: tidak perlu menunggu 2 s tiap port dibuka
+    monkeypatch.setattr(transport, 'SETTLE_TIME', 0.01)
+    monkeypatch.setattr(transport, 'REOPEN_DELAY', 0.01)
+
+
+def _keep_config(monkeypatch, script):
+    # sqrt_cli mengisi KONFIGURASI script HIL; nilai aslinya dikembalikan setelah tes
+    for name in dir(script):
+        if name.isupper():
+            monkeypatch.setattr(script, name, getattr(script, name))
+    return script
+
+
+@pytest.fixture
+def suite(monkeypatch):
+    return _keep_config(monkeypatch, full_test_suite)
+
+
+def _sweep(faults, depth):
+    opener = fake_opener(faults)
+
+    async def main():
+        async with await transport.open_device('FAKE', 921600, depth=depth, timeout=0.1, retries=3,
+                                               opener=opener) as dev:
+            return await dev.sqrt_many(VALUES), dev.stats
+    replies, stats = asyncio.run(main())
+    totals = {}
+    for port in opener.opened:
+        for name, count in port.faults.items():
+            totals[name] = totals.get(name, 0) + count
+    return replies, stats, totals, opener
+
+
+@pytest.mark.parametrize('depth', [1, 8])
+@pytest.mark.parametrize('faults, injected', [
+    ('drop=0.003', 'dropped'),
+    ('dup=0.003', 'duplicated'),
+    ('delay=0.005,delay_time=0.15', 'delayed'),
+])
+def test_faults_never_give_a_wrong_reply(faults, injected, depth):
+    replies, stats, totals, _ = _sweep(faults, depth)
+    assert totals[injected] > 0
+    assert replies == [golden_q88(v) for v in VALUES]
+    assert stats['resyncs'] > 0
+
+
+def test_every_reply_is_mangled_while_the_reader_drains():
+    # delay=1.0 dengan delay_time 0: tiap byte balasan dihitung, walau reader mengambilnya seketika
+    port = FaultySerial(delay=1.0, delay_time=0.0, timeout=0.01)
+    got = bytearray()
+    stop = threading.Event()
+
+    def reader():
+        while not stop.is_set() or port.in_waiting:
+            got.extend(port.read(max(1, port.in_waiting)))
+    thread = threading.Thread(target=reader)
+    thread.start()
+    for val in range(1, 2001):
+        port.write(struct.pack('<H', val))
+    stop.set()
+    thread.join()
+    assert port.faults['delayed'] == 4000
+    assert len(got) == 4000
+
+
+@pytest.mark.parametrize('depth', [1, 4])
+def test_persistent_wrong_reply_is_reported_as_the_board_answer(depth):
+    # Board yang selalu salah untuk input 100: balasannya dikonfirmasi (probe + input), bukan hang
+    board = LoopbackSerial(baudrate=921600, compute=lambda v: 0 if v == 100 else golden_q88(v))
+
+    async def main():
+        async with transport.SqrtDevice(board, depth=depth, timeout=0.1) as dev:
+            return await asyncio.wait_for(dev.sqrt_many([99, 100, 101]), 5.0)
+    assert asyncio.run(main()) == [golden_q88(99), 0, golden_q88(101)]
+
+
+@pytest.mark.parametrize('depth', [1, 8])
+def test_disconnect_reopens_the_port(depth):
+    replies, stats, totals, opener = _sweep('disconnect=600', depth)
+    assert totals['disconnects'] >= 1
+    assert stats['reopens'] >= 1 and len(opener.opened) == stats['reopens'] + 1
+    assert replies == [golden_q88(v) for v in VALUES]
+
+
+class UnpluggedEndpoint(ReferenceEndpoint):
+    """Framed endpoint that fails like an unplugged adapter after `after` written bytes."""
+
+    def __init__(self, port, baud, after=None):
+        super().__init__(port, baud)
+        self.after, self._written = after, 0
+
+    def _check(self):
+        if self.after is not None and self._written >= self.after:
+            self.is_open = False
+            raise OSError(f"{self.port}: device disconnected")
+
+    def write(self, data):
+        self._check()
+        self._written += len(data)
+        return super().write(data)
+
+    def read(self, size=1):
+        self._check()
+        return super().read(size)
+
+    @property
+    def in_waiting(self):
+        self._check()
+        return ReferenceEndpoint.in_waiting.fget(self)
+
+
+@pytest.mark.parametrize('depth', [1, 4])
+def test_framed_disconnect_reopens_the_port(depth):
+    opened = []
+
+    def opener(port, baud):
+        # Port pertama putus setelah 3 frame request (8 + 2 x 64 byte), port baru sehat
+        opened.append(UnpluggedEndpoint(port, baud, after=3 * 136 if not opened else None))
+        return opened[-1]
+
+    async def main():
+        async with await transport.open_device('FAKE', 921600, depth=depth, timeout=0.1, retries=3,
+                                               opener=opener, protocol='framed') as dev:
+            return await dev.sqrt_many(VALUES), dev.stats
+    replies, stats = asyncio.run(main())
+    assert stats['reopens'] == 1 and len(opened) == 2
+    assert replies == [golden_q88(v) for v in VALUES]
+
+
+def test_resume_fills_only_options_not_given(suite, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    save_checkpoint({'task': 'sweep', 'port': 'SIM', 'baud': 921600, 'source': 'range:1:50', 'depth': 4,
+                     'tol': 1, 'out': 'res', 'checkpoint_every': 16, 'timeout': 0.05, 'retries': 0,
+                     'csv': None, 'protocol': 'uart16', 'faults': 'drop=0.5'}, sqrt_cli.SIM_CACHE_DIR)
+    monkeypatch.setattr(suite, 'run_fpga_test', lambda: None)
+
+    assert sqrt_cli.main(['sweep', '--sim', '--resume', '--retries', '2', '--tol', '0']) == 0
+    assert (suite.INPUT_SOURCE, suite.BAUD_RATE, suite.PIPELINE_DEPTH) == ('range:1:50', 921600, 4)
+    assert (suite.TIMEOUT, suite.FAULTS, suite.CHECKPOINT_EVERY) == (0.05, 'drop=0.5', 16)
+    assert (suite.RETRIES, suite.GOLDEN_LSB_TOLERANCE) == (2, 0)   # Diketik user, bukan dari checkpoint
+
+
+def test_interrupted_sweep_resumes_from_checkpoint(suite, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    record = SweepCache.record
+    calls = []
+
+    def interrupted_record(self, *args, **kwargs):
+        calls.append(1)
+        if len(calls) == 3:
+            raise KeyboardInterrupt   # Ctrl+C setelah 2 blok tersimpan
+        return record(self, *args, **kwargs)
+
+    monkeypatch.setattr(SweepCache, 'record', interrupted_record)
+    argv = ['sweep', '--sim', '--baud', '921600', '--source', 'range:1:400', '--checkpoint-every', '100',
+            '--faults', 'dup=0.001,seed=7', '--timeout', '0.1', '--out', 'res']
+    assert sqrt_cli.main(argv) == 130
+    checkpoint = load_checkpoint(sqrt_cli.SIM_CACHE_DIR)
+    assert checkpoint['position'] == 200 and checkpoint['faults'] == 'dup=0.001,seed=7'
+
+    monkeypatch.setattr(SweepCache, 'record', record)
+    suite.FAULTS = None
+    assert sqrt_cli.main(['sweep', '--sim', '--resume']) == 0
+    assert suite.FAULTS == 'dup=0.001,seed=7' and suite.TIMEOUT == 0.1
+    assert load_checkpoint(sqrt_cli.SIM_CACHE_DIR) is None   # Selesai: checkpoint dihapus
+    cache = SweepCache(build_hash(), 921600, sqrt_cli.SIM_CACHE_DIR)
+    assert all(cache.done[1:400])
+    assert all(cache.replies[v] == golden_q88(v) for v in range(1, 400))
+
+
+def test_interrupted_precision_test_resumes_and_records_failures(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    test = _keep_config(monkeypatch, test_system_output)
+    record = SweepCache.record
+    calls = []
+
+    def interrupted_record(self, *args, **kwargs):
+        calls.append(1)
+        if len(calls) == 2:
+            raise KeyboardInterrupt
+        return record(self, *args, **kwargs)
+
+    monkeypatch.setattr(SweepCache, 'record', interrupted_record)
+    argv = ['precision', '--sim', '--baud', '921600', '--source', 'range:1:300', '--checkpoint-every', '100',
+            '--timeout', '0.05', '--retries', '0', '--out', 'res']
+    assert sqrt_cli.main(argv) == 130
+    checkpoint = load_checkpoint(sqrt_cli.SIM_CACHE_DIR)
+    assert checkpoint['task'] == 'precision' and checkpoint['position'] == 100
+
+    monkeypatch.setattr(SweepCache, 'record', record)
+    assert sqrt_cli.main(['sweep', '--sim', '--resume']) == 1   # Checkpoint milik task lain
+    assert sqrt_cli.main(['precision', '--sim', '--resume']) == 0
+    assert (test.TIMEOUT, test.RETRIES, test.CHECKPOINT_EVERY) == (0.05, 0, 100)
+    assert load_checkpoint(sqrt_cli.SIM_CACHE_DIR) is None
+    with open(tmp_path / 'res' / 'meta.json') as f:
+        assert json.load(f)['failed_inputs'] == []
+    cache = SweepCache(build_hash(), 921600, sqrt_cli.SIM_CACHE_DIR)
+    assert all(cache.replies[v] == golden_q88(v) for v in range(1, 300))
+
+
+def test_latency_of_a_retried_vector_is_measured_again(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    test = _keep_config(monkeypatch, system_latency_test)
+    argv = ['latency', '--sim', '--baud', '921600', '--source', 'range:0:300', '--faults', 'drop=0.01,seed=3',
+            '--timeout', '0.05', '--retries', '3', '--out', 'res']
+    assert sqrt_cli.main(argv) == 0
+    assert (test.TIMEOUT, test.RETRIES) == (0.05, 3)
+    cache = SweepCache(build_hash(), 921600, sqrt_cli.SIM_CACHE_DIR)
+    latency = cache.latency_ns[:300]
+    retried = np.flatnonzero(cache.done[:300] & (latency == 0))
+    assert len(retried) > 0   # Dijawab setelah resync: balasan disimpan, latency tidak
+    assert latency.max() < 0.05e9   # Tidak ada timeout + resync yang tercatat sebagai round-trip
+    assert all(cache.replies[v] == golden_q88(v) for v in range(300))
+    assert load_checkpoint(sqrt_cli.SIM_CACHE_DIR)['timeout'] == 0.05
+    with open(tmp_path / 'res' / 'meta.json') as f:
+        assert 'failed_inputs' in json.load(f)
+
+    assert sqrt_cli.main(['latency', '--sim', '--resume', '--faults', 'seed=3']) == 0
+    assert all(cache.latency_ns[retried] > 0)   # Diukur ulang, tanpa fault
+    assert load_checkpoint(sqrt_cli.SIM_CACHE_DIR) is None
@@ -0,0 +1,53 @@
+import asyncio
+
+from fake_serial import golden_q88
+from framed_protocol import FramedDevice, ReferenceEndpoint
+
+VALUES = list(range(1, 1001))   # 16 frame @ BATCH 64
+
+
+class MangledEndpoint(ReferenceEndpoint):
+    """ReferenceEndpoint that flips one byte of the `frame`-th frame it receives (0 = first)."""
+
+    def __init__(self, frame, offset):
+        super().__init__()
+        self.frame, self.offset, self._seen = frame, offset, 0
+
+    def write(self, data):
+        if self._seen == self.frame:
+            data = bytearray(data)
+            data[self.offset] ^= 0xFF
+        self._seen += 1
+        return super().write(data)
+
+
+def _sweep(endpoint, values=VALUES):
+    async def main():
+        async with FramedDevice(endpoint, timeout=5.0) as dev:
+            return await dev.sqrt_many(values), dev.stats
+    return asyncio.run(main())
+
+
+def test_nak_with_corrupt_seq_retries_the_oldest_outstanding_frame():
+    # Byte seq rusak: NAK membawa seq yang tidak pernah dikirim
+    replies, stats = _sweep(MangledEndpoint(frame=1, offset=3))
+    assert replies == [golden_q88(v) for v in VALUES]
+    assert stats['naks'] == 1 and stats['retries'] == 1
+    assert stats['timeouts'] == 0
+
+
+def test_lost_frame_is_resent_when_a_newer_frame_is_answered():
+    # Sync rusak: endpoint tidak melihat frame sama sekali (tanpa NAK)
+    replies, stats = _sweep(MangledEndpoint(frame=1, offset=0))
+    assert replies == [golden_q88(v) for v in VALUES]
+    assert stats['skipped'] == 1 and stats['retries'] == 1
+    assert stats['timeouts'] == 0
+
+
+def test_sync_bytes_inside_a_corrupt_frame_give_one_nak():
+    # 0x5AA5 dikirim sebagai A5 5A: di dalam frame dengan CRC rusak, tetap satu NAK saja
+    values = VALUES[:64] + [0x5AA5, 7, 0x5AA5, 0x5AA5] + VALUES[68:]
+    replies, stats = _sweep(MangledEndpoint(frame=1, offset=-1), values)
+    assert replies == [golden_q88(v) for v in values]
+    assert stats['naks'] == 1 and stats['retries'] == 1
+    assert stats['timeouts'] == 0 and stats['skipped'] == 0
@@ -0,0 +1,21 @@
+import numpy as np
+
+from fsm_model import compute_cycles, simulate
+
+BYPASS_CYCLES = 5      # IDLE -> SEND langsung untuk input 0, lalu TX sampai start bit
+COMPUTE_CYCLES = 18    # Angka di README: rx_valid -> start bit balasan
+
+
+def test_every_nonzero_input_takes_18_cycles():
+    domain = np.arange(65536)
+    for sweep in (domain, domain[::-1]):
+        cycles = compute_cycles(sweep)
+        assert cycles.dtype == np.uint32 and len(cycles) == 65536
+        assert np.all(cycles[sweep != 0] == COMPUTE_CYCLES)
+        assert np.all(cycles[sweep == 0] == BYPASS_CYCLES)
+
+
+def test_zero_takes_the_bypass():
+    assert compute_cycles([0, 0], prev=[0, 12345]).tolist() == [BYPASS_CYCLES] * 2
+    stamps = simulate(0, 1)
+    assert 'PRE_PROC' not in stamps and stamps['SEND'] == 1
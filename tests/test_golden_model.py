@@ -0,0 +1,27 @@
+import os
+
+import numpy as np
+
+from golden_model import reply_table, sqrt_q88
+from result_format import load_results
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+
+def test_reply_table_matches_every_recorded_fpga_reply():
+    # latency_results.csv: balasan board asli untuk seluruh domain 0..65535
+    results = load_results(os.path.join(DATA_DIR, 'latency_results.csv'))
+    table = np.asarray(reply_table())
+    assert len(results) == 65536
+    assert np.count_nonzero(table[results.input] != results.reply) == 0
+
+
+def test_known_points():
+    assert sqrt_q88(0) == 0          # Bypass nol di FSM
+    assert sqrt_q88(1) == 0x0100
+    assert sqrt_q88(0xFFFF) == 0xFFF8
+    assert sqrt_q88(2) == 0x016A
+    assert sqrt_q88(0x8000) == 0xB500  # Shift ganjil: koreksi 181/256
+    # Pangkat dua genap (2^2k): akar tepat
+    for k in range(8):
+        assert sqrt_q88(1 << (2 * k)) == (1 << k) << 8
@@ -0,0 +1,57 @@
+import asyncio
+import json
+
+from fake_serial import LoopbackSerial
+from latency_trace import PHASES, PhaseTracer
+from transport import SqrtDevice
+
+
+def _tracer():
+    # Tiga request dengan timestamp tetap (ns); request kedua di-drop saat resync
+    tracer = PhaseTracer()
+    ids = tracer.begin([0x0010, 0x0020, 0xFFFF])
+    tracer.submit[:] = [1_000_000, 1_500_000, 2_000_000]
+    tracer.written(ids[:2], 1_200_000)
+    tracer.written(ids[2:], 2_300_000)
+    tracer.received(ids[0], 5_000_000, 6_000_000)
+    tracer.received(ids[2], 7_000_000, 9_500_000)
+    return tracer
+
+
+def test_chrome_trace_structure(tmp_path):
+    with open(_tracer().export_chrome_trace(str(tmp_path / 'trace.json'))) as f:
+        trace = json.load(f)
+    assert trace['displayTimeUnit'] == 'ns'
+    events = trace['traceEvents']
+
+    # Satu track (tid) per fase, dinamai lewat metadata event
+    tracks = [e for e in events if e['ph'] == 'M']
+    assert [(e['name'], e['tid'], e['args']['name']) for e in tracks] == \
+        [('thread_name', tid, name) for tid, (name, _, _) in enumerate(PHASES[:3])]
+
+    # Satu slice per request yang selesai per track; ts/dur dalam us, relatif ke submit pertama
+    slices = [e for e in events if e['ph'] == 'X']
+    assert len(slices) == 2 * 3 and all(e['pid'] == 1 for e in events)
+    by_track = {tid: [e for e in slices if e['tid'] == tid] for tid in range(3)}
+    assert [e['name'] for e in by_track[0]] == ['0x0010', '0xFFFF']
+    assert [e['args']['input'] for e in by_track[0]] == [0x0010, 0xFFFF]
+    assert {e['cat'] for e in by_track[1]} == {'to_first_byte'}
+    assert [(e['ts'], e['dur']) for e in by_track[0]] == [(0.0, 200.0), (1000.0, 300.0)]
+    assert [(e['ts'], e['dur']) for e in by_track[1]] == [(200.0, 3800.0), (1300.0, 4700.0)]
+    assert [(e['ts'], e['dur']) for e in by_track[2]] == [(4000.0, 1000.0), (6000.0, 2500.0)]
+
+
+def test_chrome_trace_from_a_traced_device(tmp_path):
+    tracer = PhaseTracer()
+
+    async def main():
+        async with SqrtDevice(LoopbackSerial(latency=0.0005), depth=1, tracer=tracer) as dev:
+            for val in range(1, 6):
+                await dev.sqrt(val)
+
+    asyncio.run(main())
+    with open(tracer.export_chrome_trace(str(tmp_path / 'trace.json'))) as f:
+        events = json.load(f)['traceEvents']
+    slices = [e for e in events if e['ph'] == 'X']
+    assert len(slices) == 3 * len(tracer.arrays()['value']) >= 3 * 5
+    assert min(e['ts'] for e in slices) == 0.0 and all(e['dur'] >= 0 for e in slices)
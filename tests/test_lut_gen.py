@@ -0,0 +1,12 @@
+import os
+
+import golden_model
+from lut_gen import generate
+
+
+def test_rtl_method_reproduces_the_rom_files_in_src(tmp_path):
+    # --rtl harus identik byte-per-byte dengan ROM hand-written di src/
+    paths, _ = generate(10, 8, golden_model.GS_ITERATIONS, 'rtl', 30, str(tmp_path))
+    for path in paths:
+        with open(path, 'rb') as f, open(os.path.join(golden_model.SRC_DIR, os.path.basename(path)), 'rb') as g:
+            assert f.read() == g.read(), os.path.basename(path)
@@ -0,0 +1,84 @@
+import struct
+
+import pytest
+
+import transport
+from fake_serial import LoopbackSerial, fake_opener, golden_q88
+from golden_model import reply_table
+from multi_board import run_multi_board
+
+VALUES = range(1, 301)
+
+
+class MuteBoard(LoopbackSerial):
+    """Fake board that never answers the inputs in `mute` (reply lost on the wire)."""
+
+    def __init__(self, port, mute):
+        super().__init__(port)
+        self.mute = set(mute)
+        self._half = b''
+
+    def write(self, data):
+        data, self._half = self._half + bytes(data), b''
+        if len(data) % 2:
+            data, self._half = data[:-1], data[-1:]
+        for k in range(0, len(data), 2):
+            if struct.unpack('<H', data[k:k + 2])[0] not in self.mute:
+                super().write(data[k:k + 2])
+        return len(data)
+
+
+@pytest.fixture(autouse=True)
+def fast_settle(monkeypatch):
+    monkeypatch.setattr(transport, 'SETTLE_TIME', 0.01)
+    monkeypatch.setattr(transport, 'REOPEN_DELAY', 0.01)
+
+
+def _opener(boards):
+    return lambda port, baud: boards[port]
+
+
+def test_shards_merge_in_input_order():
+    ports = ['LOOP0', 'LOOP1', 'LOOP2']
+    result = run_multi_board(ports, VALUES, opener=fake_opener(), cross_check=16)
+    assert result['replies'].tolist() == [golden_q88(v) for v in VALUES]
+    assert result['disagreements'] == []
+    assert result['cross_checked'] == 16
+    assert all(st['missing'] == 0 for st in result['stats'].values())
+    assert sum(st['vectors'] for st in result['stats'].values()) == len(VALUES) + 3 * 16
+
+
+def test_missing_replies_are_marked_not_shifted():
+    # LOOP1 mendapat shard 101..200; dua inputnya tidak pernah dijawab
+    boards = {'LOOP0': LoopbackSerial('LOOP0'), 'LOOP1': MuteBoard('LOOP1', {150, 151}),
+              'LOOP2': LoopbackSerial('LOOP2')}
+    result = run_multi_board(list(boards), VALUES, opener=_opener(boards), cross_check=8,
+                             timeout=0.05, retries=1)
+    replies = dict(zip(result['inputs'].tolist(), result['replies'].tolist()))
+    assert replies[150] == -1 and replies[151] == -1
+    table = reply_table()
+    assert all(r == table[v] for v, r in replies.items() if v not in (150, 151))
+    assert result['stats']['LOOP1']['missing'] == 2
+    assert result['stats']['LOOP0']['missing'] == 0 and result['stats']['LOOP2']['missing'] == 0
+    assert result['disagreements'] == []
+
+
+def test_wrong_board_is_reported_on_the_cross_check_sample():
+    off_by_one = lambda val: golden_q88(val) ^ 1
+    boards = {'LOOP0': LoopbackSerial('LOOP0'), 'BAD': LoopbackSerial('BAD', compute=off_by_one),
+              'LOOP2': LoopbackSerial('LOOP2')}
+    result = run_multi_board(list(boards), VALUES, opener=_opener(boards), cross_check=10)
+    assert len(result['disagreements']) == result['cross_checked'] == 10
+    table = reply_table()
+    for val, answers in result['disagreements']:
+        assert answers['LOOP0'] == answers['LOOP2'] == table[val]
+        assert answers['BAD'] == table[val] ^ 1
+
+
+def test_unplugged_board_is_reopened_not_failed():
+    # Tiap port palsu "dicabut" setelah 120 byte; transport membuka ulang dan melanjutkan shard-nya
+    opener = fake_opener('disconnect=120', uart_model=True)
+    result = run_multi_board(['SIM0', 'SIM1'], VALUES, baud=921600, opener=opener, cross_check=8,
+                             timeout=0.1)
+    assert result['replies'].tolist() == [golden_q88(v) for v in VALUES]
+    assert all(st['reopens'] >= 1 and st['missing'] == 0 for st in result['stats'].values())
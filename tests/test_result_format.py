@@ -0,0 +1,38 @@
+import numpy as np
+
+from result_format import export_csv, load_results, save_results
+
+
+def test_binary_round_trip(tmp_path):
+    inputs = np.array([0, 1, 2, 65535])
+    replies = np.array([0, 0x100, 0x16A, 0xFFF8])
+    path = save_results(str(tmp_path / 'res'), inputs, replies, [5, 6, 7, 8], build_id='rtl-x', baud=9600,
+                        failed_inputs=[3])
+    results = load_results(path)
+    assert results.input.dtype == np.uint16 and results.latency_ns.dtype == np.uint64
+    assert results.input.tolist() == inputs.tolist() and results.reply.tolist() == replies.tolist()
+    assert results.latency_ns.tolist() == [5, 6, 7, 8]
+    assert (results.meta['build_id'], results.meta['count'], results.meta['failed_inputs']) == ('rtl-x', 4, [3])
+
+    # Lewat export CSV dan kembali: identik
+    back = load_results(export_csv(results, str(tmp_path / 'res.csv')))
+    assert back.reply.tolist() == replies.tolist() and back.latency_ns.tolist() == [5, 6, 7, 8]
+    assert load_results(str(tmp_path / 'res')).input.tolist() == inputs.tolist()   # Folder didahulukan dari .csv
+
+
+def test_legacy_csv_recovers_raw_replies(tmp_path):
+    # scientific_results.csv hanya menyimpan Q8.8 sebagai string 4 desimal; latency_results.csv detik
+    (tmp_path / 'scientific_results.csv').write_text(
+        "Input (Dec),Expected (Float),FPGA (Q8.8),Abs Error,Error (LSB),Status\n"
+        "2,1.4142,1.4141,0.000151,0.04 LSB,PASS\n"
+        "65535,255.9980,255.9688,0.029297,7.50 LSB,FAIL\n")
+    results = load_results(str(tmp_path / 'scientific_results'))
+    assert results.input.tolist() == [2, 65535]
+    assert results.reply.tolist() == [0x016A, 0xFFF8]
+    assert results.latency_ns.tolist() == [0, 0]
+
+    (tmp_path / 'latency.csv').write_text(
+        "input_decimal,input_hex,fpga_result_hex,latency_seconds,latency_ms\n"
+        "1,0x0001,0x0100,0.007885,7.885\n")
+    results = load_results(str(tmp_path / 'latency.csv'))
+    assert (results.reply.tolist(), results.latency_ns.tolist()) == ([0x100], [7885000])
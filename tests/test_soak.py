@@ -0,0 +1,106 @@
+import asyncio
+import math
+
+import soak
+from soak import ALERT_BITS, STALL_ALERT, Envelope, SeriesRing
+
+
+class StuckDevice:
+    """Device whose link went silent: sqrt_many never returns, probes time out."""
+
+    stats = {'resyncs': 0}
+
+    async def sqrt_many(self, values, progress=None):
+        await asyncio.Event().wait()
+
+    async def sqrt(self, value):
+        await asyncio.sleep(0.01)
+        return None
+
+
+def test_stalled_stream_still_writes_alert_windows(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(soak, 'WINDOW_SECONDS', 0.05)
+    ring = SeriesRing(str(tmp_path / 'series.npy'), size=16)
+    seen = []
+    asyncio.run(soak.soak(StuckDevice(), duration=0.12, ring=ring, on_window=lambda row, alerts: seen.append(alerts)))
+
+    rows = ring.ordered()
+    assert len(rows) >= 2
+    assert all(rows['vectors'] == 0)
+    assert all(rows['alerts'] & ALERT_BITS[STALL_ALERT])
+    assert all(alerts[0][0] == STALL_ALERT for alerts in seen)
+    assert (tmp_path / soak.ALERT_FILE).exists()
+
+
+def test_alerts_go_next_to_the_series(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(soak, 'WINDOW_SECONDS', 0.05)
+    (tmp_path / 'runs').mkdir()
+    ring = SeriesRing(str(tmp_path / 'runs' / 'series.npy'), size=16)
+    asyncio.run(soak.soak(StuckDevice(), duration=0.05, ring=ring))
+    assert (tmp_path / 'runs' / soak.ALERT_FILE).exists()
+    assert not (tmp_path / soak.ALERT_FILE).exists()
+
+
+def _row(ops=1000.0, p99=2.0, jitter=0.5, error=0.0):
+    return {'ops_per_sec': ops, 'latency_p99_ms': p99, 'jitter_ms': jitter, 'error_rate': error}
+
+
+def test_envelope_baseline_is_median_of_first_windows():
+    env = Envelope(n_windows=3, warmup=0)
+    assert env.check(_row(ops=900.0)) == []
+    assert env.check(_row(ops=float('nan'))) == []      # Non-finite tidak masuk baseline
+    assert env.check(_row(ops=1100.0)) == []
+    assert env.baseline is None
+    assert env.check(_row(ops=1000.0)) == []
+    assert env.baseline['ops_per_sec'] == 1000.0 and env.baseline['latency_p99_ms'] == 2.0
+
+
+def test_warmup_windows_stay_out_of_the_baseline():
+    env = Envelope(n_windows=2, warmup=1)
+    assert env.check(_row(p99=9.65)) == []       # Window pertama (warm-up): p99 jauh lebih tinggi
+    env.check(_row(p99=3.0))
+    assert env.baseline is None
+    env.check(_row(p99=3.0))
+    assert env.baseline['latency_p99_ms'] == 3.0
+    assert [name for name, _, _ in env.check(_row(p99=6.0))] == ['latency_p99_ms']   # > 3 * 1.5 + 1
+
+
+def test_envelope_limits_low_high_and_non_finite():
+    env = Envelope(n_windows=1, warmup=0)
+    env.check(_row())
+    assert env.check(_row(ops=901.0, p99=3.9)) == []      # Di dalam: ops >= 900, p99 <= 2 * 1.5 + 1
+    alerts = {name: (value, limit) for name, value, limit in env.check(_row(ops=899.0, p99=4.1, error=2e-4))}
+    assert alerts['ops_per_sec'] == (899.0, 900.0)
+    assert alerts['latency_p99_ms'] == (4.1, 4.0)
+    assert alerts['error_rate'][1] == 1e-4
+    assert 'jitter_ms' not in alerts
+    names = [name for name, value, _ in env.check(_row(jitter=float('nan')))]
+    assert names == ['jitter_ms']
+
+
+def test_series_ring_wraps_at_size(tmp_path):
+    ring = SeriesRing(str(tmp_path / 'series.npy'), size=4)
+    for k in range(6):
+        ring.append({'vectors': k})
+    rows = ring.ordered()
+    assert rows['seq'].tolist() == [3, 4, 5, 6]
+    assert rows['vectors'].tolist() == [2, 3, 4, 5]
+    assert len(ring.data) == 4
+
+
+def test_series_ring_continues_after_reopen(tmp_path):
+    path = str(tmp_path / 'series.npy')
+    ring = SeriesRing(path, size=4)
+    for k in range(5):
+        ring.append({'vectors': k, 'ops_per_sec': float(k)})
+    del ring
+
+    ring = SeriesRing(path, size=99)    # Ukuran file yang sudah ada yang dipakai
+    assert ring.next_seq == 6 and len(ring.data) == 4
+    ring.append({'vectors': 5, 'ops_per_sec': math.pi})
+    rows = ring.ordered()
+    assert rows['seq'].tolist() == [3, 4, 5, 6]
+    assert rows['vectors'].tolist() == [2, 3, 4, 5]
+    assert rows['ops_per_sec'][-1] == math.pi
@@ -0,0 +1,16 @@
+import pytest
+
+from sqrt_cli import build_parser, main
+
+
+def test_query_accepts_decimal_and_hex():
+    args = build_parser().parse_args(['query', '0', '0x100', '65535', '--sim'])
+    assert args.values == [0, 256, 65535]
+
+
+@pytest.mark.parametrize('value', ['70000', '-1', '0x10000', 'abc'])
+def test_query_rejects_values_outside_uint16(value, capsys):
+    with pytest.raises(SystemExit) as exc:
+        main(['query', value, '--sim'])
+    assert exc.value.code == 2
+    assert value in capsys.readouterr().err
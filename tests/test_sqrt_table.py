@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+import pytest
+
+import golden_model
+import sqrt_table
+from sweep_cache import SweepCache
+
+
+@pytest.fixture(autouse=True)
+def fresh_tables():
+    # Tabel di-cache per proses; tiap tes mulai dari cache kosong
+    sqrt_table._reset()
+    yield
+    sqrt_table._reset()
+
+
+def test_table_equals_golden_model_over_the_domain(tmp_path):
+    domain = np.arange(sqrt_table.DOMAIN)
+    assert np.array_equal(sqrt_table.table(str(tmp_path)), golden_model.sqrt_q88(domain))
+    assert sqrt_table.stored_versions(str(tmp_path)) == [sqrt_table.lut_hash()]
+
+
+def test_unknown_lut_version_is_not_generated(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        sqrt_table.table(str(tmp_path), version='lut-0000000000000000')
+    with pytest.raises(FileNotFoundError):
+        sqrt_table.table(str(tmp_path), version='sof-0000000000000000')
+    assert sqrt_table.stored_versions(str(tmp_path)) == []
+
+
+def test_imported_sweep_is_served_under_its_build_id(tmp_path):
+    cache = SweepCache('sof-1234', 921600, str(tmp_path / 'cache'))
+    replies = golden_model.sqrt_q88(np.arange(sqrt_table.DOMAIN))
+    replies[100] ^= 1   # Hardware yang beda 1 LSB di satu input
+    with pytest.raises(ValueError):
+        sqrt_table.import_sweep(cache, table_dir=str(tmp_path))   # Sweep belum lengkap
+    cache.record(np.arange(sqrt_table.DOMAIN), replies)
+
+    path = sqrt_table.import_sweep(cache, table_dir=str(tmp_path))
+    assert path == sqrt_table.table_path('sof-1234', str(tmp_path))
+    assert np.array_equal(sqrt_table.table(str(tmp_path), version='sof-1234'), replies)
+    assert sqrt_table.stored_versions(str(tmp_path)) == ['sof-1234']
+
+
+def test_without_rtl_the_newest_stored_table_is_used(tmp_path, monkeypatch):
+    def no_rtl():
+        raise FileNotFoundError('src/nr_initial_guess.vhd')
+    monkeypatch.setattr(sqrt_table, 'lut_hash', no_rtl)
+    with pytest.raises(FileNotFoundError):
+        sqrt_table.resolve_version(None, str(tmp_path))
+
+    table = np.zeros(sqrt_table.DOMAIN, dtype=np.uint16)
+    sqrt_table.write_table(table, 'sof-old', str(tmp_path))
+    path = sqrt_table.write_table(table + 1, 'sof-new', str(tmp_path))
+    old = sqrt_table.table_path('sof-old', str(tmp_path))
+    os.utime(old, (1, 1))   # mtime menentukan urutan
+    assert sqrt_table.resolve_version(None, str(tmp_path)) == 'sof-new'
+    assert sqrt_table.resolve_version('sof-old', str(tmp_path)) == 'sof-old'
+    assert sqrt_table.table(str(tmp_path))[0] == 1
+    assert os.path.exists(path)
+
+
+def test_input_dtypes():
+    assert sqrt_table.sqrt_q88(16) == 0x0400
+    assert sqrt_table.sqrt_q88(np.array([16, 0xFFFF], dtype=np.uint16)).tolist() == [0x0400, 0xFFF8]
+    # Integer lain dibungkus 16 bit seperti word UART
+    assert sqrt_table.sqrt_q88([16 + 65536, -1]).tolist() == [0x0400, 0xFFF8]
+    assert sqrt_table.sqrt_q88(np.array([16], dtype=np.int8)).dtype == np.uint16
+    with pytest.raises(TypeError):
+        sqrt_table.sqrt_q88([16.9, -1.0])
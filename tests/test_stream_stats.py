@@ -0,0 +1,47 @@
+import math
+
+import numpy as np
+
+from golden_model import sqrt_q88
+from stream_stats import QuantileSketch, StreamStats, block_moments, merge_moments
+
+
+def test_merged_moments_equal_one_pass():
+    x = np.random.default_rng(1).normal(3.0, 2.0, 1000)
+    n, mean, m2 = merge_moments(*block_moments(x[:123]), *block_moments(x[123:]))
+    assert n == 1000
+    assert math.isclose(mean, np.mean(x), rel_tol=1e-12)
+    assert math.isclose(m2 / (n - 1), np.var(x, ddof=1), rel_tol=1e-12)
+    assert merge_moments(*block_moments(x), 0, 0.0, 0.0) == block_moments(x)
+
+
+def test_quantiles_within_relative_error():
+    lat = np.random.default_rng(2).lognormal(15.0, 0.5, 20000)
+    sketch = QuantileSketch(alpha=0.01)
+    sketch.add(lat)
+    for q in (0.5, 0.9, 0.99):
+        assert abs(sketch.quantile(q) - np.quantile(lat, q)) <= 0.011 * np.quantile(lat, q)
+
+
+def test_blockwise_and_merged_runs_match_a_single_pass(tmp_path):
+    inputs = np.arange(1, 65536)
+    replies = sqrt_q88(inputs)
+    lat = np.random.default_rng(3).integers(1_000_000, 9_000_000, len(inputs))
+
+    whole = StreamStats().update(inputs, replies).update_latency(lat)
+    a, b = StreamStats(), StreamStats()
+    for lo in range(0, len(inputs), 4096):
+        part = a if lo < 30000 else b
+        part.update(inputs[lo:lo + 4096], replies[lo:lo + 4096]).update_latency(lat[lo:lo + 4096])
+    merged = StreamStats.load(a.save(str(tmp_path / 'a.npz'))).merge(b)
+
+    got, want = merged.summary(), whole.summary()
+    assert got['vectors'] == want['vectors'] == 65535 and got['golden_exact'] == 65535
+    for key in ('avg_error_lsb', 'std_error_lsb', 'max_error_lsb', 'sqnr_db', 'avg_latency_ms', 'jitter_ms',
+                'p50_latency_ms', 'p99_latency_ms'):
+        assert math.isclose(got[key], want[key], rel_tol=1e-9), key
+    assert got['pass_rate'] == want['pass_rate']
+    assert np.array_equal(merged.histogram()[1], whole.histogram()[1])
+    # SQNR dari akumulator = rumus langsung atas seluruh domain
+    err = replies / 256.0 - np.sqrt(inputs)
+    assert math.isclose(got['sqnr_db'], 10 * math.log10(np.sum(inputs) / np.sum(err ** 2)), rel_tol=1e-9)
@@ -0,0 +1,41 @@
+import numpy as np
+
+from sweep_cache import SweepCache, build_hash
+from vector_source import RangeSource
+
+
+def test_build_hash_follows_the_bitstream_then_the_rtl(tmp_path):
+    src = tmp_path / 'src'
+    src.mkdir()
+    (src / 'a.vhd').write_text('entity a is end;')
+    rtl = build_hash(None, str(src))
+    assert rtl.startswith('rtl-') and rtl == build_hash(str(tmp_path / 'missing.sof'), str(src))
+    (src / 'a.vhd').write_text('entity a is end; -- edit')
+    assert build_hash(None, str(src)) != rtl
+
+    sof = tmp_path / 'top.sof'
+    sof.write_bytes(b'\x01\x02')
+    assert build_hash(str(sof), str(src)).startswith('sof-')   # .sof menang dari sumber RTL
+
+
+def test_partial_record_leaves_only_the_rest_missing(tmp_path):
+    cache = SweepCache('rtl-test', 921600, str(tmp_path))
+    values = RangeSource(10, 20)
+    assert cache.missing(values).tolist() == list(range(10, 20))
+
+    cache.record([12, 10, 15], [3, 1, 5], latency_ns=[0, 700, 900])
+    cache.record_failed([11])
+    assert cache.missing(values).tolist() == [11, 13, 14, 16, 17, 18, 19]
+    assert cache.missing([15, 12, 10], need_latency=True).tolist() == [12]   # latency 0 = belum diukur
+    assert cache.failed_inputs().tolist() == [11]
+
+    # Dibuka ulang (run berikutnya / --resume): semua tersimpan di disk
+    again = SweepCache('rtl-test', 921600, str(tmp_path))
+    assert again.replies[[10, 12, 15]].tolist() == [1, 3, 5]
+    assert again.missing(values).tolist() == [11, 13, 14, 16, 17, 18, 19]
+    assert again.meta['completed'] == 3 and again.meta['failed'] == 1
+
+    again.record([11], [2])
+    assert again.failed_inputs().tolist() == []
+    assert SweepCache('rtl-test', 115200, str(tmp_path)).missing([10]).tolist() == [10]   # Baud lain, cache lain
+    assert np.count_nonzero(again.done) == 4
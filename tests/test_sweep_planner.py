@@ -0,0 +1,27 @@
+import math
+
+import numpy as np
+
+from golden_model import sqrt_q88
+from sweep_planner import DOMAIN, SweepPlanner
+
+
+def test_planner_covers_every_rom_entry_and_brackets_the_true_sqnr():
+    truth = sqrt_q88(np.arange(DOMAIN))
+    planner = SweepPlanner()
+    first = planner.next_batch()
+    for edge in (0, 1, DOMAIN - 1, 1 << 15, (1 << 15) - 1):
+        assert edge in first
+    planner.add_results(first, truth[first])
+    while (batch := planner.next_batch()) is not None:
+        planner.add_results(batch, truth[batch])
+
+    est = planner.history[-1]
+    assert est['vectors'] < DOMAIN // 5
+    assert est['nr_covered'] == '1024/1024' and est['shifts_covered'] == '17/17'
+    assert est['gs_covered'].split('/')[0] == est['gs_covered'].split('/')[1]
+
+    err = np.abs(truth - np.sqrt(np.arange(DOMAIN)) * 256.0)
+    true_sqnr = 10 * math.log10(np.sum(np.arange(DOMAIN)) / np.sum((err / 256.0) ** 2))
+    assert est['sqnr_low_db'] <= true_sqnr <= est['sqnr_high_db']
+    assert est['max_error_lsb'] <= err.max() and err.max() - est['max_error_lsb'] < 0.1
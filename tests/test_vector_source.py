@@ -0,0 +1,65 @@
+import os
+
+import numpy as np
+import pytest
+
+from sweep_planner import input_strata
+from vector_source import (CornerSource, FileSource, RangeSource, ShuffledSource, StridedSource, from_spec,
+                           iter_blocks, write_binary)
+
+
+def _values(source):
+    return np.concatenate(list(iter_blocks(source))).tolist()
+
+
+def test_file_path_ending_in_x_digit_is_one_file(tmp_path):
+    path = os.path.join(tmp_path, 'box3')
+    write_binary(RangeSource(5, 9), path)
+    assert _values(from_spec(f'file:{path}')) == [5, 6, 7, 8]
+    assert _values(from_spec(f'range:1:3+file:{path}')) == [1, 2, 5, 6, 7, 8]
+
+
+def test_trailing_repeat_on_last_part():
+    assert _values(from_spec('range:1:3x3')) == [1, 2] * 3
+    assert _values(from_spec('range:7:8+range:1:3x2')) == [7, 1, 2] * 2
+
+
+def test_shuffled_is_a_permutation_for_any_length():
+    # n = 1000 bukan pangkat dua: nilai hash >= n dilewati, blok harus tetap utuh
+    source = ShuffledSource(24, 1024, seed=3)
+    values = np.concatenate(list(source.blocks(64)))
+    assert len(values) == len(source) == 1000
+    assert sorted(values.tolist()) == list(range(24, 1024))
+    assert values.tolist() != list(range(24, 1024))
+    assert values.tolist() != np.concatenate(list(ShuffledSource(24, 1024, seed=4).blocks(64))).tolist()
+
+
+def test_strided_visits_every_value_once():
+    source = StridedSource(1, 1001, stride=7)
+    values = _values(source)
+    assert sorted(values) == list(range(1, 1001)) and values[:3] == [1, 8, 15]
+    with pytest.raises(ValueError):
+        StridedSource(1, 1001, stride=10)       # gcd(10, 1000) = 10
+
+
+def test_csv_file_with_and_without_header(tmp_path):
+    with_header = tmp_path / 'input_vectors.csv'
+    with_header.write_text("hex_input,decimal_input\n0x0005,5\n0x0010,16\n0xFFFF,65535\n")
+    source = FileSource(str(with_header))
+    assert _values(source) == [5, 16, 65535] and len(source) == 3
+
+    bare = tmp_path / 'bare.csv'
+    bare.write_text("7\n8\n9\n")
+    assert _values(FileSource(str(bare))) == [7, 8, 9]
+    assert _values(from_spec(f'file:{bare}')) == [7, 8, 9]
+
+
+def test_corners_include_both_sides_of_lut_boundaries():
+    octave, nr_addr, gs_addr = input_strata()
+    cases = set(_values(CornerSource()))
+    assert {0, 1, 65535, 255, 256, 257, 32767, 32768, 32769} <= cases
+    for strata in (octave, nr_addr, gs_addr):
+        boundaries = np.flatnonzero(strata[1:] != strata[:-1]) + 1
+        assert len(boundaries) and all(x - 1 in cases and x in cases for x in boundaries.tolist())
+    assert sorted(cases) == _values(CornerSource())
+    assert _values(CornerSource(100, 300)) == sorted(x for x in cases if 100 <= x < 300)